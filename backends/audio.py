@@ -0,0 +1,251 @@
+"""
+Audio loading utilities shared by all backends.
+Decodes a file once to 16 kHz mono float32 so models can consume the array
+directly instead of re-reading a temporary WAV file. Decoded audio is kept
+in an on-disk .npy cache, so several models (or processes) transcribing the
+same file share one decode and resample.
+"""
+
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+from contextlib import nullcontext
+from typing import Optional
+
+SAMPLE_RATE = 16000
+
+AUDIO_CACHE_DIR = os.path.expanduser('~/.cache/vai-studio/audio')
+DEFAULT_AUDIO_CACHE_MB = 2048
+
+# Files at least this long are streamed through ffmpeg by chunked backends
+STREAM_MIN_SECONDS = 300.0
+DEFAULT_BLOCK_SECONDS = 10.0
+
+
+def _audio_cache_max_bytes() -> int:
+    """Size bound from VAI_AUDIO_CACHE_MB (0 disables the cache)."""
+    try:
+        megabytes = float(os.environ.get('VAI_AUDIO_CACHE_MB', DEFAULT_AUDIO_CACHE_MB))
+    except ValueError:
+        megabytes = DEFAULT_AUDIO_CACHE_MB
+    return int(megabytes * 1024 ** 2)
+
+
+def decoded_cache_path(audio_path: str, sr: int = SAMPLE_RATE) -> Optional[str]:
+    """
+    Cache file for the decoded audio of `audio_path`, keyed by path, mtime and size.
+
+    Returns None if the file cannot be stat'ed.
+    """
+    try:
+        stat = os.stat(audio_path)
+    except OSError:
+        return None
+    file_key = f"{os.path.abspath(audio_path)}|{stat.st_mtime_ns}|{stat.st_size}|{sr}"
+    return os.path.join(AUDIO_CACHE_DIR, hashlib.sha256(file_key.encode()).hexdigest() + '.npy')
+
+
+def _store_decoded(cache_path: str, audio, max_bytes: int) -> None:
+    """Write decoded audio to the cache, then evict least recently used files over the bound."""
+    import numpy as np
+
+    try:
+        os.makedirs(AUDIO_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, audio)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"[WARN] Could not cache decoded audio: {e}", file=sys.stderr)
+        return
+
+    entries = []
+    for name in os.listdir(AUDIO_CACHE_DIR):
+        if name.endswith('.npy'):
+            path = os.path.join(AUDIO_CACHE_DIR, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path == cache_path:
+            continue
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def _stage(timer, name: str):
+    """A timer stage, or a no-op context when there is no timer."""
+    return timer.stage(name) if timer else nullcontext()
+
+
+def load_audio(audio_path: str, sr: int = SAMPLE_RATE, timer=None, use_cache: bool = True):
+    """
+    Decode an audio file to a mono float32 numpy array.
+
+    Cached decodes are memory-mapped copy-on-write, so callers may modify
+    the array without touching the cache file.
+
+    Args:
+        audio_path: Path to audio file (anything librosa/audioread/ffmpeg can read)
+        sr: Target sample rate
+        timer: Optional StageTimer; decoding and resampling are recorded as
+            the 'decode_audio' and 'resample' stages
+        use_cache: Read/write the decoded-audio cache
+
+    Returns:
+        1-D float32 numpy array at `sr`
+    """
+    import numpy as np
+
+    max_bytes = _audio_cache_max_bytes()
+    cache_path = decoded_cache_path(audio_path, sr) if use_cache and max_bytes > 0 else None
+
+    if cache_path and os.path.exists(cache_path):
+        with _stage(timer, 'decode_audio'):
+            try:
+                audio = np.load(cache_path, mmap_mode='c')
+                os.utime(cache_path)
+                return audio
+            except (OSError, ValueError) as e:
+                print(f"[WARN] Ignoring unreadable decoded-audio cache: {e}", file=sys.stderr)
+
+    import librosa
+
+    with _stage(timer, 'decode_audio'):
+        # librosa supports M4A/MP3 via audioread/ffmpeg; keep the native rate
+        audio, native_sr = librosa.load(audio_path, sr=None, mono=True)
+
+    if native_sr != sr:
+        with _stage(timer, 'resample'):
+            audio = librosa.resample(audio, orig_sr=native_sr, target_sr=sr)
+
+    audio = np.ascontiguousarray(audio, dtype=np.float32)
+    if cache_path:
+        _store_decoded(cache_path, audio, max_bytes)
+    return audio
+
+
+def stream_audio(audio_path: str, sr: int = SAMPLE_RATE, block_seconds: float = DEFAULT_BLOCK_SECONDS,
+                 timer=None):
+    """
+    Decode an audio file incrementally with ffmpeg.
+
+    ffmpeg writes 16-bit mono PCM at `sr` to a pipe, and fixed-size blocks
+    are yielded as they arrive, so consumers can start on the first block
+    while the rest is still decoding and memory does not grow with length.
+
+    Args:
+        audio_path: Path to audio file (anything ffmpeg can read)
+        sr: Output sample rate
+        block_seconds: Samples per yielded block, in seconds
+        timer: Optional StageTimer; time spent waiting on ffmpeg is
+            recorded as 'decode_audio'
+
+    Yields:
+        1-D float32 numpy arrays (the last block may be shorter)
+    """
+    import numpy as np
+
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg is None:
+        raise RuntimeError("ffmpeg not found on PATH (needed for streaming decode)")
+
+    process = subprocess.Popen(
+        [ffmpeg, '-nostdin', '-loglevel', 'error', '-i', audio_path,
+         '-f', 's16le', '-acodec', 'pcm_s16le', '-ac', '1', '-ar', str(sr), '-'],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    block_bytes = int(block_seconds * sr) * 2
+    try:
+        while True:
+            with _stage(timer, 'decode_audio'):
+                data = process.stdout.read(block_bytes)
+            if not data:
+                break
+            # A short read can end mid-sample only at EOF; drop the odd byte
+            data = data[:len(data) - len(data) % 2]
+            yield np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768.0
+
+        if process.wait() != 0:
+            error = process.stderr.read().decode(errors='replace').strip()
+            raise RuntimeError(f"ffmpeg failed to decode {audio_path}: {error}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+
+def streamable(audio_path: str, min_seconds: float = STREAM_MIN_SECONDS) -> bool:
+    """Whether ffmpeg is available and the file is at least `min_seconds` long."""
+    if shutil.which('ffmpeg') is None:
+        return False
+    try:
+        return get_duration(audio_path) >= min_seconds
+    except Exception:
+        return False
+
+
+def should_stream(audio_path: str, min_seconds: float = STREAM_MIN_SECONDS, sr: int = SAMPLE_RATE) -> bool:
+    """
+    Whether a file is worth decoding incrementally.
+
+    True for long recordings when ffmpeg is available and the decode is
+    not already in the decoded-audio cache.
+    """
+    cache_path = decoded_cache_path(audio_path, sr)
+    if cache_path and os.path.exists(cache_path):
+        return False
+    return streamable(audio_path, min_seconds)
+
+
+def get_duration(audio_path: str) -> float:
+    """
+    Audio duration in seconds, read from the file header where possible.
+
+    soundfile reads WAV/FLAC/OGG headers; librosa falls back to audioread,
+    which reports the container duration for M4A/MP3 without decoding.
+    """
+    try:
+        import soundfile as sf
+        return float(sf.info(audio_path).duration)
+    except Exception:
+        import librosa
+        return float(librosa.get_duration(path=audio_path))
+
+
+def pipeline_input(audio, sr: int = SAMPLE_RATE) -> dict:
+    """
+    Wrap a decoded array for a transformers ASR pipeline.
+
+    The pipeline consumes (pops) this dict, so build a new one per call.
+    """
+    return {'raw': audio, 'sampling_rate': sr}
+
+
+def audio_to_wav_base64(audio, sr: int = SAMPLE_RATE) -> str:
+    """
+    Encode a decoded array as base64 WAV bytes, entirely in memory.
+
+    Used for chat-template processors (Voxtral) that take audio content
+    as base64 rather than arrays.
+    """
+    import base64
+    import io
+    import soundfile as sf
+
+    buffer = io.BytesIO()
+    sf.write(buffer, audio, sr, format='WAV', subtype='FLOAT')
+    return base64.b64encode(buffer.getvalue()).decode('ascii')
@@ -4,14 +4,135 @@ Provides a unified interface for different STT model families.
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 import time
 import os
+import re
+import sys
+import gc
+import threading
+from progress import report_timing
+
+
+# How often PeakMemory samples the resident set size
+RSS_SAMPLE_SECONDS = 0.02
+
+
+class PeakMemory:
+    """
+    Peak resident memory of this process while a block runs.
+
+    RSS is sampled on a background thread (models run with the GIL
+    released, so sampling continues during inference). Unlike the
+    process-wide ru_maxrss high-water mark, the peak is per block, and the
+    delta over the RSS at entry is what the block itself added.
+
+    May be entered repeatedly (and nested): samples accumulate across
+    entries and the baseline is the RSS at the first one.
+    """
+
+    def __init__(self, interval: float = RSS_SAMPLE_SECONDS):
+        self.interval = interval
+        self.baseline = None
+        self.peak = None
+        self._depth = 0
+        self._lock = threading.Lock()
+        self._stop = None
+        self._thread = None
+
+    def _sample(self) -> None:
+        rss = _current_rss_bytes()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+    def _run(self, stop: threading.Event) -> None:
+        while not stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        with self._lock:
+            self._depth += 1
+            if self._depth == 1:
+                if self.baseline is None:
+                    self.baseline = _current_rss_bytes()
+                self._sample()
+                self._stop = threading.Event()
+                self._thread = threading.Thread(target=self._run, args=(self._stop,), daemon=True)
+                self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        with self._lock:
+            self._depth -= 1
+            if self._depth == 0:
+                self._stop.set()
+                self._thread.join()
+                self._thread = None
+                self._sample()
+
+    def report(self) -> Dict:
+        """'peak_rss_mb' and 'peak_rss_delta_mb' (None where RSS is unavailable)."""
+        if self.peak is None or self.baseline is None:
+            return {'peak_rss_mb': None, 'peak_rss_delta_mb': None}
+        return {
+            'peak_rss_mb': round(self.peak / 1024 ** 2, 1),
+            'peak_rss_delta_mb': round((self.peak - self.baseline) / 1024 ** 2, 1)
+        }
+
+
+class StageTimer:
+    """
+    Accumulates wall-clock time per named stage of a transcription.
+
+    Standard stages are load_model, decode_audio, resample, features,
+    inference and decode_tokens. Every finished span is reported as a
+    TIMING: event on stderr. Resident memory is sampled while a stage
+    runs, so the reported peak belongs to this call rather than to
+    whatever else the process (e.g. a serve daemon) has run before.
+    """
+
+    def __init__(self):
+        self.timings = {}
+        self.memory = PeakMemory()
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block, adding to any earlier time for `name`."""
+        start = time.perf_counter()
+        try:
+            with self.memory:
+                yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings[name] = self.timings.get(name, 0.0) + elapsed
+            report_timing(name, elapsed)
+
+    def to_dict(self) -> Dict[str, float]:
+        """Stage timings in seconds, rounded for JSON output."""
+        return {name: round(seconds, 3) for name, seconds in self.timings.items()}
+
+    def report(self) -> Dict:
+        """
+        Fields to merge into a result: 'timings', 'peak_rss_mb' (peak RSS of
+        the process during this call's stages) and 'peak_rss_delta_mb' (that
+        peak minus the RSS when the first stage started).
+
+        Also emits a 'total' TIMING event carrying all of them.
+        """
+        fields = {'timings': self.to_dict(), **self.memory.report()}
+        report_timing('total', time.perf_counter() - self._start, **fields)
+        return fields
 
 
 class STTBackend(ABC):
     """Abstract base class for Speech-to-Text backends."""
 
+    # Whether transcribe() honours the quantize option (see quantization.py)
+    SUPPORTS_QUANTIZE = False
+
     def __init__(self):
         self.name = self.__class__.__name__.replace('Backend', '')
 
@@ -42,6 +163,9 @@ class STTBackend(ABC):
             audio_path: Path to audio file
             model_name: Name of model to use
             **kwargs: Additional backend-specific options
+                - audio: Already-decoded 16 kHz float32 samples of `audio_path`
+                  (skips decoding, e.g. when comparing several models)
+                - vad: Transcribe only detected speech (see `_transcribe_speech_only`)
 
         Returns:
             Dictionary with:
@@ -54,6 +178,228 @@ class STTBackend(ABC):
         """
         pass
 
+    def _size_hint(self, model_name: str) -> Optional[int]:
+        """Expected resident size of a model (its listed size), for the model registry."""
+        info = getattr(self, 'MODELS', {}).get(model_name)
+        return info.size_bytes if info else None
+
+    def _load_audio(self, audio_path: str, timer: Optional['StageTimer'] = None, audio=None):
+        """Decoded 16 kHz samples of `audio_path`, unless the caller already passed them as `audio`."""
+        if audio is not None:
+            return audio
+        from audio import load_audio
+        return load_audio(audio_path, timer=timer)
+
+    def _transcribe_speech_only(self, audio_path: str, model_name: str, **kwargs) -> Dict:
+        """
+        Run `transcribe` on the speech regions of a file only.
+
+        Backends call this from `transcribe` when the 'vad' option is set.
+        Silence is cut out with an energy VAD, the speech regions are
+        joined with a short pause (vad.GAP_MS) and transcribed in one pass, and segment timestamps are mapped back to
+        the original timeline. If no speech is detected the whole file is
+        transcribed.
+        """
+        from vad import SpeechTimeline, speech_regions
+
+        start_time = time.time()
+        timer = StageTimer()
+        try:
+            audio = self._load_audio(audio_path, timer, kwargs.pop('audio', None))
+            with timer.stage('vad'):
+                timeline = SpeechTimeline(speech_regions(audio), len(audio))
+                if timeline.regions:
+                    audio = timeline.compact(audio)
+                else:
+                    timeline = SpeechTimeline([(0, len(audio))], len(audio))
+        except Exception as e:
+            return {
+                'text': '',
+                'processing_time': round(time.time() - start_time, 2),
+                'error': str(e),
+                'model': model_name
+            }
+
+        stats = timeline.stats()
+        print(f"[INFO] VAD: {stats['regions']} speech region(s), "
+              f"skipping {stats['skipped_fraction']:.0%} of the audio", file=sys.stderr)
+
+        kwargs['vad'] = False
+        result = self.transcribe(audio_path, model_name, audio=audio, **kwargs)
+        if 'error' in result:
+            return result
+
+        timeline.remap_segments(result.get('segments') or [])
+        result['vad'] = stats
+        result['processing_time'] = round(time.time() - start_time, 2)
+        result['timings'] = {**result.get('timings', {}), **timer.to_dict()}
+        return result
+
+    def transcribe_batch(self, audio_paths: List[str], model_name: str,
+                         batch_size: int = 1, max_batch_seconds: Optional[float] = None,
+                         **kwargs) -> Iterator[Dict]:
+        """
+        Transcribe several files with a single model load.
+
+        The default runs files one at a time through `transcribe` (the model
+        stays cached in the registry), decoding the next files on a thread
+        pool while the current one is transcribed (see `pipelining.py`);
+        backends that can run padded batches override this.
+
+        Args:
+            audio_paths: Paths of audio files
+            model_name: Name of model to use
+            batch_size: Maximum number of files per forward pass
+            max_batch_seconds: Padded audio seconds per batch (unused when
+                files run one at a time)
+            **kwargs: Passed to `transcribe`; decode_workers sets the
+                decode thread count
+
+        Yields:
+            One `transcribe` result per file as it completes, with extra
+            'audio_path' and 'index' (position in `audio_paths`) keys
+        """
+        from audio import load_audio
+        from pipelining import DEFAULT_DECODE_WORKERS, run_pipelined
+
+        decode_workers = int(kwargs.pop('decode_workers', DEFAULT_DECODE_WORKERS))
+
+        def decode(index):
+            timer = StageTimer()
+            return load_audio(audio_paths[index], timer=timer), timer.to_dict()
+
+        def infer(index, decoded):
+            audio, decode_timings = decoded
+            result = self.transcribe(audio_paths[index], model_name, audio=audio, **kwargs)
+            # Decoding happened off the model thread; still report what it cost
+            result['timings'] = {**decode_timings, **result.get('timings', {})}
+            return result
+
+        def postprocess(index, result, error):
+            if error is not None:
+                result = {
+                    'text': '',
+                    'processing_time': 0.0,
+                    'error': str(error),
+                    'model': model_name
+                }
+            result['audio_path'] = audio_paths[index]
+            result['index'] = index
+            return result
+
+        yield from run_pipelined(range(len(audio_paths)), decode, infer, postprocess, decode_workers)
+
+    def _transcribe_in_batches(self, audio_paths: List[str], model_name: str, backend: str,
+                               infer_batch: Callable, batch_size: int,
+                               max_batch_duration: Optional[float] = None,
+                               max_batch_seconds: Optional[float] = None,
+                               **kwargs) -> Iterator[Dict]:
+        """
+        Shared driver for backends that run padded batches.
+
+        Files are sorted by header duration and grouped so every batch pads
+        to a similar length, then decoded and run one batch at a time. Files
+        longer than `max_batch_duration` go through `transcribe` on their own.
+        With `max_batch_seconds`, batches are formed per length bucket under
+        that padded-audio budget instead of by fixed size.
+
+        Args:
+            audio_paths: Paths of audio files
+            model_name: Name of model to use
+            backend: Backend identifier for error results
+            infer_batch: Callable mapping a list of decoded 16 kHz arrays to a
+                list of partial results (text, model, backend, ...)
+            batch_size: Maximum number of files per batch
+            max_batch_duration: Longest file (seconds) allowed in a batch
+            max_batch_seconds: Padded audio seconds per batch (bucketed scheduling)
+            **kwargs: Passed to `transcribe` for files run on their own
+
+        Yields:
+            Results as in `transcribe_batch`
+        """
+        from audio import load_audio, get_duration
+        from batching import length_sorted_batches, bucketed_batches
+        from pipelining import DEFAULT_DECODE_WORKERS, run_pipelined
+
+        decode_workers = int(kwargs.pop('decode_workers', DEFAULT_DECODE_WORKERS))
+
+        def failed(index, error, processing_time=0.0):
+            return {
+                'text': '',
+                'processing_time': round(processing_time, 2),
+                'error': str(error),
+                'model': model_name,
+                'backend': backend,
+                'audio_path': audio_paths[index],
+                'index': index
+            }
+
+        durations = {}
+        for index, audio_path in enumerate(audio_paths):
+            try:
+                durations[index] = get_duration(audio_path)
+            except Exception as e:
+                yield failed(index, e)
+
+        single = [i for i, d in durations.items() if max_batch_duration and d > max_batch_duration]
+        batched = {i: d for i, d in durations.items() if i not in single}
+
+        if max_batch_seconds:
+            batches = bucketed_batches(batched, max_batch_seconds, batch_size)
+        else:
+            batches = length_sorted_batches(batched, batch_size)
+
+        # Batches are decoded on a thread pool while the previous batch runs
+        def decode_batch(batch):
+            timer = StageTimer()
+            indices, audios, errors = [], [], []
+            for index in batch:
+                try:
+                    audios.append(load_audio(audio_paths[index], timer=timer))
+                    indices.append(index)
+                except Exception as e:
+                    errors.append(failed(index, e))
+            return timer, indices, audios, errors
+
+        def run_batch(batch, decoded):
+            timer, indices, audios, errors = decoded
+            if not audios:
+                return decoded, [], 0.0
+            start_time = time.time()
+            with timer.stage('inference'):
+                outputs = infer_batch(audios)
+            return decoded, outputs, time.time() - start_time
+
+        def assemble(batch, ran, error):
+            if error is not None:
+                return [failed(index, error) for index in batch]
+            (timer, indices, audios, errors), outputs, elapsed = ran
+            if not audios:
+                return errors
+
+            # Decode and inference time of the batch, shared evenly between its files
+            elapsed += sum(timer.timings.get(stage, 0.0) for stage in ('decode_audio', 'resample'))
+            padded = len(audios) * max(len(audio) for audio in audios)
+            padding = 1 - sum(len(audio) for audio in audios) / padded if padded else 0.0
+            batch_fields = timer.report()
+            for index, output in zip(indices, outputs):
+                output.update(batch_fields)
+                output['processing_time'] = round(elapsed / len(indices), 2)
+                output['batch_size'] = len(indices)
+                output['batch_padding'] = round(padding, 3)
+                output['audio_path'] = audio_paths[index]
+                output['index'] = index
+            return errors + outputs
+
+        for results in run_pipelined(batches, decode_batch, run_batch, assemble, decode_workers):
+            yield from results
+
+        for index in single:
+            result = self.transcribe(audio_paths[index], model_name, **kwargs)
+            result['audio_path'] = audio_paths[index]
+            result['index'] = index
+            yield result
+
     @abstractmethod
     def list_models(self) -> List[Dict]:
         """
@@ -88,6 +434,54 @@ class STTBackend(ABC):
             "Models will be downloaded automatically on first use."
         )
 
+    def preload(self, model_name: str, **kwargs) -> None:
+        """
+        Load a model into the registry before any file is transcribed.
+
+        Transcribes a second of silence with the given options, so the model
+        is cached under the same registry key a real transcription uses and
+        lazily built state (kernels, caches) is initialized too.
+
+        Args:
+            model_name: Name of model to load
+            **kwargs: Transcription options (engine, quantize, ...)
+        """
+        import numpy as np
+        from audio import SAMPLE_RATE
+
+        kwargs = {**kwargs, 'vad': False}
+        silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+        result = self.transcribe('<preload>', model_name, audio=silence, **kwargs)
+        if 'error' in result:
+            raise RuntimeError(f"Could not load {self.name} model {model_name}: {result['error']}")
+
+    def export_onnx(self, model_name: str, opset: int = 17) -> Dict:
+        """
+        Export a model to ONNX for the onnxruntime engine.
+
+        Args:
+            model_name: Name of model to export
+            opset: ONNX opset version
+
+        Returns:
+            Export details (path, input names, size)
+        """
+        raise NotImplementedError(f"{self.name} backend does not support ONNX export.")
+
+    def create_streamer(self, model_name: str, **kwargs):
+        """
+        Incremental recognizer for live 16 kHz audio (see `streaming.py`).
+
+        Args:
+            model_name: Name of model to use
+            **kwargs: Transcription options plus the streamer's step_s,
+                left_context_s, right_context_s and endpoint_s
+
+        Returns:
+            An object with feed(samples), finish() and stats()
+        """
+        raise NotImplementedError(f"{self.name} backend does not support live streaming.")
+
     def get_info(self) -> Dict:
         """Get information about this backend."""
         return {
@@ -107,29 +501,60 @@ class STTBackend(ABC):
         Returns:
             Dictionary with metrics including RTF (Real-Time Factor)
         """
-        import os
-
-        # Get audio duration (rough estimate from file size)
-        file_size_mb = os.path.getsize(audio_path) / (1024 * 1024)
-        # Rough estimate: 1MB per minute for typical audio
-        estimated_audio_duration = file_size_mb * 60
-
         # Run transcription
         result = self.transcribe(audio_path, model_name)
+        result['benchmark'] = self._benchmark_metrics(audio_path, result)
+        return result
+
+    def _calculate_wer(self, reference: str, hypothesis: str) -> float:
+        """
+        Calculate Word Error Rate (WER) between reference and hypothesis.
+        WER = (S + D + I) / N, see scoring.word_error_rate.
+
+        Returns:
+            WER as percentage (0-100)
+        """
+        from scoring import word_error_rate
+        return word_error_rate(reference, hypothesis)
+
+    def _benchmark_metrics(self, audio_path: str, result: Dict) -> Dict:
+        """
+        Real-time factor metrics for a transcription result.
 
-        # Calculate Real-Time Factor (RTF)
-        # RTF = processing_time / audio_duration
-        # RTF < 1 means faster than real-time
-        rtf = result['processing_time'] / max(estimated_audio_duration, 1)
+        Uses the real audio duration (from the file header where possible)
+        and splits RTF into the stages recorded in result['timings'].
+        RTF = time / audio_duration; RTF < 1 means faster than real-time.
+
+        Args:
+            audio_path: Path to the transcribed audio file
+            result: Result returned by `transcribe`
 
-        result['benchmark'] = {
-            'rtf': round(rtf, 3),
-            'estimated_audio_duration': round(estimated_audio_duration, 2),
-            'throughput': round(estimated_audio_duration / result['processing_time'], 2)
-            if result['processing_time'] > 0 else 0
+        Returns:
+            Dictionary with audio_duration, rtf, rtf_warm (excluding model
+            load), rtf_breakdown per stage and throughput
+        """
+        from audio import get_duration
+
+        audio_duration = get_duration(audio_path)
+        processing_time = result.get('processing_time', 0)
+        timings = result.get('timings', {})
+
+        stages = {
+            'decode_audio': timings.get('decode_audio', 0.0) + timings.get('resample', 0.0),
+            'load_model': timings.get('load_model', 0.0),
+            'inference': timings.get('features', 0.0) + timings.get('inference', 0.0),
         }
+        # Token decoding plus whatever else happened outside the timed stages
+        stages['postprocess'] = max(processing_time - sum(stages.values()), 0.0)
 
-        return result
+        duration = max(audio_duration, 1e-6)
+        return {
+            'audio_duration': round(audio_duration, 2),
+            'rtf': round(processing_time / duration, 3),
+            'rtf_warm': round((processing_time - stages['load_model']) / duration, 3),
+            'rtf_breakdown': {stage: round(seconds / duration, 4) for stage, seconds in stages.items()},
+            'throughput': round(audio_duration / processing_time, 2) if processing_time > 0 else 0
+        }
 
 
 class ModelInfo:
@@ -145,6 +570,14 @@ class ModelInfo:
         self.company = company
         self.installed = False
 
+    @property
+    def size_bytes(self) -> Optional[int]:
+        """Download size ('~1.5GB', '74MB') in bytes, or None if not given."""
+        match = re.fullmatch(r'~?\s*([\d.]+)\s*([KMG]B)', self.size.strip(), re.IGNORECASE)
+        if not match:
+            return None
+        return int(float(match.group(1)) * 1024 ** ('KMG'.index(match.group(2)[0].upper()) + 1))
+
     def to_dict(self) -> Dict:
         return {
             'name': self.name,
@@ -155,3 +588,213 @@ class ModelInfo:
             'company': self.company,
             'installed': self.installed
         }
+
+
+def _current_rss_bytes() -> Optional[int]:
+    """Current resident set size of this process, or None if unavailable."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _estimate_model_bytes(model) -> Optional[int]:
+    """
+    Estimate the memory held by a loaded model from its tensors.
+
+    Understands torch modules, transformers pipelines (via `.model`) and
+    tuples/lists of those (e.g. a model and its processor).
+
+    Returns:
+        Size in bytes, or None if nothing tensor-backed was found
+    """
+    seen = set()
+    total = 0
+    found = False
+
+    def visit(obj):
+        nonlocal total, found
+        if isinstance(obj, (tuple, list)):
+            for item in obj:
+                visit(item)
+        elif hasattr(obj, 'parameters') and hasattr(obj, 'buffers'):
+            found = True
+            for tensor in list(obj.parameters()) + list(obj.buffers()):
+                ptr = tensor.data_ptr()
+                if ptr in seen:
+                    continue  # Tied weights share storage
+                seen.add(ptr)
+                total += tensor.numel() * tensor.element_size()
+        elif hasattr(obj, 'model'):
+            visit(obj.model)
+
+    visit(model)
+    return total if found else None
+
+
+def _default_model_budget() -> int:
+    """
+    Memory budget for resident models in bytes.
+
+    Uses VAI_MODEL_MEMORY_MB if set, otherwise half of physical RAM.
+    """
+    env_budget = os.environ.get('VAI_MODEL_MEMORY_MB')
+    if env_budget:
+        return int(float(env_budget) * 1024 * 1024)
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // 2
+    except (ValueError, OSError, AttributeError):
+        return 8 * 1024 ** 3
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded models shared by all backends.
+
+    Entries are keyed by (backend, model) and evicted least-recently-used
+    first to keep their combined resident size within the memory budget.
+    Room for a model is made before it is loaded, from its size when it was
+    last resident or the caller's estimate, so the budget also bounds peak
+    memory during a load. Backends should not keep their own references to
+    models they get from the registry, otherwise evicted models cannot be
+    freed.
+    """
+
+    def __init__(self, budget_bytes: Optional[int] = None):
+        self.budget_bytes = budget_bytes if budget_bytes is not None else _default_model_budget()
+        self._entries = OrderedDict()  # (backend, model) -> (model, size_bytes)
+        self._loading = {}  # (backend, model) -> (Event set when loaded, estimated bytes)
+        self._sizes = {}  # (backend, model) -> size when last loaded
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Models may be requested from several threads (e.g. runner compare);
+        # the lock guards the bookkeeping only, never a load
+        self._lock = threading.RLock()
+
+    def get(self, backend: str, model_name: str, loader: Callable, size_hint: Optional[int] = None):
+        """
+        Return a resident model, loading it with `loader()` on a miss.
+
+        Loads run outside the registry lock, so other models stay available
+        meanwhile; concurrent requests for a model being loaded wait for
+        that load instead of starting another.
+
+        Args:
+            backend: Backend identifier (e.g. 'whisper')
+            model_name: Model name (plus any variant suffix)
+            loader: Zero-argument callable returning the loaded model
+            size_hint: Expected resident size in bytes, used to make room
+                before the first load
+
+        Returns:
+            Whatever `loader` returned
+        """
+        key = (backend, model_name)
+        while True:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key][0]
+                if key not in self._loading:
+                    self.misses += 1
+                    estimate = self._sizes.get(key, size_hint) or 0
+                    self._evict_over_budget(incoming=estimate)
+                    loaded = threading.Event()
+                    self._loading[key] = (loaded, estimate)
+                    break
+                loaded = self._loading[key][0]
+            # Another thread is loading this model; use its result (or retry if it failed)
+            loaded.wait()
+
+        try:
+            rss_before = _current_rss_bytes()
+            model = loader()
+
+            size = _estimate_model_bytes(model)
+            if size is None:
+                rss_after = _current_rss_bytes()
+                if rss_before is not None and rss_after is not None:
+                    size = max(rss_after - rss_before, 0)
+                else:
+                    size = 0
+
+            with self._lock:
+                self._entries[key] = (model, size)
+                self._sizes[key] = size
+                print(f"[INFO] Model {backend}/{model_name} resident ({size / 1024 ** 2:.0f} MB)", file=sys.stderr)
+                del self._loading[key]
+                # The estimate may have been low
+                self._evict_over_budget(keep=key)
+            return model
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+            loaded.set()
+
+    def resident_bytes(self) -> int:
+        """Combined size of all resident models."""
+        return sum(size for _, size in self._entries.values())
+
+    def evict(self, backend: str, model_name: str) -> bool:
+        """Drop a model from the registry. Returns True if it was resident."""
+        key = (backend, model_name)
+        with self._lock:
+            if key not in self._entries:
+                return False
+            del self._entries[key]
+            self.evictions += 1
+        self._release_memory()
+        return True
+
+    def clear(self) -> None:
+        """Drop all resident models."""
+        with self._lock:
+            self.evictions += len(self._entries)
+            self._entries.clear()
+        self._release_memory()
+
+    def stats(self) -> Dict:
+        """Registry contents and counters."""
+        return {
+            'budget_mb': round(self.budget_bytes / 1024 ** 2, 1),
+            'resident_mb': round(self.resident_bytes() / 1024 ** 2, 1),
+            'models': [
+                {'backend': backend, 'model': model_name, 'size_mb': round(size / 1024 ** 2, 1)}
+                for (backend, model_name), (_, size) in self._entries.items()
+            ],
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+    def _evict_over_budget(self, keep: Optional[Tuple[str, str]] = None, incoming: int = 0) -> None:
+        """
+        Evict least-recently-used entries (never `keep`) until the resident
+        models, the loads in progress and `incoming` more bytes fit the budget.
+        """
+        evicted = False
+        loading = sum(estimate for _, estimate in self._loading.values())
+        while self.resident_bytes() + loading + incoming > self.budget_bytes:
+            key = next((k for k in self._entries if k != keep), None)
+            if key is None:
+                break
+            del self._entries[key]
+            self.evictions += 1
+            evicted = True
+            print(f"[INFO] Evicted model {key[0]}/{key[1]} (memory budget)", file=sys.stderr)
+        if evicted:
+            self._release_memory()
+
+    @staticmethod
+    def _release_memory() -> None:
+        gc.collect()
+        torch = sys.modules.get('torch')
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+
+# Shared by every backend in the process
+model_registry = ModelRegistry()
@@ -0,0 +1,90 @@
+"""
+Batch planning for multi-file transcription.
+Groups clips of similar length so padded batches waste little compute.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Longest item in a bucket may be at most this many times its shortest
+DEFAULT_BUCKET_RATIO = 1.25
+
+
+def length_sorted_batches(lengths: Dict[int, float], batch_size: int) -> List[List[int]]:
+    """
+    Group item indices into batches of neighbours in length order.
+
+    Args:
+        lengths: Mapping of item index to its length (seconds or samples)
+        batch_size: Maximum items per batch
+
+    Returns:
+        List of batches, each a list of item indices, shortest first
+    """
+    order = sorted(lengths, key=lengths.get)
+    batch_size = max(1, batch_size)
+    return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+
+def bucketed_batches(lengths: Dict[int, float], max_batch_length: float,
+                     max_batch_size: Optional[int] = None,
+                     bucket_ratio: float = DEFAULT_BUCKET_RATIO) -> List[List[int]]:
+    """
+    Form batches under a padded-length budget without mixing length buckets.
+
+    Items are sorted by length and cut into buckets whose longest item is at
+    most `bucket_ratio` times the shortest. Each bucket is then filled
+    greedily while `items * longest <= max_batch_length`, i.e. the padded
+    size of the batch stays within budget. An item longer than the budget
+    gets a batch of its own.
+
+    Args:
+        lengths: Mapping of item index to its length (seconds or samples)
+        max_batch_length: Budget for padded batch length (same unit as lengths)
+        max_batch_size: Optional cap on items per batch
+        bucket_ratio: Maximum longest/shortest ratio inside a bucket
+
+    Returns:
+        List of batches, each a list of item indices, shortest first
+    """
+    batches = []
+    batch = []
+    bucket_floor = None
+    for index in sorted(lengths, key=lengths.get):
+        length = lengths[index]
+        if bucket_floor is None or length > bucket_floor * bucket_ratio:
+            # Start a new bucket
+            if batch:
+                batches.append(batch)
+            batch, bucket_floor = [], max(length, 1e-9)
+
+        # Sorted order: the new item is the longest, so it sets the padding
+        over_budget = (len(batch) + 1) * length > max_batch_length
+        over_size = max_batch_size is not None and len(batch) >= max_batch_size
+        if batch and (over_budget or over_size):
+            batches.append(batch)
+            batch = []
+        batch.append(index)
+
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def in_submission_order(results: Iterable[Dict], key: str = 'index') -> Iterator[Dict]:
+    """
+    Re-emit results tagged with their submission index in submission order.
+
+    Each result is released as soon as every earlier one has arrived, so a
+    consumer still sees results stream while only out-of-order ones are held.
+    """
+    pending = {}
+    next_index = 0
+    for result in results:
+        pending[result[key]] = result
+        while next_index in pending:
+            yield pending.pop(next_index)
+            next_index += 1
+
+    # Anything left had a gap before it (e.g. an index that never arrived)
+    for index in sorted(pending):
+        yield pending[index]
@@ -0,0 +1,231 @@
+"""
+Corpus benchmarking for STT backends.
+Runs every sample of a manifest (e.g. test-samples/benchmark-samples.json)
+against one or more models in a single process and aggregates WER, RTF,
+latency percentiles and peak memory per model.
+"""
+
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from base import PeakMemory, StageTimer, model_registry
+
+
+def load_manifest(manifest_path: str) -> List[Dict]:
+    """
+    Load benchmark samples from a manifest file.
+
+    The manifest is either {"samples": [...]} or a bare list. Each sample
+    needs 'audio_path' and 'reference_text'; relative audio paths are
+    resolved against the manifest's directory.
+
+    Returns:
+        List of sample dictionaries with absolute 'audio_path'
+    """
+    with open(manifest_path, 'r') as f:
+        manifest = json.load(f)
+
+    samples = manifest.get('samples', []) if isinstance(manifest, dict) else manifest
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+
+    loaded = []
+    for index, sample in enumerate(samples):
+        if 'audio_path' not in sample or 'reference_text' not in sample:
+            raise ValueError(f"Sample {index} needs 'audio_path' and 'reference_text'")
+        sample = dict(sample)
+        sample.setdefault('id', str(index))
+        sample['audio_path'] = os.path.join(base_dir, os.path.expanduser(sample['audio_path']))
+        loaded.append(sample)
+    return loaded
+
+
+def parse_target(target: str) -> Tuple[str, str]:
+    """Split a 'backend:model' target (model names may contain ':')."""
+    backend_name, sep, model_name = target.partition(':')
+    if not sep or not backend_name or not model_name:
+        raise ValueError(f"Expected <backend>:<model>, got: {target}")
+    return backend_name, model_name
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Linear-interpolated percentile (q in 0-100) of a list of numbers."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _latency_stats(latencies: List[float]) -> Dict:
+    if not latencies:
+        return {}
+    return {
+        'mean': round(sum(latencies) / len(latencies), 3),
+        'p50': round(percentile(latencies, 50), 3),
+        'p90': round(percentile(latencies, 90), 3),
+        'p95': round(percentile(latencies, 95), 3),
+        'p99': round(percentile(latencies, 99), 3),
+        'max': round(max(latencies), 3)
+    }
+
+
+def benchmark_model(backend, backend_name: str, model_name: str, samples: List[Dict], **options) -> Dict:
+    """
+    Benchmark one model on every sample.
+
+    Samples run through a three-stage pipeline: audio is decoded on a thread
+    pool ahead of the model, the model transcribes in this thread, and WER
+    and RTF are computed on a post-processing thread. Per-sample
+    processing_time covers decode and transcription; 'wall_time' and
+    'rtf_wall' show the overlapped throughput.
+
+    Args:
+        options: Transcription options for every sample (e.g. quantize='int8')
+
+    Returns:
+        Per-model summary with corpus WER, RTF, latency percentiles, peak
+        RSS during this model's run (and its increase over the RSS before
+        the run) and the individual sample results, in manifest order
+    """
+    from audio import load_audio
+    from pipelining import run_pipelined
+    from scoring import score_corpus
+
+    def decode(index):
+        sample = samples[index]
+        if not os.path.exists(sample['audio_path']):
+            raise FileNotFoundError(f"Audio file not found: {sample['audio_path']}")
+        timer = StageTimer()
+        return load_audio(sample['audio_path'], timer=timer), timer.to_dict()
+
+    def infer(index, decoded):
+        sample = samples[index]
+        print(f"[INFO] {backend_name}/{model_name}: sample {index + 1}/{len(samples)} ({sample['id']})",
+              file=sys.stderr)
+        audio, decode_timings = decoded
+        result = backend.transcribe(sample['audio_path'], model_name, audio=audio, **options)
+        # Count the (overlapped) decode as part of the sample, as a sequential run would
+        result['timings'] = {**decode_timings, **result.get('timings', {})}
+        result['processing_time'] = round(result.get('processing_time', 0.0) + sum(decode_timings.values()), 2)
+        return result
+
+    def score(index, result, error):
+        sample = samples[index]
+        entry = {'index': index, 'id': sample['id'], 'success': error is None and 'error' not in result}
+        if not entry['success']:
+            entry['error'] = str(error) if error is not None else result['error']
+            return entry
+
+        hypothesis = result['text'].strip()
+        metrics = backend._benchmark_metrics(sample['audio_path'], result)
+        entry.update({
+            'wer': round(backend._calculate_wer(sample['reference_text'], hypothesis), 2),
+            'hypothesis_text': hypothesis,
+            'processing_time': result.get('processing_time', 0.0),
+            'load_model_time': result.get('timings', {}).get('load_model', 0.0),
+            'audio_duration': metrics.get('audio_duration', 0.0),
+            'rtf': metrics.get('rtf')
+        })
+        return entry
+
+    wall_start = time.time()
+    with PeakMemory() as memory:
+        sample_results = list(run_pipelined(range(len(samples)), decode, infer, score))
+    wall_time = time.time() - wall_start
+
+    ok = [r for r in sample_results if r['success']]
+    summary = {
+        'backend': backend_name,
+        'model': model_name,
+        'options': options,
+        'samples': len(samples),
+        'failed': len(samples) - len(ok),
+        **memory.report(),
+        'results': sample_results
+    }
+    if ok:
+        # By manifest position: sample ids need not be unique
+        corpus = score_corpus((samples[r['index']]['reference_text'], r['hypothesis_text']) for r in ok)
+        processing = sum(r['processing_time'] for r in ok)
+        load = sum(r['load_model_time'] for r in ok)
+        audio = sum(r['audio_duration'] for r in ok)
+        summary.update({
+            # Corpus WER: total errors over total reference words
+            'wer': round(corpus['wer'], 2),
+            'errors': {key: corpus[key] for key in ('substitutions', 'deletions', 'insertions', 'reference_words')},
+            'rtf': round(processing / audio, 3) if audio else None,
+            'rtf_warm': round((processing - load) / audio, 3) if audio else None,
+            'model_load_time': round(load, 2),
+            'audio_duration': round(audio, 2),
+            'wall_time': round(wall_time, 2),
+            'rtf_wall': round(wall_time / audio, 3) if audio else None,
+            'latency': _latency_stats([r['processing_time'] for r in ok])
+        })
+    return summary
+
+
+def compare_summaries(baseline: Dict, variant: Dict) -> Dict:
+    """WER delta (percentage points), speedup and memory of `variant` relative to `baseline`."""
+    comparison = {
+        'backend': baseline['backend'],
+        'model': baseline['model'],
+        'options': variant['options'],
+        'wer_baseline': baseline.get('wer'),
+        'wer': variant.get('wer'),
+        'peak_rss_mb': variant['peak_rss_mb'],
+        'peak_rss_delta_mb': variant['peak_rss_delta_mb']
+    }
+    if baseline.get('wer') is not None and variant.get('wer') is not None:
+        comparison['wer_delta'] = round(variant['wer'] - baseline['wer'], 2)
+    if baseline.get('rtf_warm') and variant.get('rtf_warm'):
+        comparison['speedup'] = round(baseline['rtf_warm'] / variant['rtf_warm'], 2)
+    return comparison
+
+
+def run_corpus_benchmark(samples: List[Dict], targets: List[Tuple[str, str]],
+                         get_backend: Callable, compare_quantized: Optional[str] = None) -> Dict:
+    """
+    Benchmark every target model on every sample in one process.
+
+    Args:
+        samples: Samples from `load_manifest`
+        targets: (backend_name, model_name) pairs
+        get_backend: Callable returning a backend instance for a backend name
+        compare_quantized: If set (e.g. 'int8'), also run each target whose
+            backend supports quantization with quantize=<mode> and report
+            its WER delta against fp32 (other targets are skipped)
+
+    Returns:
+        JSON-serialisable report with one summary per model run
+    """
+    start_time = time.time()
+    models = []
+    comparisons = []
+    for backend_name, model_name in targets:
+        backend = get_backend(backend_name)
+        baseline = benchmark_model(backend, backend_name, model_name, samples)
+        models.append(baseline)
+        if compare_quantized and not backend.SUPPORTS_QUANTIZE:
+            print(f"[WARN] {backend_name} does not support quantization; "
+                  f"skipping the {compare_quantized} comparison for {model_name}", file=sys.stderr)
+        elif compare_quantized:
+            # Drop the fp32 model so the quantized run's memory excludes its weights
+            model_registry.evict(backend_name, model_name)
+            quantized = benchmark_model(backend, backend_name, model_name, samples, quantize=compare_quantized)
+            models.append(quantized)
+            comparisons.append(compare_summaries(baseline, quantized))
+
+    report = {
+        'success': all(m['failed'] < m['samples'] for m in models),
+        'samples': len(samples),
+        'models': models,
+        'total_time': round(time.time() - start_time, 2)
+    }
+    if compare_quantized:
+        report['quantization'] = comparisons
+    return report
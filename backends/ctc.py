@@ -0,0 +1,152 @@
+"""
+Windowed CTC inference for long audio.
+Runs a CTC model over overlapping windows and stitches the per-frame
+predictions, so peak memory depends on the window size, not the file length.
+"""
+
+from typing import Callable, Iterable, List, Optional, Tuple
+
+# Defaults match the transformers ASR pipeline's chunking conventions
+DEFAULT_CHUNK_LENGTH_S = 30.0
+DEFAULT_STRIDE_LENGTH_S = 5.0
+
+
+def ctc_windows(num_samples: int, chunk_samples: int,
+                stride_samples: int) -> List[Tuple[int, int, int, int]]:
+    """
+    Plan overlapping inference windows over an audio buffer.
+
+    Each window is at most `chunk_samples` long and carries `stride_samples`
+    of context on either side. Only the centre of each window (the "keep"
+    span) contributes frames, so the model never predicts at a cut edge.
+
+    Args:
+        num_samples: Length of the audio in samples
+        chunk_samples: Window length in samples
+        stride_samples: Context on each side of the kept span, in samples
+
+    Returns:
+        List of (start, end, keep_start, keep_end) sample offsets; the keep
+        spans partition [0, num_samples)
+    """
+    if chunk_samples <= 2 * stride_samples:
+        raise ValueError("chunk length must be more than twice the stride length")
+
+    step = chunk_samples - 2 * stride_samples
+    windows = []
+    keep_start = 0
+    while keep_start < num_samples:
+        keep_end = min(keep_start + step, num_samples)
+        start = max(keep_start - stride_samples, 0)
+        end = min(keep_end + stride_samples, num_samples)
+        windows.append((start, end, keep_start, keep_end))
+        keep_start = keep_end
+    return windows
+
+
+def chunked_ctc_ids(audio, logits_fn: Callable, chunk_samples: int, stride_samples: int,
+                    progress_fn: Optional[Callable[[int, int], None]] = None) -> List[int]:
+    """
+    Greedy CTC predictions for long audio, one window at a time.
+
+    Logits of each window are reduced to argmax ids for its keep span right
+    away, so only one window's logits are ever alive. Blank/repeat collapsing
+    is left to the tokenizer, which then also merges tokens split across a
+    window boundary.
+
+    Args:
+        audio: 1-D array of samples
+        logits_fn: Maps a window of samples to [frames, vocab] logits
+            (torch tensor or numpy array)
+        chunk_samples: Window length in samples
+        stride_samples: Context on each side of the kept span, in samples
+        progress_fn: Optional callback(done_windows, total_windows)
+
+    Returns:
+        Frame-level token ids for the whole buffer
+    """
+    windows = ctc_windows(len(audio), chunk_samples, stride_samples)
+    ids = []
+    for index, (start, end, keep_start, keep_end) in enumerate(windows):
+        logits = logits_fn(audio[start:end])
+        ids.extend(keep_span_ids(logits, start, end, keep_start, keep_end))
+
+        if progress_fn:
+            progress_fn(index + 1, len(windows))
+    return ids
+
+
+def keep_span_ids(logits, start: int, end: int, keep_start: int, keep_end: int) -> List[int]:
+    """Argmax ids of the frames of one window that fall in its keep span."""
+    # Map the keep span from samples to this window's frame axis
+    frames_per_sample = logits.shape[0] / (end - start)
+    first = int(round((keep_start - start) * frames_per_sample))
+    last = int(round((keep_end - start) * frames_per_sample))
+    return logits[first:last].argmax(-1).tolist()
+
+
+def streamed_ctc_ids(blocks: Iterable, logits_fn: Callable, chunk_samples: int, stride_samples: int,
+                     progress_fn: Optional[Callable[[int, int], None]] = None,
+                     total_samples: Optional[int] = None) -> List[int]:
+    """
+    Greedy CTC predictions for audio arriving as a stream of sample blocks.
+
+    Uses the same windows as `chunked_ctc_ids`, but runs each one as soon
+    as its samples (plus right-hand context) have arrived, so inference
+    overlaps decoding. Only the current window's samples are buffered.
+
+    Args:
+        blocks: Iterable of 1-D sample arrays (e.g. `audio.stream_audio`)
+        logits_fn: Maps a window of samples to [frames, vocab] logits
+        chunk_samples: Window length in samples
+        stride_samples: Context on each side of the kept span, in samples
+        progress_fn: Optional callback(done_windows, expected_windows)
+        total_samples: Expected stream length, used only for progress
+
+    Returns:
+        Frame-level token ids for the whole stream
+    """
+    import numpy as np
+
+    if chunk_samples <= 2 * stride_samples:
+        raise ValueError("chunk length must be more than twice the stride length")
+
+    step = chunk_samples - 2 * stride_samples
+    expected = len(ctc_windows(total_samples, chunk_samples, stride_samples)) if total_samples else 0
+
+    blocks = iter(blocks)
+    buffer = np.zeros(0, dtype=np.float32)
+    buffer_start = 0  # stream offset of buffer[0]
+    exhausted = False
+    keep_start = 0
+    done = 0
+    ids = []
+    while True:
+        # Read until this window's keep span and right context are buffered
+        while not exhausted and buffer_start + len(buffer) < keep_start + step + stride_samples:
+            try:
+                buffer = np.concatenate([buffer, next(blocks)])
+            except StopIteration:
+                exhausted = True
+
+        available = buffer_start + len(buffer)
+        if keep_start >= available:
+            break
+
+        keep_end = min(keep_start + step, available)
+        start = max(keep_start - stride_samples, 0)
+        end = min(keep_end + stride_samples, available)
+        logits = logits_fn(buffer[start - buffer_start:end - buffer_start])
+        ids.extend(keep_span_ids(logits, start, end, keep_start, keep_end))
+
+        done += 1
+        if progress_fn:
+            progress_fn(done, max(expected, done))
+
+        # Drop samples no later window needs as left context
+        keep_start = keep_end
+        drop = max(keep_start - stride_samples, 0) - buffer_start
+        if drop > 0:
+            buffer = buffer[drop:]
+            buffer_start += drop
+    return ids
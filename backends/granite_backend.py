@@ -6,14 +6,18 @@ Two-pass architecture: ASR + LLM-based refinement for high accuracy.
 
 import time
 import os
-from typing import Dict, List
-from base import STTBackend, ModelInfo
+from typing import Dict, List, Optional
+from base import STTBackend, ModelInfo, StageTimer, model_registry
 from progress import report_progress
+from audio import pipeline_input
+from quantization import check_quantize_mode, load_quantized
 
 
 class GraniteBackend(STTBackend):
     """IBM Granite speech recognition backend - multilingual with LLM refinement."""
 
+    SUPPORTS_QUANTIZE = True
+
     MODELS = {
         'granite-speech-3.3-8b': ModelInfo(
             'granite-speech-3.3-8b',
@@ -35,12 +39,6 @@ class GraniteBackend(STTBackend):
         'pt': 'Portuguese'
     }
 
-    def __init__(self):
-        super().__init__()
-        self._pipeline = None
-        self._current_model = None
-        self._current_model_name = None
-
     def _load_transformers(self):
         """Lazy load transformers module."""
         try:
@@ -52,56 +50,70 @@ class GraniteBackend(STTBackend):
                 "pip install transformers --break-system-packages"
             )
 
-    def _get_pipeline(self, model_name: str):
+    def _get_pipeline(self, model_name: str, quantize: Optional[str] = None):
         """Load or return cached model pipeline."""
-        if self._current_model_name != model_name:
-            is_downloading = not self.is_model_installed(model_name)
+        key = f'{model_name}@{quantize}' if quantize else model_name
+        return model_registry.get('granite', key, lambda: self._load_model(model_name, quantize),
+                                  self._size_hint(model_name))
 
-            if is_downloading:
-                report_progress(10, f'Downloading {model_name}...', 'downloading')
-            else:
-                report_progress(10, f'Loading {model_name} model...', 'loading_model')
+    def _load_model(self, model_name: str, quantize: Optional[str] = None):
+        """Load a Granite model pipeline (optionally with an int8-quantized model)."""
+        is_downloading = not self.is_model_installed(model_name)
 
-            print(f"Loading Granite model: {model_name}...")
-            pipeline_fn = self._load_transformers()
+        if is_downloading:
+            report_progress(10, f'Downloading {model_name}...', 'downloading')
+        else:
+            report_progress(10, f'Loading {model_name} model...', 'loading_model')
 
-            model_id = f"ibm-granite/{model_name}"
+        print(f"Loading Granite model: {model_name}...")
+        pipeline_fn = self._load_transformers()
 
-            try:
-                if is_downloading:
-                    # Report download progress incrementally (transformers doesn't expose real progress)
-                    report_progress(15, 'Downloading model files from HuggingFace...', 'downloading')
+        model_id = f"ibm-granite/{model_name}"
 
-                # Get HuggingFace token for authentication
-                token = self._get_hf_token()
+        try:
+            if is_downloading:
+                # Report download progress incrementally (transformers doesn't expose real progress)
+                report_progress(15, 'Downloading model files from HuggingFace...', 'downloading')
+
+            # Get HuggingFace token for authentication
+            token = self._get_hf_token()
 
-                self._current_model = pipeline_fn(
+            def load_pipeline(model, **components):
+                return pipeline_fn(
                     "automatic-speech-recognition",
-                    model=model_id,
+                    model=model,
                     device=-1,  # CPU by default, use 0 for CUDA
-                    token=token  # Pass authentication token
+                    token=token,  # Pass authentication token
+                    **components
+                )
+
+            if quantize:
+                # Swap the pipeline's model for its dynamic int8 version
+                model = load_pipeline(load_quantized(
+                    f'granite/{model_name}', model_id, lambda: load_pipeline(model_id).model, token
+                ), tokenizer=model_id, feature_extractor=model_id)
+            else:
+                model = load_pipeline(model_id)
+
+            if is_downloading:
+                report_progress(30, 'Download complete! Model loaded.', 'loaded')
+            else:
+                report_progress(30, 'Model loaded successfully', 'loaded')
+
+            print(f"Granite model {model_name} loaded successfully!")
+        except Exception as e:
+            error_msg = str(e).lower()
+            # Check for authentication errors
+            if '401' in error_msg or '403' in error_msg or 'authentication' in error_msg or 'unauthorized' in error_msg:
+                print(f"Error loading Granite model {model_name}: Authentication failed")
+                raise Exception(
+                    "HuggingFace authentication required. Please add your HuggingFace token in Settings > Advanced Settings > HuggingFace Authentication. "
+                    "Get a free token at https://huggingface.co/settings/tokens"
                 )
-                self._current_model_name = model_name
-
-                if is_downloading:
-                    report_progress(30, 'Download complete! Model loaded.', 'loaded')
-                else:
-                    report_progress(30, 'Model loaded successfully', 'loaded')
-
-                print(f"Granite model {model_name} loaded successfully!")
-            except Exception as e:
-                error_msg = str(e).lower()
-                # Check for authentication errors
-                if '401' in error_msg or '403' in error_msg or 'authentication' in error_msg or 'unauthorized' in error_msg:
-                    print(f"Error loading Granite model {model_name}: Authentication failed")
-                    raise Exception(
-                        "HuggingFace authentication required. Please add your HuggingFace token in Settings > Advanced Settings > HuggingFace Authentication. "
-                        "Get a free token at https://huggingface.co/settings/tokens"
-                    )
-                print(f"Error loading Granite model {model_name}: {e}")
-                raise
-
-        return self._current_model
+            print(f"Error loading Granite model {model_name}: {e}")
+            raise
+
+        return model
 
     def transcribe(self, audio_path: str, model_name: str = 'granite-speech-3.3', **kwargs) -> Dict:
         """
@@ -112,14 +124,21 @@ class GraniteBackend(STTBackend):
             model_name: Granite model to use
             **kwargs: Additional options
                 - language: Language code (en, es, fr, de, pt, auto)
+                - quantize: 'int8' for dynamic int8 quantization of Linear layers (CPU)
+                - vad: Skip silence with an energy VAD; timestamps stay on the original timeline
 
         Returns:
             Dictionary with transcription results
         """
+        if kwargs.get('vad'):
+            return self._transcribe_speech_only(audio_path, model_name, **kwargs)
+
         start_time = time.time()
+        timer = StageTimer()
 
         try:
             report_progress(0, 'Starting transcription...', 'initializing')
+            quantize = check_quantize_mode(kwargs.get('quantize'))
 
             # Get language parameter
             language = kwargs.get('language', 'auto')
@@ -131,58 +150,47 @@ class GraniteBackend(STTBackend):
                 print(f"[DOWNLOAD] Model {model_name} not found in cache. Downloading...")
 
             # Load model pipeline (will download if needed)
-            pipe = self._get_pipeline(model_name)
-
-            # Load and convert audio to WAV if needed (M4A not always supported)
-            import librosa
-            import soundfile as sf
-            import tempfile
+            with timer.stage('load_model'):
+                pipe = self._get_pipeline(model_name, quantize)
 
             report_progress(35, 'Loading audio file...', 'loading_audio')
             print(f"Loading audio file: {audio_path}")
-            # Load audio with librosa (supports M4A via audioread/ffmpeg)
-            audio_data, sample_rate = librosa.load(audio_path, sr=16000, mono=True)
-
-            # Save to temporary WAV file
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp_file:
-                temp_wav_path = tmp_file.name
-                sf.write(temp_wav_path, audio_data, sample_rate)
-
-            try:
-                # Transcribe
-                report_progress(50, 'Transcribing audio...', 'transcribing')
-                print(f"Transcribing with Granite {model_name}...")
-                if language and language != 'auto':
-                    print(f"Language: {self.LANGUAGES.get(language, language)}")
-
-                # Granite uses two-pass architecture internally
-                # First pass: ASR transcription
-                # Second pass: LLM-based refinement
+            # Decoded 16 kHz float32 array is handed straight to the pipeline
+            audio_data = self._load_audio(audio_path, timer, kwargs.pop('audio', None))
+
+            # Transcribe
+            report_progress(50, 'Transcribing audio...', 'transcribing')
+            print(f"Transcribing with Granite {model_name}...")
+            if language and language != 'auto':
+                print(f"Language: {self.LANGUAGES.get(language, language)}")
+
+            # Granite uses two-pass architecture internally
+            # First pass: ASR transcription
+            # Second pass: LLM-based refinement
+            with timer.stage('inference'):
                 result = pipe(
-                    temp_wav_path,
+                    pipeline_input(audio_data),
                     return_timestamps=True  # Get timestamped segments
                 )
 
-                processing_time = time.time() - start_time
+            processing_time = time.time() - start_time
 
-                report_progress(90, 'Processing results...', 'finalizing')
+            report_progress(90, 'Processing results...', 'finalizing')
 
-                # Extract text and segments
-                text = result['text'] if isinstance(result, dict) else result
-                segments = result.get('chunks', []) if isinstance(result, dict) else []
+            # Extract text and segments
+            text = result['text'] if isinstance(result, dict) else result
+            segments = result.get('chunks', []) if isinstance(result, dict) else []
 
-                return {
-                    'text': text.strip(),
-                    'processing_time': round(processing_time, 2),
-                    'segments': segments,
-                    'language': language,
-                    'model': model_name,
-                    'backend': 'granite'
-                }
-            finally:
-                # Clean up temporary file
-                if os.path.exists(temp_wav_path):
-                    os.unlink(temp_wav_path)
+            return {
+                'text': text.strip(),
+                'processing_time': round(processing_time, 2),
+                'segments': segments,
+                'language': language,
+                'model': model_name,
+                'backend': 'granite',
+                'quantize': quantize,
+                **timer.report()
+            }
 
         except Exception as e:
             processing_time = time.time() - start_time
@@ -238,7 +246,7 @@ class GraniteBackend(STTBackend):
             print(f"Error downloading model: {e}")
             raise
 
-    def benchmark(self, audio_path: str, model_name: str, reference_text: str) -> Dict:
+    def benchmark(self, audio_path: str, model_name: str, reference_text: str, **kwargs) -> Dict:
         """
         Benchmark a model by comparing transcription to reference text.
         Calculates Word Error Rate (WER).
@@ -247,12 +255,13 @@ class GraniteBackend(STTBackend):
             audio_path: Path to audio file
             model_name: Model to benchmark
             reference_text: Ground truth text
+            **kwargs: Transcription options (e.g. quantize='int8')
 
         Returns:
             Dictionary with benchmark results including WER
         """
         # Run transcription
-        result = self.transcribe(audio_path, model_name)
+        result = self.transcribe(audio_path, model_name, **kwargs)
 
         if 'error' in result:
             return {
@@ -274,58 +283,11 @@ class GraniteBackend(STTBackend):
             'hypothesis_text': hypothesis,
             'wer': round(wer, 2),
             'processing_time': result['processing_time'],
+            'timings': result.get('timings', {}),
+            'benchmark': self._benchmark_metrics(audio_path, result),
             'language': result.get('language', 'auto')
         }
 
-    def _calculate_wer(self, reference: str, hypothesis: str) -> float:
-        """
-        Calculate Word Error Rate (WER) between reference and hypothesis.
-        WER = (S + D + I) / N
-        where S = substitutions, D = deletions, I = insertions, N = words in reference
-
-        Args:
-            reference: Ground truth text
-            hypothesis: Transcribed text
-
-        Returns:
-            WER as percentage (0-100)
-        """
-        # Normalize texts
-        ref_words = reference.lower().split()
-        hyp_words = hypothesis.lower().split()
-
-        # Calculate edit distance using dynamic programming
-        r_len = len(ref_words)
-        h_len = len(hyp_words)
-
-        # Create DP table
-        dp = [[0 for _ in range(h_len + 1)] for _ in range(r_len + 1)]
-
-        # Initialize first row and column
-        for i in range(r_len + 1):
-            dp[i][0] = i
-        for j in range(h_len + 1):
-            dp[0][j] = j
-
-        # Fill DP table
-        for i in range(1, r_len + 1):
-            for j in range(1, h_len + 1):
-                if ref_words[i-1] == hyp_words[j-1]:
-                    dp[i][j] = dp[i-1][j-1]
-                else:
-                    substitution = dp[i-1][j-1] + 1
-                    insertion = dp[i][j-1] + 1
-                    deletion = dp[i-1][j] + 1
-                    dp[i][j] = min(substitution, insertion, deletion)
-
-        # Calculate WER
-        edit_distance = dp[r_len][h_len]
-        if r_len == 0:
-            return 100.0 if h_len > 0 else 0.0
-
-        wer = (edit_distance / r_len) * 100
-        return wer
-
 
 if __name__ == '__main__':
     # Test the backend
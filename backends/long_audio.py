@@ -0,0 +1,145 @@
+"""
+Windowed generation for long audio with generative (audio-LLM) models.
+Plans overlapping windows, sizes each window's generation budget from its
+duration, and stitches the per-window texts by removing the words the
+overlap made both windows transcribe.
+"""
+
+import math
+import os
+from typing import List, Optional, Tuple
+
+DEFAULT_WINDOW_SECONDS = 30.0
+DEFAULT_OVERLAP_SECONDS = 2.0
+
+# Generous upper bound on speech rate: ~4 words/s at ~1.5 tokens per word
+TOKENS_PER_SECOND = 6.0
+MIN_NEW_TOKENS = 32
+
+# Shortest run of identical words accepted as the overlap between two windows
+MIN_OVERLAP_MATCH = 2
+
+
+def plan_windows(num_samples: int, window_samples: int, overlap_samples: int) -> List[Tuple[int, int]]:
+    """
+    Split an audio buffer into windows that overlap by `overlap_samples`.
+
+    No window is longer than `window_samples` (the model's encoder window):
+    the last window is shifted back to end at `num_samples`, so it may
+    overlap the previous one by more than `overlap_samples`.
+
+    Returns:
+        List of (start, end) sample offsets covering [0, num_samples)
+    """
+    if window_samples <= overlap_samples:
+        raise ValueError("window length must be greater than the overlap")
+    if num_samples <= window_samples:
+        return [(0, num_samples)]
+
+    step = window_samples - overlap_samples
+    windows = []
+    start = 0
+    while start + window_samples < num_samples:
+        windows.append((start, start + window_samples))
+        start += step
+    windows.append((num_samples - window_samples, num_samples))
+    return windows
+
+
+def window_overlaps(windows: List[Tuple[int, int]]) -> List[int]:
+    """Overlap in samples between each pair of consecutive windows."""
+    return [previous_end - start for (_, previous_end), (start, _) in zip(windows, windows[1:])]
+
+
+def token_budget(seconds: float) -> int:
+    """max_new_tokens for transcribing `seconds` of audio."""
+    return max(MIN_NEW_TOKENS, int(math.ceil(seconds * TOKENS_PER_SECOND)))
+
+
+def available_memory_bytes(device: str) -> Optional[int]:
+    """Free memory on `device` ('cuda' or 'cpu'), or None if unknown."""
+    if device == 'cuda':
+        try:
+            import torch
+            return torch.cuda.mem_get_info()[0]
+        except Exception:
+            return None
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_AVPHYS_PAGES')
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def window_batch_size(per_window_bytes: Optional[int], device: str, max_batch: int = 8) -> int:
+    """
+    How many windows to generate together.
+
+    Uses at most half of the currently free memory on `device`; falls back
+    to one window at a time when either figure is unknown.
+    """
+    free = available_memory_bytes(device)
+    if not per_window_bytes or not free:
+        return 1
+    return max(1, min(max_batch, int(free // 2 // per_window_bytes)))
+
+
+def comparable_word(word: str) -> str:
+    """Word as compared across windows: case and surrounding punctuation ignored."""
+    return word.lower().strip('.,!?;:"\'()[]…-')
+
+
+def merge_overlap(left: str, right: str, search_words: int) -> str:
+    """
+    Join two window transcripts whose audio overlapped.
+
+    Looks for the longest run of identical words between the last
+    `search_words` words of `left` and the first `search_words` of `right`
+    and joins the texts at that run, so the overlap is kept once. Words cut
+    at a window edge (which rarely match) fall outside the run and are
+    dropped. Without a run of MIN_OVERLAP_MATCH words the texts are simply
+    concatenated.
+    """
+    left_words, right_words = left.split(), right.split()
+    if not left_words or not right_words:
+        return ' '.join(left_words + right_words)
+
+    tail_start = max(len(left_words) - search_words, 0)
+    tail = [comparable_word(w) for w in left_words[tail_start:]]
+    head = [comparable_word(w) for w in right_words[:search_words]]
+
+    # Longest common run of words (longest common substring over words)
+    best_len, best_tail_end, best_head_end = 0, 0, 0
+    previous = [0] * (len(head) + 1)
+    for i in range(1, len(tail) + 1):
+        current = [0] * (len(head) + 1)
+        for j in range(1, len(head) + 1):
+            if tail[i - 1] and tail[i - 1] == head[j - 1]:
+                current[j] = previous[j - 1] + 1
+                if current[j] > best_len:
+                    best_len, best_tail_end, best_head_end = current[j], i, j
+        previous = current
+
+    if best_len < MIN_OVERLAP_MATCH:
+        return ' '.join(left_words + right_words)
+    return ' '.join(left_words[:tail_start + best_tail_end] + right_words[best_head_end:])
+
+
+def stitch_texts(texts: List[str], overlaps_seconds: List[float]) -> str:
+    """
+    Join consecutive window transcripts, de-duplicating their overlaps.
+
+    `overlaps_seconds` holds the audio overlap before each text after the first.
+    """
+    stitched = texts[0].strip() if texts else ''
+    for text, overlap_seconds in zip(texts[1:], overlaps_seconds):
+        # Search a little beyond what the overlap could hold at a fast speech rate
+        search_words = int(math.ceil(overlap_seconds * 4)) + 4
+        stitched = merge_overlap(stitched, text.strip(), search_words)
+    return stitched
@@ -0,0 +1,141 @@
+"""
+ONNX Runtime inference for CTC models.
+Exports a transformers CTC model (encoder + CTC head) to ONNX with dynamic
+batch/time axes and runs it with onnxruntime on CPU.
+"""
+
+import os
+import sys
+from typing import Dict, Optional
+
+ONNX_DIR = os.path.expanduser('~/.cache/vai-studio/onnx')
+DEFAULT_OPSET = 17
+
+# Execution engines for the CTC backends
+CTC_ENGINES = ('pytorch', 'onnx')
+
+
+def onnx_model_path(backend: str, model_name: str) -> str:
+    """Where the ONNX export of a backend's model lives."""
+    return os.path.join(ONNX_DIR, backend, model_name, 'model.onnx')
+
+
+def has_onnx_export(backend: str, model_name: str) -> bool:
+    """Check whether a model has been exported with `runner.py export-onnx`."""
+    return os.path.exists(onnx_model_path(backend, model_name))
+
+
+def resolve_ctc_engine(backend: str, model_name: str, engine: Optional[str],
+                      quantize: Optional[str] = None) -> str:
+    """
+    Engine to actually run: 'onnx' only when requested and an export exists.
+
+    Falls back to PyTorch (with a warning) when no ONNX export is found.
+    Quantization applies to the PyTorch engine only; the ONNX export runs
+    in fp32, so asking for both is an error.
+    """
+    engine = engine or 'pytorch'
+    if engine not in CTC_ENGINES:
+        raise ValueError(f"Unknown engine: {engine} (choose from {', '.join(CTC_ENGINES)})")
+    if engine == 'onnx' and quantize:
+        raise ValueError(f"quantize={quantize} is not supported with engine=onnx (the ONNX export runs in fp32)")
+    if engine == 'onnx' and not has_onnx_export(backend, model_name):
+        print(f"[WARN] No ONNX export for {backend}/{model_name}; falling back to PyTorch "
+              f"(run: runner.py export-onnx {backend} {model_name})", file=sys.stderr)
+        return 'pytorch'
+    return engine
+
+
+def _load_onnxruntime():
+    """Lazy load onnxruntime."""
+    try:
+        import onnxruntime
+        return onnxruntime
+    except ImportError:
+        raise ImportError(
+            "onnxruntime library not found. Install with: "
+            "pip install onnxruntime --break-system-packages"
+        )
+
+
+def export_ctc_model(model, processor, path: str, sample_rate: int, opset: int = DEFAULT_OPSET) -> Dict:
+    """
+    Export a CTC model to ONNX, with dynamic batch and time axes.
+
+    Args:
+        model: transformers CTC model (returns an object with .logits)
+        processor: Its processor/feature extractor, used to build example inputs
+        path: Output .onnx path
+        sample_rate: Sample rate the processor expects
+        opset: ONNX opset version
+
+    Returns:
+        Export details (path, input names, size)
+    """
+    import numpy as np
+    import torch
+
+    # One second of silence is enough to trace the graph
+    example = processor(np.zeros(sample_rate, dtype=np.float32), sampling_rate=sample_rate, return_tensors="pt")
+    input_names = list(example.keys())
+
+    class LogitsOnly(torch.nn.Module):
+        """Positional-argument wrapper returning only the logits tensor."""
+
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, *tensors):
+            return self.inner(**dict(zip(input_names, tensors))).logits
+
+    dynamic_axes = {name: {0: 'batch', 1: 'time'} for name in input_names}
+    dynamic_axes['logits'] = {0: 'batch', 1: 'frames'}
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    model.eval()
+    try:
+        with torch.no_grad():
+            torch.onnx.export(
+                LogitsOnly(model),
+                tuple(example[name] for name in input_names),
+                tmp_path,
+                input_names=input_names,
+                output_names=['logits'],
+                dynamic_axes=dynamic_axes,
+                opset_version=opset
+            )
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return {
+        'path': path,
+        'inputs': input_names,
+        'opset': opset,
+        'size_mb': round(os.path.getsize(path) / 1024 ** 2, 1)
+    }
+
+
+class OnnxCTCModel:
+    """An onnxruntime CPU session for an exported CTC model."""
+
+    def __init__(self, path: str, num_threads: Optional[int] = None):
+        ort = _load_onnxruntime()
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.inter_op_num_threads = 1
+        if num_threads:
+            options.intra_op_num_threads = int(num_threads)
+
+        print(f"[INFO] Loading ONNX model {path} (intra-op threads: {num_threads or 'default'})", file=sys.stderr)
+        self.session = ort.InferenceSession(path, sess_options=options, providers=['CPUExecutionProvider'])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def logits(self, inputs: Dict):
+        """Run the model on processor outputs (numpy arrays); returns [batch, frames, vocab] logits."""
+        feed = {name: inputs[name] for name in self.input_names}
+        return self.session.run(['logits'], feed)[0]
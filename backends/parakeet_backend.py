@@ -6,14 +6,21 @@ Ultra-fast transcription with FastConformer-XL architecture.
 
 import time
 import os
-from typing import Dict, List
-from base import STTBackend, ModelInfo
+from typing import Dict, Iterator, List, Optional
+from base import STTBackend, ModelInfo, StageTimer, model_registry
 from progress import report_progress
+from audio import SAMPLE_RATE, get_duration, should_stream, stream_audio
+from ctc import chunked_ctc_ids, streamed_ctc_ids, DEFAULT_CHUNK_LENGTH_S, DEFAULT_STRIDE_LENGTH_S
+from quantization import check_quantize_mode, load_quantized
+from onnx_engine import DEFAULT_OPSET, OnnxCTCModel, export_ctc_model, onnx_model_path, resolve_ctc_engine
+from streaming import CTCStreamer, streamer_options
 
 
 class ParakeetBackend(STTBackend):
     """NVIDIA Parakeet speech recognition backend - ultra-fast ASR."""
 
+    SUPPORTS_QUANTIZE = True
+
     MODELS = {
         'parakeet-ctc-0.6b': ModelInfo(
             'parakeet-ctc-0.6b',
@@ -33,12 +40,6 @@ class ParakeetBackend(STTBackend):
         ),
     }
 
-    def __init__(self):
-        super().__init__()
-        self._processor = None
-        self._current_model = None
-        self._current_model_name = None
-
     def _load_transformers(self):
         """Lazy load transformers modules for Parakeet."""
         try:
@@ -51,56 +52,79 @@ class ParakeetBackend(STTBackend):
                 "pip install transformers torch torchaudio --break-system-packages"
             )
 
-    def _get_model(self, model_name: str):
+    def _get_model(self, model_name: str, quantize: Optional[str] = None):
         """Load or return cached Parakeet model using transformers."""
-        if self._current_model_name != model_name:
-            is_downloading = not self.is_model_installed(model_name)
+        key = f'{model_name}@{quantize}' if quantize else model_name
+        return model_registry.get('parakeet', key, lambda: self._load_model(model_name, quantize),
+                                  self._size_hint(model_name))
 
-            if is_downloading:
-                report_progress(10, f'Downloading {model_name}...', 'downloading')
-            else:
-                report_progress(10, f'Loading {model_name} model...', 'loading_model')
+    def _get_onnx_model(self, model_name: str, onnx_threads: Optional[int] = None):
+        """Load or return a cached onnxruntime session and processor for an exported model."""
+        key = f'{model_name}@onnx:{onnx_threads or "default"}'
+        return model_registry.get('parakeet', key, lambda: self._load_onnx_model(model_name, onnx_threads),
+                                  self._size_hint(model_name))
+
+    def _load_onnx_model(self, model_name: str, onnx_threads: Optional[int] = None):
+        """Load an exported Parakeet model into onnxruntime, plus its processor."""
+        AutoProcessor, _, _ = self._load_transformers()
+        processor = AutoProcessor.from_pretrained(f"nvidia/{model_name}", token=self._get_hf_token())
+        return OnnxCTCModel(onnx_model_path('parakeet', model_name), onnx_threads), processor
+
+    def _load_model(self, model_name: str, quantize: Optional[str] = None):
+        """Load a Parakeet model and its processor (optionally int8-quantized) using transformers."""
+        is_downloading = not self.is_model_installed(model_name)
+
+        if is_downloading:
+            report_progress(10, f'Downloading {model_name}...', 'downloading')
+        else:
+            report_progress(10, f'Loading {model_name} model...', 'loading_model')
 
-            print(f"Loading Parakeet model: {model_name}...")
-            AutoProcessor, AutoModelForCTC, torch = self._load_transformers()
+        print(f"Loading Parakeet model: {model_name}...")
+        AutoProcessor, AutoModelForCTC, torch = self._load_transformers()
 
-            model_id = f"nvidia/{model_name}"
+        model_id = f"nvidia/{model_name}"
 
-            try:
-                if is_downloading:
-                    report_progress(15, 'Downloading model files from HuggingFace...', 'downloading')
+        try:
+            if is_downloading:
+                report_progress(15, 'Downloading model files from HuggingFace...', 'downloading')
 
-                # Get HuggingFace token for authentication
-                token = self._get_hf_token()
+            # Get HuggingFace token for authentication
+            token = self._get_hf_token()
 
-                # Load Parakeet model using transformers
-                self._processor = AutoProcessor.from_pretrained(model_id, token=token)
-                self._current_model = AutoModelForCTC.from_pretrained(
+            # Load Parakeet model using transformers
+            processor = AutoProcessor.from_pretrained(model_id, token=token)
+
+            def load_pretrained():
+                return AutoModelForCTC.from_pretrained(
                     model_id,
                     torch_dtype=torch.float32,
                     token=token
                 )
-                self._current_model_name = model_name
 
-                if is_downloading:
-                    report_progress(30, 'Download complete! Model loaded.', 'loaded')
-                else:
-                    report_progress(30, 'Model loaded successfully', 'loaded')
-
-                print(f"Parakeet model {model_name} loaded successfully!")
-            except Exception as e:
-                error_msg = str(e).lower()
-                # Check for authentication errors
-                if '401' in error_msg or '403' in error_msg or 'authentication' in error_msg or 'unauthorized' in error_msg:
-                    print(f"Error loading Parakeet model {model_name}: Authentication failed")
-                    raise Exception(
-                        "HuggingFace authentication required. Please add your HuggingFace token in Settings > Advanced Settings > HuggingFace Authentication. "
-                        "Get a free token at https://huggingface.co/settings/tokens"
-                    )
-                print(f"Error loading Parakeet model {model_name}: {e}")
-                raise
-
-        return self._current_model, self._processor
+            if quantize:
+                model = load_quantized(f'parakeet/{model_name}', model_id, load_pretrained, token)
+            else:
+                model = load_pretrained()
+
+            if is_downloading:
+                report_progress(30, 'Download complete! Model loaded.', 'loaded')
+            else:
+                report_progress(30, 'Model loaded successfully', 'loaded')
+
+            print(f"Parakeet model {model_name} loaded successfully!")
+        except Exception as e:
+            error_msg = str(e).lower()
+            # Check for authentication errors
+            if '401' in error_msg or '403' in error_msg or 'authentication' in error_msg or 'unauthorized' in error_msg:
+                print(f"Error loading Parakeet model {model_name}: Authentication failed")
+                raise Exception(
+                    "HuggingFace authentication required. Please add your HuggingFace token in Settings > Advanced Settings > HuggingFace Authentication. "
+                    "Get a free token at https://huggingface.co/settings/tokens"
+                )
+            print(f"Error loading Parakeet model {model_name}: {e}")
+            raise
+
+        return model, processor
 
     def transcribe(self, audio_path: str, model_name: str = 'parakeet-ctc-0.6b', **kwargs) -> Dict:
         """
@@ -109,15 +133,32 @@ class ParakeetBackend(STTBackend):
         Args:
             audio_path: Path to audio file
             model_name: Parakeet model to use
-            **kwargs: Additional options (currently unused)
+            **kwargs: Additional options
+                - chunk_length_s: Window length for long audio (default 30s, 0 disables chunking)
+                - stride_length_s: Context on each side of a window (default 5s)
+                - quantize: 'int8' for dynamic int8 quantization of Linear layers (CPU, PyTorch engine only)
+                - engine: 'pytorch' (default) or 'onnx' (onnxruntime on CPU; needs export-onnx,
+                  falls back to PyTorch without an export)
+                - onnx_threads: onnxruntime intra-op thread count
+                - stream: Decode incrementally with ffmpeg while inferring (needs chunking);
+                  default streams long recordings that are not in the decoded-audio cache
+                - vad: Skip silence with an energy VAD; timestamps stay on the original timeline
 
         Returns:
             Dictionary with transcription results
         """
+        if kwargs.get('vad'):
+            return self._transcribe_speech_only(audio_path, model_name, **kwargs)
+
         start_time = time.time()
+        timer = StageTimer()
+        chunk_length_s = kwargs.get('chunk_length_s', DEFAULT_CHUNK_LENGTH_S)
+        stride_length_s = kwargs.get('stride_length_s', DEFAULT_STRIDE_LENGTH_S)
 
         try:
             report_progress(0, 'Starting transcription...', 'initializing')
+            quantize = check_quantize_mode(kwargs.get('quantize'))
+            engine = resolve_ctc_engine('parakeet', model_name, kwargs.get('engine'), quantize)
 
             # Check if model needs to be downloaded
             if not self.is_model_installed(model_name):
@@ -126,26 +167,63 @@ class ParakeetBackend(STTBackend):
                 print(f"[DOWNLOAD] Model {model_name} not found in cache. Downloading...")
 
             # Load transformers model and processor (will download if needed)
-            model, processor = self._get_model(model_name)
+            with timer.stage('load_model'):
+                if engine == 'onnx':
+                    model, processor = self._get_onnx_model(model_name, kwargs.get('onnx_threads'))
+                else:
+                    model, processor = self._get_model(model_name, quantize)
 
             # Load audio file
             report_progress(35, 'Loading audio file...', 'loading_audio')
             print(f"Transcribing with Parakeet {model_name}...")
-            import librosa
             import torch
-            audio, sr = librosa.load(audio_path, sr=16000)
+            chunk_samples = int(chunk_length_s * SAMPLE_RATE) if chunk_length_s else 0
+            stride_samples = int(stride_length_s * SAMPLE_RATE)
+            audio = kwargs.pop('audio', None)
+            # Streaming needs chunked inference and a file still to decode
+            stream = kwargs.get('stream')
+            if not chunk_samples or audio is not None:
+                stream = False
+            elif stream is None:
+                stream = should_stream(audio_path)
+            if not stream:
+                audio = self._load_audio(audio_path, timer, audio)
 
-            # Process audio with the processor
             report_progress(50, 'Transcribing audio...', 'transcribing')
-            inputs = processor(audio, sampling_rate=16000, return_tensors="pt")
 
-            # Run inference
-            with torch.no_grad():
-                logits = model(**inputs).logits
+            def chunk_progress(done, total):
+                report_progress(50 + 40 * done / total, f'Transcribing chunk {done}/{total}...', 'transcribing')
+
+            def window_logits(window):
+                # Process audio with the processor
+                with timer.stage('features'):
+                    inputs = processor(window, sampling_rate=SAMPLE_RATE,
+                                       return_tensors="np" if engine == 'onnx' else "pt")
+                # Run inference
+                with timer.stage('inference'), torch.no_grad():
+                    if engine == 'onnx':
+                        return torch.from_numpy(model.logits(inputs)[0])
+                    return model(**inputs).logits[0]
+
+            if stream:
+                # Long recording: infer on each window as soon as ffmpeg has decoded it
+                print(f"Streaming decode of {audio_path}")
+                predicted_ids = torch.tensor([streamed_ctc_ids(
+                    stream_audio(audio_path, timer=timer), window_logits, chunk_samples,
+                    stride_samples, chunk_progress,
+                    total_samples=int(get_duration(audio_path) * SAMPLE_RATE)
+                )])
+            elif chunk_samples and len(audio) > chunk_samples:
+                # Long audio: overlapping windows keep peak memory bounded
+                predicted_ids = torch.tensor([chunked_ctc_ids(
+                    audio, window_logits, chunk_samples, stride_samples, chunk_progress
+                )])
+            else:
+                predicted_ids = window_logits(audio).argmax(dim=-1).unsqueeze(0)
 
             # Decode the predicted tokens
-            predicted_ids = logits.argmax(dim=-1)
-            transcription = processor.batch_decode(predicted_ids)[0]
+            with timer.stage('decode_tokens'):
+                transcription = processor.batch_decode(predicted_ids)[0]
 
             processing_time = time.time() - start_time
 
@@ -156,7 +234,11 @@ class ParakeetBackend(STTBackend):
                 'processing_time': round(processing_time, 2),
                 'language': 'auto',  # Parakeet supports multiple languages
                 'model': model_name,
-                'backend': 'parakeet'
+                'backend': 'parakeet',
+                'engine': engine,
+                'quantize': quantize,
+                'streamed': stream,
+                **timer.report()
             }
 
         except Exception as e:
@@ -169,6 +251,99 @@ class ParakeetBackend(STTBackend):
                 'backend': 'parakeet'
             }
 
+    def transcribe_batch(self, audio_paths: List[str], model_name: str = 'parakeet-ctc-0.6b',
+                         batch_size: int = 8, max_batch_seconds: Optional[float] = None,
+                         **kwargs) -> Iterator[Dict]:
+        """
+        Transcribe many files with one model load, in padded batches.
+
+        Files are grouped by duration so each batch pads to a similar length.
+        Files longer than one chunk use the windowed single-file path.
+
+        Args:
+            audio_paths: Paths of audio files
+            model_name: Parakeet model to use
+            batch_size: Maximum number of files per forward pass
+            max_batch_seconds: If set, schedule length buckets under this
+                padded-audio budget per batch (batch_size still caps items)
+            **kwargs: Same options as `transcribe`
+
+        Yields:
+            One result per file as its batch completes
+        """
+        if kwargs.get('engine') == 'onnx' or kwargs.get('vad'):
+            # ONNX sessions and VAD-trimmed files run one file at a time
+            yield from super().transcribe_batch(audio_paths, model_name, **kwargs)
+            return
+
+        quantize = check_quantize_mode(kwargs.get('quantize'))
+
+        def infer_batch(audios):
+            import torch
+            model, processor = self._get_model(model_name, quantize)
+            inputs = processor(audios, sampling_rate=SAMPLE_RATE, return_tensors="pt", padding=True)
+            with torch.no_grad():
+                predicted_ids = model(**inputs).logits.argmax(dim=-1)
+
+            longest = max(len(audio) for audio in audios)
+            outputs = []
+            for row, audio in zip(predicted_ids, audios):
+                # Drop frames that only cover padding
+                valid = int(round(len(audio) * row.shape[0] / longest))
+                transcription = processor.batch_decode(row[:valid].unsqueeze(0))[0]
+                outputs.append({
+                    'text': transcription.strip(),
+                    'language': 'auto',
+                    'model': model_name,
+                    'backend': 'parakeet',
+                    'quantize': quantize
+                })
+            return outputs
+
+        chunk_length_s = kwargs.get('chunk_length_s', DEFAULT_CHUNK_LENGTH_S)
+        yield from self._transcribe_in_batches(
+            audio_paths, model_name, 'parakeet', infer_batch, batch_size,
+            max_batch_duration=chunk_length_s or None,
+            max_batch_seconds=max_batch_seconds, **kwargs
+        )
+
+    def export_onnx(self, model_name: str, opset: int = DEFAULT_OPSET) -> Dict:
+        """Export a Parakeet model (encoder + CTC head) to ONNX for the 'onnx' engine."""
+        model, processor = self._get_model(model_name)
+        print(f"Exporting Parakeet model {model_name} to ONNX...")
+        return export_ctc_model(model, processor, onnx_model_path('parakeet', model_name), SAMPLE_RATE, opset)
+
+    def create_streamer(self, model_name: str = 'parakeet-ctc-0.6b', **kwargs) -> CTCStreamer:
+        """
+        Incremental CTC recognizer for live audio.
+
+        Takes the quantize/engine/onnx_threads options of `transcribe` plus
+        the streamer's step_s, left_context_s, right_context_s and endpoint_s.
+        """
+        import torch
+
+        quantize = check_quantize_mode(kwargs.get('quantize'))
+        engine = resolve_ctc_engine('parakeet', model_name, kwargs.get('engine'), quantize)
+        if engine == 'onnx':
+            model, processor = self._get_onnx_model(model_name, kwargs.get('onnx_threads'))
+        else:
+            model, processor = self._get_model(model_name, quantize)
+
+        def window_logits(window):
+            inputs = processor(window, sampling_rate=SAMPLE_RATE,
+                               return_tensors="np" if engine == 'onnx' else "pt")
+            with torch.no_grad():
+                if engine == 'onnx':
+                    return torch.from_numpy(model.logits(inputs)[0])
+                return model(**inputs).logits[0]
+
+        return CTCStreamer(
+            window_logits,
+            lambda ids: processor.batch_decode(torch.tensor([ids]))[0],
+            blank_id=getattr(processor.tokenizer, 'pad_token_id', None),
+            **streamer_options(kwargs)
+        )
+
     def list_models(self) -> List[Dict]:
         """List all available Parakeet models."""
         models = []
@@ -210,7 +385,7 @@ class ParakeetBackend(STTBackend):
             print(f"Error downloading model: {e}")
             raise
 
-    def benchmark(self, audio_path: str, model_name: str, reference_text: str) -> Dict:
+    def benchmark(self, audio_path: str, model_name: str, reference_text: str, **kwargs) -> Dict:
         """
         Benchmark a model by comparing transcription to reference text.
         Calculates Word Error Rate (WER).
@@ -219,12 +394,13 @@ class ParakeetBackend(STTBackend):
             audio_path: Path to audio file
             model_name: Model to benchmark
             reference_text: Ground truth text
+            **kwargs: Transcription options (e.g. quantize='int8')
 
         Returns:
             Dictionary with benchmark results including WER
         """
         # Run transcription
-        result = self.transcribe(audio_path, model_name)
+        result = self.transcribe(audio_path, model_name, **kwargs)
 
         if 'error' in result:
             return {
@@ -246,58 +422,11 @@ class ParakeetBackend(STTBackend):
             'hypothesis_text': hypothesis,
             'wer': round(wer, 2),
             'processing_time': result['processing_time'],
+            'timings': result.get('timings', {}),
+            'benchmark': self._benchmark_metrics(audio_path, result),
             'language': result.get('language', 'auto')
         }
 
-    def _calculate_wer(self, reference: str, hypothesis: str) -> float:
-        """
-        Calculate Word Error Rate (WER) between reference and hypothesis.
-        WER = (S + D + I) / N
-        where S = substitutions, D = deletions, I = insertions, N = words in reference
-
-        Args:
-            reference: Ground truth text
-            hypothesis: Transcribed text
-
-        Returns:
-            WER as percentage (0-100)
-        """
-        # Normalize texts
-        ref_words = reference.lower().split()
-        hyp_words = hypothesis.lower().split()
-
-        # Calculate edit distance using dynamic programming
-        r_len = len(ref_words)
-        h_len = len(hyp_words)
-
-        # Create DP table
-        dp = [[0 for _ in range(h_len + 1)] for _ in range(r_len + 1)]
-
-        # Initialize first row and column
-        for i in range(r_len + 1):
-            dp[i][0] = i
-        for j in range(h_len + 1):
-            dp[0][j] = j
-
-        # Fill DP table
-        for i in range(1, r_len + 1):
-            for j in range(1, h_len + 1):
-                if ref_words[i-1] == hyp_words[j-1]:
-                    dp[i][j] = dp[i-1][j-1]
-                else:
-                    substitution = dp[i-1][j-1] + 1
-                    insertion = dp[i][j-1] + 1
-                    deletion = dp[i-1][j] + 1
-                    dp[i][j] = min(substitution, insertion, deletion)
-
-        # Calculate WER
-        edit_distance = dp[r_len][h_len]
-        if r_len == 0:
-            return 100.0 if h_len > 0 else 0.0
-
-        wer = (edit_distance / r_len) * 100
-        return wer
-
 
 if __name__ == '__main__':
     # Test the backend
@@ -0,0 +1,106 @@
+"""
+Three-stage pipeline for batch work: decode, inference, post-processing.
+Audio is decoded by a small thread pool ahead of the model, the model runs
+in the calling thread, and results are assembled (segments, WER, metrics)
+on a separate thread, so decoding file N+1 overlaps inference on file N.
+Bounded queues between the stages cap how much decoded audio is held.
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional
+
+DEFAULT_DECODE_WORKERS = 2
+# Items decoded ahead of the model (each holds a decoded clip or batch in memory)
+DEFAULT_PREFETCH = 2
+
+_DONE = object()
+
+
+def run_pipelined(items: Iterable, decode: Callable, infer: Callable, postprocess: Callable,
+                  decode_workers: int = DEFAULT_DECODE_WORKERS,
+                  prefetch: int = DEFAULT_PREFETCH) -> Iterator:
+    """
+    Run `decode` -> `infer` -> `postprocess` over items, overlapping the stages.
+
+    `decode(item)` runs on a thread pool, at most `prefetch` items ahead of
+    inference. `infer(item, decoded)` runs in the calling thread, in item
+    order, so models never see concurrent calls. `postprocess(item, output,
+    error)` runs on one background thread; `error` is the exception raised
+    by `decode` or `infer` (with `output` None), so every item gets exactly
+    one postprocess call. Its return values are yielded in item order.
+    """
+    decoded_queue = queue.Queue(maxsize=max(1, prefetch))
+    post_queue = queue.Queue(maxsize=max(1, prefetch))
+    results = queue.Queue()
+    stop = threading.Event()
+
+    def submit_decodes(pool):
+        try:
+            for item in items:
+                if stop.is_set():
+                    break
+                # Blocks while `prefetch` decodes are waiting for the model
+                decoded_queue.put((item, pool.submit(decode, item)))
+        finally:
+            decoded_queue.put(_DONE)
+
+    def run_postprocess():
+        while True:
+            entry = post_queue.get()
+            if entry is _DONE:
+                break
+            item, output, error = entry
+            try:
+                results.put((True, postprocess(item, output, error)))
+            except BaseException as e:
+                results.put((False, e))
+        results.put(_DONE)
+
+    def drain(block: bool):
+        while True:
+            try:
+                entry = results.get(block=block)
+            except queue.Empty:
+                return
+            if entry is _DONE:
+                results.put(_DONE)  # Leave the marker for the final drain
+                return
+            ok, value = entry
+            if not ok:
+                raise value
+            yield value
+
+    with ThreadPoolExecutor(max_workers=max(1, decode_workers), thread_name_prefix='decode') as pool:
+        feeder = threading.Thread(target=submit_decodes, args=(pool,), daemon=True)
+        poster = threading.Thread(target=run_postprocess, daemon=True)
+        feeder.start()
+        poster.start()
+        try:
+            while True:
+                entry = decoded_queue.get()
+                if entry is _DONE:
+                    break
+                item, future = entry
+                output, error = None, None
+                try:
+                    output = infer(item, future.result())
+                except Exception as e:
+                    error = e
+                post_queue.put((item, output, error))
+                yield from drain(block=False)
+
+            post_queue.put(_DONE)
+            poster.join()
+            yield from drain(block=False)
+        finally:
+            # Consumer stopped early or a stage failed: let the threads wind down
+            stop.set()
+            while feeder.is_alive():
+                try:
+                    decoded_queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            if poster.is_alive():
+                post_queue.put(_DONE)
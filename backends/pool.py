@@ -0,0 +1,356 @@
+"""
+Worker process pool for transcribing many files in parallel across cores.
+Each worker is pinned to its own slice of CPUs, sizes its thread pools to
+that slice and keeps its model resident, taking files from a shared queue.
+With shared weights the model is loaded once in the parent and the workers
+are forked from it, so they map the same weight pages copy-on-write.
+"""
+
+import gc
+import os
+import queue
+import sys
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# How often the parent checks that workers are still alive while waiting
+_POLL_SECONDS = 1.0
+# How long processes wait for each other before measuring their memory
+_BARRIER_SECONDS = 30.0
+
+# Thread-pool variables read by torch/OpenMP/MKL/CTranslate2 at import time
+_THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS')
+
+# Engines whose native thread pools are created with the model and do not
+# survive fork (the children would wait on threads that no longer exist)
+_UNFORKABLE_ENGINES = ('onnx', 'faster-whisper')
+
+# smaps_rollup fields (kB) summed into each reported figure
+_MEMORY_FIELDS = {
+    'rss_mb': ('Rss',),
+    'pss_mb': ('Pss',),
+    'shared_mb': ('Shared_Clean', 'Shared_Dirty'),
+    'unique_mb': ('Private_Clean', 'Private_Dirty'),
+}
+
+
+def available_cpus() -> List[int]:
+    """CPUs this process may run on."""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def core_slices(workers: int, cpus: Optional[List[int]] = None) -> List[List[int]]:
+    """
+    Split CPUs into `workers` disjoint, contiguous slices of near-equal size.
+
+    Contiguous slices keep a worker's threads on neighbouring cores (and
+    usually the same cache/NUMA domain).
+    """
+    cpus = cpus if cpus is not None else available_cpus()
+    workers = max(1, min(workers, len(cpus)))
+    size, extra = divmod(len(cpus), workers)
+    slices, start = [], 0
+    for worker in range(workers):
+        end = start + size + (1 if worker < extra else 0)
+        slices.append(cpus[start:end])
+        start = end
+    return slices
+
+
+def process_memory(pid='self') -> Optional[Dict[str, float]]:
+    """
+    Resident memory of a process split into unique and shared pages, in MB.
+
+    'unique_mb' is what only this process maps (freed when it exits),
+    'shared_mb' is pages also mapped by other processes (e.g. weights
+    inherited copy-on-write) and 'pss_mb' charges each shared page in equal
+    parts to the processes mapping it, so it sums to their real footprint.
+    None where /proc/<pid>/smaps_rollup is unavailable (non-Linux, or
+    kernels before 4.14).
+    """
+    values = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup', 'r') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                    values[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        return None
+    return {
+        name: round(sum(values.get(field, 0) for field in fields) / 1024, 1)
+        for name, fields in _MEMORY_FIELDS.items()
+    }
+
+
+def _limit_threads(cores: List[int]) -> None:
+    """Pin this process to `cores` and size its compute thread pools to match."""
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cores)
+    for name in _THREAD_ENV_VARS:
+        os.environ[name] = str(len(cores))
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(len(cores))
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # Already set (inter-op pool started)
+
+
+def _worker_main(worker_id: int, cores: List[int], backend, model_name: str,
+                 options: Dict, tasks, results, barrier) -> None:
+    """
+    Worker loop: transcribe (index, path) tasks until a None sentinel.
+
+    `backend` is a backend class (spawned workers load their own model) or
+    the instance the parent preloaded the model with (forked workers).
+    Before exiting the worker reports its memory use, measured once every
+    process of the pool has reached `barrier`.
+    """
+    # Backends print progress to stdout; keep the parent's stdout clean
+    sys.stdout = sys.stderr
+    _limit_threads(cores)
+    if options.get('engine') == 'onnx' and not options.get('onnx_threads'):
+        options = {**options, 'onnx_threads': len(cores)}
+
+    if isinstance(backend, type):
+        backend = backend()
+    while True:
+        task = tasks.get()
+        if task is None:
+            try:
+                barrier.wait(timeout=_BARRIER_SECONDS)
+            except threading.BrokenBarrierError:
+                pass  # Another worker died or the pool was closed; measure anyway
+            results.put(('memory', worker_id, process_memory()))
+            break
+        index, audio_path = task
+        results.put(('started', worker_id, index))
+        try:
+            result = backend.transcribe(audio_path, model_name, **options)
+        except Exception as e:
+            result = {'text': '', 'error': str(e), 'model': model_name}
+        result['audio_path'] = audio_path
+        result['index'] = index
+        result['worker'] = worker_id
+        results.put(('done', worker_id, result))
+
+
+class WorkerPool:
+    """
+    N worker processes, each with its own core slice and resident model.
+
+    By default workers are started with the 'spawn' method, so no thread
+    pools or model state are inherited from the parent, and each loads its
+    own copy of the model. With `share_weights` the parent loads the model
+    once and forks the workers, which then share the weight pages
+    copy-on-write: inference only reads weights, so the pages stay shared
+    and N workers need little more memory than one. Shared weights need
+    fork (Linux), a model on CPU and a torch engine.
+
+    Workers pull files from one shared queue, so a slow file never holds up
+    the others.
+    """
+
+    def __init__(self, backend_class, model_name: str, workers: int,
+                 options: Optional[Dict] = None, cpus: Optional[List[int]] = None,
+                 share_weights: bool = False):
+        self.backend_class = backend_class
+        self.model_name = model_name
+        self.options = dict(options or {})
+        self.slices = core_slices(workers, cpus)
+        self.share_weights = share_weights
+        self.parent_memory = None
+        self.worker_memory = {}  # worker id -> process_memory() at exit
+
+    @property
+    def workers(self) -> int:
+        return len(self.slices)
+
+    def imap(self, audio_paths: Iterable[str]) -> Iterator[Dict]:
+        """
+        Transcribe files across the pool, yielding results as they complete.
+
+        Results carry 'audio_path', 'index' (submission position) and
+        'worker'. A file whose worker dies gets an error result, and files
+        still queued go to the surviving workers. Once every file is done,
+        `memory_report()` describes the workers' memory use.
+        """
+        return self._run(list(audio_paths), one_each=False)
+
+    def run_each(self, audio_path: str) -> List[Dict]:
+        """
+        Transcribe `audio_path` exactly once in every worker.
+
+        Unlike `imap`, no worker can take another's file, so every worker
+        has used its model when `memory_report()` measures it.
+        """
+        return list(self._run([audio_path] * self.workers, one_each=True))
+
+    def _run(self, audio_paths: List[str], one_each: bool) -> Iterator[Dict]:
+        """Run files on the pool; with `one_each`, file i goes to worker i."""
+        import multiprocessing
+
+        if self.share_weights:
+            context = multiprocessing.get_context('fork')
+            backend = self._preload()
+        else:
+            context = multiprocessing.get_context('spawn')
+            backend = self.backend_class
+
+        results = context.Queue()
+        task_queues = [context.Queue() for _ in self.slices] if one_each else [context.Queue()] * self.workers
+        # Workers and the parent measure their memory together, after the last file
+        barrier = context.Barrier(self.workers + 1)
+        processes = []
+        if self.share_weights:
+            # Keep the children's collector from writing to (and so copying)
+            # the pages of objects they inherit
+            gc.freeze()
+        try:
+            for worker_id, cores in enumerate(self.slices):
+                process = context.Process(
+                    target=_worker_main,
+                    args=(worker_id, cores, backend, self.model_name, self.options,
+                          task_queues[worker_id], results, barrier),
+                    daemon=True
+                )
+                process.start()
+                processes.append(process)
+        finally:
+            if self.share_weights:
+                gc.unfreeze()
+        print(f"[INFO] Started {len(processes)} workers on core slices "
+              f"{[f'{c[0]}-{c[-1]}' for c in self.slices]}"
+              f"{' sharing preloaded weights' if self.share_weights else ''}", file=sys.stderr)
+
+        for index, audio_path in enumerate(audio_paths):
+            task_queues[index if one_each else 0].put((index, audio_path))
+        for tasks in task_queues:
+            tasks.put(None)
+
+        in_flight = {}  # worker id -> index of the file it is working on
+        remaining = set(range(len(audio_paths)))
+        try:
+            while remaining:
+                try:
+                    kind, worker_id, payload = results.get(timeout=_POLL_SECONDS)
+                except queue.Empty:
+                    yield from self._reap(processes, in_flight, remaining, audio_paths, one_each)
+                    if not any(process.is_alive() for process in processes):
+                        # Every worker has exited; whatever is left never got a result
+                        for index in sorted(remaining):
+                            yield self._failed(audio_paths, index, 'No result: all workers have exited')
+                        remaining.clear()
+                    continue
+
+                if kind == 'started':
+                    in_flight[worker_id] = payload
+                elif kind == 'memory':
+                    self._record_memory(worker_id, payload)
+                else:
+                    in_flight.pop(worker_id, None)
+                    remaining.discard(payload['index'])
+                    yield payload
+
+            # Measure the parent once the workers are done too (and still alive)
+            if any(process.exitcode not in (None, 0) for process in processes):
+                barrier.abort()
+            try:
+                barrier.wait(timeout=_BARRIER_SECONDS)
+            except threading.BrokenBarrierError:
+                pass
+            self.parent_memory = process_memory()
+            # Workers report their memory on the way out
+            while any(process.is_alive() for process in processes) or not results.empty():
+                try:
+                    kind, worker_id, payload = results.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if kind == 'memory':
+                    self._record_memory(worker_id, payload)
+        finally:
+            # Never leave workers waiting for a parent that stopped early
+            barrier.abort()
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+
+    def memory_report(self) -> Dict:
+        """
+        Unique and shared resident memory (MB) of the parent and each worker.
+
+        The parent and the workers are measured together once all files
+        are done. 'total_pss_mb' approximates the combined footprint of all the
+        processes; 'total_unique_mb' is what they do not share.
+        """
+        processes = [m for m in [self.parent_memory, *self.worker_memory.values()] if m]
+        return {
+            'share_weights': self.share_weights,
+            'parent': self.parent_memory,
+            'workers': [{'worker': worker_id, **memory} for worker_id, memory in sorted(self.worker_memory.items())],
+            'total_unique_mb': round(sum(m['unique_mb'] for m in processes), 1),
+            'total_pss_mb': round(sum(m['pss_mb'] for m in processes), 1)
+        }
+
+    def _record_memory(self, worker_id: int, memory: Optional[Dict]) -> None:
+        if memory:
+            self.worker_memory[worker_id] = memory
+
+    def _preload(self):
+        """Load the model in this process for the forked workers to share."""
+        import multiprocessing
+
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise ValueError("Shared weights need the fork start method, which this platform lacks")
+        engine = self.options.get('engine')
+        if engine in _UNFORKABLE_ENGINES:
+            raise ValueError(f"Shared weights do not support the {engine} engine; "
+                             "run the workers without them")
+
+        try:
+            import torch
+        except ImportError:
+            torch = None
+        if torch is not None:
+            # An OpenMP pool started before fork hangs the children's first
+            # parallel region; load on one thread, workers size their own pools
+            torch.set_num_threads(1)
+
+        print(f"[INFO] Preloading {self.model_name} to share with the workers", file=sys.stderr)
+        backend = self.backend_class()
+        backend.preload(self.model_name, **self.options)
+        if torch is not None and torch.cuda.is_initialized():
+            raise RuntimeError("Shared weights need the model on CPU: CUDA state cannot be forked")
+        return backend
+
+    def _reap(self, processes, in_flight: Dict, remaining: set, audio_paths: List[str],
+              one_each: bool = False) -> Iterator[Dict]:
+        """Fail the in-flight file (with `one_each`, any file) of every worker that died."""
+        for worker_id, process in enumerate(processes):
+            if process.exitcode in (None, 0):
+                continue
+            if worker_id in in_flight:
+                index = in_flight.pop(worker_id)
+            elif one_each and worker_id in remaining:
+                index = worker_id  # Died before starting its file; nobody else will take it
+            else:
+                continue
+            remaining.discard(index)
+            yield self._failed(audio_paths, index, f'Worker {worker_id} exited with code {process.exitcode}')
+
+    def _failed(self, audio_paths: List[str], index: int, error: str) -> Dict:
+        return {
+            'text': '',
+            'processing_time': 0.0,
+            'error': error,
+            'model': self.model_name,
+            'audio_path': audio_paths[index],
+            'index': index
+        }
@@ -43,3 +43,23 @@ def report_processing_progress(current: int, total: int, item_name: str = ''):
         progress = (current / total) * 100
         message = f"Processing {item_name}: {current}/{total}"
         report_progress(progress, message, 'processing')
+
+
+def report_timing(stage: str, seconds: float, **extra):
+    """
+    Report a finished timing span to the parent process via stderr.
+
+    Args:
+        stage: Stage name (e.g., 'load_model', 'decode_audio', 'inference')
+        seconds: Wall-clock duration of the span
+        **extra: Additional JSON-serialisable fields (e.g., all timings)
+    """
+    timing_data = {
+        'type': 'timing',
+        'stage': stage,
+        'seconds': round(seconds, 3),
+        **extra
+    }
+
+    # Output as JSON prefixed with TIMING: (kept apart from PROGRESS: events)
+    print(f"TIMING:{json.dumps(timing_data)}", file=sys.stderr, flush=True)
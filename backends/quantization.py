@@ -0,0 +1,125 @@
+"""
+Dynamic int8 quantization for CPU transformers models.
+Linear layers are quantized after load and the quantized state dict is
+cached on disk (with the generation config), so later starts rebuild the
+model from its config and restore the int8 weights without loading or
+re-quantizing fp32 weights.
+"""
+
+import json
+import os
+import re
+import shutil
+import sys
+from contextlib import nullcontext
+from typing import Callable, Optional
+
+QUANTIZE_MODES = ('int8',)
+QUANTIZED_CACHE_DIR = os.path.expanduser('~/.cache/vai-studio/quantized')
+STATE_DICT_FILE = 'state_dict.pt'
+
+
+def check_quantize_mode(quantize: Optional[str]) -> Optional[str]:
+    """Validate a `quantize` option; returns None when quantization is off."""
+    if not quantize:
+        return None
+    if quantize not in QUANTIZE_MODES:
+        raise ValueError(f"Unsupported quantization mode: {quantize} (choose from {', '.join(QUANTIZE_MODES)})")
+    return quantize
+
+
+def quantize_linear_int8(model):
+    """Apply dynamic int8 quantization to every nn.Linear of `model`, in place."""
+    import torch
+
+    model.eval()
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def _cache_path(cache_name: str) -> str:
+    import torch
+
+    safe_name = re.sub(r'[^A-Za-z0-9._-]+', '--', cache_name)
+    # Packed int8 weights are only portable within a torch version
+    return os.path.join(QUANTIZED_CACHE_DIR, f"{safe_name}--int8--torch-{torch.__version__}")
+
+
+def _no_init_weights():
+    """Skip random weight init when building a model that will be overwritten."""
+    try:
+        from transformers.modeling_utils import no_init_weights
+        return no_init_weights()
+    except ImportError:
+        return nullcontext()
+
+
+def _restore(path: str, model_id: str, token: Optional[str]):
+    """Rebuild a quantized model from its config and a cached state dict."""
+    import torch
+    import transformers
+
+    with open(os.path.join(path, 'model.json'), 'r') as f:
+        model_class = getattr(transformers, json.load(f)['model_class'])
+    # weights_only: the cache directory can only yield tensors, never arbitrary objects
+    state_dict = torch.load(os.path.join(path, STATE_DICT_FILE), map_location='cpu', weights_only=True)
+    config = transformers.AutoConfig.from_pretrained(model_id, token=token)
+
+    with _no_init_weights():
+        model = model_class._from_config(config, torch_dtype=torch.float32)
+    model = quantize_linear_int8(model)
+    model.load_state_dict(state_dict)
+    # _from_config derives generation defaults from the model config, which
+    # can differ from the checkpoint's generation_config.json
+    if os.path.exists(os.path.join(path, 'generation_config.json')):
+        model.generation_config = transformers.GenerationConfig.from_pretrained(path)
+    return model
+
+
+def _save(path: str, model) -> None:
+    """
+    Write the quantized state dict, model class and generation config to a
+    cache directory, atomically (a partial entry is never left behind).
+    """
+    import torch
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(tmp_path, exist_ok=True)
+        torch.save(model.state_dict(), os.path.join(tmp_path, STATE_DICT_FILE))
+        with open(os.path.join(tmp_path, 'model.json'), 'w') as f:
+            json.dump({'model_class': type(model).__name__}, f)
+        if getattr(model, 'generation_config', None) is not None:
+            model.generation_config.save_pretrained(tmp_path)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        if not os.path.isdir(path):
+            print(f"[WARN] Could not cache quantized weights: {e}", file=sys.stderr)
+    finally:
+        # Also reached when another process cached the same model first
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+
+def load_quantized(cache_name: str, model_id: str, load_pretrained: Callable, token: Optional[str] = None):
+    """
+    Return an int8 dynamically quantized model, using the disk cache when possible.
+
+    Args:
+        cache_name: Cache entry name (e.g. 'parakeet/parakeet-ctc-0.6b')
+        model_id: HuggingFace repo id, used to rebuild the model from its config
+        load_pretrained: Zero-argument callable loading the fp32 model on CPU
+        token: HuggingFace token
+
+    Returns:
+        The quantized model in eval mode
+    """
+    path = _cache_path(cache_name)
+    if os.path.isdir(path):
+        try:
+            print(f"[INFO] Restoring int8 weights from {path}", file=sys.stderr)
+            return _restore(path, model_id, token)
+        except Exception as e:
+            print(f"[WARN] Quantized cache unusable ({e}); re-quantizing", file=sys.stderr)
+
+    model = quantize_linear_int8(load_pretrained())
+    _save(path, model)
+    return model
@@ -0,0 +1,227 @@
+"""
+Persistent, content-addressed cache of transcription results.
+Results are keyed by a hash of the decoded audio plus backend, model, task
+and options, so a re-exported or re-opened recording with the same audio
+is answered from disk without loading a model. Long recordings are hashed
+from ffmpeg's PCM stream block by block, so a lookup never holds them in
+memory (nor fills the decoded-audio cache, which would keep backends from
+streaming them).
+"""
+
+import hashlib
+import json
+import os
+import sys
+from typing import Dict, Optional
+
+RESULT_CACHE_DIR = os.path.expanduser('~/.cache/vai-studio/results')
+DEFAULT_RESULT_CACHE_MB = 256
+
+# Options that change how a result is produced/returned but not the result itself
+_UNKEYED_OPTIONS = ('audio', 'no_cache', 'session_cache')
+
+
+def _default_max_bytes() -> int:
+    """Size bound from VAI_RESULT_CACHE_MB, else DEFAULT_RESULT_CACHE_MB."""
+    try:
+        megabytes = float(os.environ.get('VAI_RESULT_CACHE_MB', DEFAULT_RESULT_CACHE_MB))
+    except ValueError:
+        megabytes = DEFAULT_RESULT_CACHE_MB
+    return int(megabytes * 1024 ** 2)
+
+
+def _pcm_digest(blocks, kind: str) -> str:
+    from audio import SAMPLE_RATE
+
+    digest = hashlib.sha256(f"{kind}-{SAMPLE_RATE}:".encode())
+    for block in blocks:
+        digest.update(block.tobytes())
+    return digest.hexdigest()
+
+
+def pcm_hash(audio) -> str:
+    """SHA-256 of decoded 16 kHz float32 samples."""
+    return _pcm_digest([audio], 'pcm-f32')
+
+
+def streamed_pcm_hash(blocks) -> str:
+    """SHA-256 of 16 kHz samples decoded block by block by `audio.stream_audio`."""
+    # ffmpeg's 16-bit PCM differs slightly from librosa's decode: keep the keys apart
+    return _pcm_digest(blocks, 'pcm-s16')
+
+
+def _write_json(path: str, data) -> None:
+    """Write JSON atomically so concurrent readers never see a partial file."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: str):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class ResultCache:
+    """
+    On-disk LRU cache of transcription results.
+
+    Each entry is one JSON file; its mtime is bumped on every hit and the
+    least recently used entries are deleted once the cache exceeds its size
+    bound. Audio content hashes are memoised per path+mtime+size, so an
+    unchanged file is never decoded just to look it up again.
+    """
+
+    def __init__(self, cache_dir: str = RESULT_CACHE_DIR, max_bytes: Optional[int] = None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes if max_bytes is not None else _default_max_bytes()
+        self._entries_dir = os.path.join(cache_dir, 'entries')
+        self._hashes_dir = os.path.join(cache_dir, 'audio-hashes')
+        self._stats_path = os.path.join(cache_dir, 'stats.json')
+
+    def _ensure_dirs(self) -> None:
+        os.makedirs(self._entries_dir, exist_ok=True)
+        os.makedirs(self._hashes_dir, exist_ok=True)
+
+    def audio_hash(self, audio_path: str) -> str:
+        """
+        SHA-256 of the decoded 16 kHz PCM of a file.
+
+        The hash is memoised by absolute path, mtime and size; only a new
+        or modified file is decoded. Long files (see `audio.streamable`)
+        are hashed from the ffmpeg stream; that choice does not depend on
+        the decoded-audio cache, so a file always gets the same hash.
+        """
+        stat = os.stat(audio_path)
+        file_key = f"{os.path.abspath(audio_path)}|{stat.st_mtime_ns}|{stat.st_size}"
+        memo_path = os.path.join(self._hashes_dir, hashlib.sha256(file_key.encode()).hexdigest())
+
+        try:
+            with open(memo_path, 'r') as f:
+                return f.read().strip()
+        except OSError:
+            pass
+
+        from audio import load_audio, stream_audio, streamable
+
+        if streamable(audio_path):
+            content_hash = streamed_pcm_hash(stream_audio(audio_path))
+        else:
+            content_hash = pcm_hash(load_audio(audio_path))
+
+        self._ensure_dirs()
+        tmp_path = f"{memo_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(content_hash)
+        os.replace(tmp_path, memo_path)
+        return content_hash
+
+    def key(self, audio_hash: str, backend: str, model_name: str, task: str, options: Dict) -> str:
+        """Cache key for one transcription request."""
+        keyed_options = {k: v for k, v in options.items() if k not in _UNKEYED_OPTIONS}
+        payload = json.dumps({
+            'audio': audio_hash,
+            'backend': backend,
+            'model': model_name,
+            'task': task,
+            'options': keyed_options
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a cached result (and mark it recently used), or None."""
+        path = os.path.join(self._entries_dir, f"{key}.json")
+        result = _read_json(path)
+        self._count('hits' if result is not None else 'misses')
+        if result is not None:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        return result
+
+    def put(self, key: str, result: Dict) -> None:
+        """Store a successful result, then evict down to the size bound."""
+        if 'error' in result:
+            return
+        self._ensure_dirs()
+        try:
+            _write_json(os.path.join(self._entries_dir, f"{key}.json"), result)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"[WARN] Could not cache result: {e}", file=sys.stderr)
+            return
+        self._evict()
+
+    def _entries(self):
+        """(mtime, size, path) of every entry, least recently used first."""
+        entries = []
+        if os.path.isdir(self._entries_dir):
+            for name in os.listdir(self._entries_dir):
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(self._entries_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def _evict(self) -> None:
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        if evicted:
+            self._count('evictions', evicted)
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        """Bump a persistent counter (best effort; shared by all processes)."""
+        try:
+            self._ensure_dirs()
+            stats = _read_json(self._stats_path) or {}
+            stats[counter] = stats.get(counter, 0) + amount
+            _write_json(self._stats_path, stats)
+        except OSError:
+            pass
+
+    def stats(self) -> Dict:
+        """Cache size and hit/miss counters."""
+        entries = self._entries()
+        counters = _read_json(self._stats_path) or {}
+        hits, misses = counters.get('hits', 0), counters.get('misses', 0)
+        return {
+            'cache_dir': self.cache_dir,
+            'entries': len(entries),
+            'size_mb': round(sum(size for _, size, _ in entries) / 1024 ** 2, 2),
+            'max_mb': round(self.max_bytes / 1024 ** 2, 1),
+            'hits': hits,
+            'misses': misses,
+            'evictions': counters.get('evictions', 0),
+            'hit_rate': round(hits / (hits + misses), 3) if hits + misses else None
+        }
+
+    def clear(self) -> None:
+        """Delete every cached result and reset the counters."""
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        if os.path.exists(self._stats_path):
+            os.remove(self._stats_path)
+
+
+result_cache = ResultCache()
@@ -2,11 +2,18 @@
 """
 CLI runner for STT backends.
 Called by Electron via subprocess with JSON output.
+
+Besides the one-shot commands, `runner.py serve` starts a long-lived process
+that answers line-delimited JSON-RPC 2.0 requests on stdin/stdout and keeps
+backend instances (and therefore loaded models) resident between requests.
 """
 
 import sys
 import json
 import os
+import contextlib
+import inspect
+import time
 
 # Add current directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -16,6 +23,10 @@ from voxtral_backend import VoxtralBackend
 from parakeet_backend import ParakeetBackend
 from granite_backend import GraniteBackend
 from wav2vec_bert_backend import Wav2VecBERTBackend
+from base import model_registry
+from batching import in_submission_order
+from benchmarking import load_manifest, parse_target, run_corpus_benchmark
+from result_cache import result_cache
 
 
 # Registry of available backends
@@ -27,6 +38,10 @@ BACKENDS = {
     'wav2vec_bert': Wav2VecBERTBackend,
 }
 
+# Backend instances created so far. One-shot commands only ever create one,
+# but in serve mode they (and the models they cache) live across requests.
+_backend_instances = {}
+
 
 def print_json(data):
     """Print data as JSON and flush."""
@@ -39,6 +54,558 @@ def print_error(message):
     print_json({'error': message, 'success': False})
 
 
+def print_json_line(data, stream=None):
+    """Print data as a single line of JSON and flush (for streamed results)."""
+    stream = stream or sys.stdout
+    stream.write(json.dumps(data) + '\n')
+    stream.flush()
+
+
+def _parse_value(value):
+    """Convert a command-line option value to bool/int/float where it looks like one."""
+    if value.lower() in ('true', 'false'):
+        return value.lower() == 'true'
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+def parse_options(args):
+    """
+    Split `--name value` / `--flag` options from positional arguments.
+
+    Option names are converted to keyword style (`--batch-size` -> `batch_size`).
+
+    Returns:
+        (positional, options) tuple
+    """
+    positional, options = [], {}
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg.startswith('--') and len(arg) > 2:
+            key = arg[2:].replace('-', '_')
+            if i + 1 < len(args) and not args[i + 1].startswith('--'):
+                options[key] = _parse_value(args[i + 1])
+                i += 2
+            else:
+                options[key] = True
+                i += 1
+        else:
+            positional.append(arg)
+            i += 1
+    return positional, options
+
+
+def read_file_list(list_path):
+    """Read audio paths, one per line ('-' for stdin); blank lines and # comments are skipped."""
+    if list_path == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(list_path, 'r') as f:
+            lines = f.read().splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.strip().startswith('#')]
+
+
+def get_backend(backend_name):
+    """Return the (cached) backend instance for a backend name."""
+    if backend_name not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend_name}")
+
+    if backend_name not in _backend_instances:
+        _backend_instances[backend_name] = BACKENDS[backend_name]()
+    return _backend_instances[backend_name]
+
+
+def list_backends():
+    """List all available backends with their models."""
+    backends_info = {}
+    for name in BACKENDS:
+        try:
+            backend = get_backend(name)
+            backends_info[name] = {
+                'name': name,
+                'models': backend.list_models(),
+                'available': True
+            }
+        except Exception as e:
+            backends_info[name] = {
+                'name': name,
+                'available': False,
+                'error': str(e)
+            }
+
+    return {
+        'success': True,
+        'backends': backends_info
+    }
+
+
+def list_models(backend_name):
+    """List models for a specific backend."""
+    backend = get_backend(backend_name)
+    return {
+        'success': True,
+        'backend': backend_name,
+        'models': backend.list_models()
+    }
+
+
+def transcribe(backend_name, audio_path, model_name, task='transcribe', no_cache=False, **options):
+    """
+    Transcribe an audio file with the given backend and model.
+
+    Extra options (e.g. engine, compute_type for whisper) are passed through
+    to the backend's transcribe. Results are looked up in the on-disk result
+    cache before any model is loaded, unless `no_cache` is set.
+    """
+    if not os.path.exists(audio_path):
+        raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+    print(f"[INFO] Transcribing: {audio_path}", file=sys.stderr)
+    print(f"[INFO] Backend: {backend_name}", file=sys.stderr)
+    print(f"[INFO] Model: {model_name}", file=sys.stderr)
+
+    cache_key = None
+    if not no_cache:
+        lookup_start = time.time()
+        try:
+            cache_key = result_cache.key(result_cache.audio_hash(audio_path), backend_name, model_name, task, options)
+            cached = result_cache.get(cache_key)
+        except Exception as e:
+            print(f"[WARN] Result cache unavailable: {e}", file=sys.stderr)
+            cache_key, cached = None, None
+        if cached is not None:
+            print("[INFO] Result cache hit", file=sys.stderr)
+            cached.update({
+                'success': True,
+                'cached': True,
+                'cache_lookup_time': round(time.time() - lookup_start, 3)
+            })
+            return cached
+
+    backend = get_backend(backend_name)
+
+    if backend_name == 'voxtral':
+        result = backend.transcribe(audio_path, model_name, task=task, **options)
+    else:
+        result = backend.transcribe(audio_path, model_name, **options)
+
+    if cache_key is not None:
+        result_cache.put(cache_key, result)
+
+    result['success'] = 'error' not in result
+    return result
+
+
+def transcribe_batch(backend_name, model_name, audio_paths, output_stream=None, **options):
+    """
+    Transcribe many files with one model load, streaming one JSON line per file.
+
+    Results are written as each file (or batch) completes (or, with
+    `ordered`, in file-list order), followed by a summary line. Backend prints go to stderr so stdout stays parseable.
+
+    With `workers` > 1, files are spread over a pool of worker processes,
+    each pinned to its own slice of cores with its own resident model (see
+    `pool.WorkerPool`); each worker transcribes one file at a time. With
+    `share_weights` the model is loaded once and shared by the workers, and
+    the summary reports the pool's memory use.
+    """
+    from pool import WorkerPool
+
+    output_stream = output_stream or sys.stdout
+    # Batch planning options are for transcribe_batch, never the per-file transcribe
+    batch_size = int(options.pop('batch_size', 8))
+    max_batch_seconds = options.pop('max_batch_seconds', None)
+    ordered = bool(options.pop('ordered', False))
+    workers = int(options.pop('workers', 1))
+    share_weights = bool(options.pop('share_weights', False))
+
+    print(f"[INFO] Batch transcribing {len(audio_paths)} files", file=sys.stderr)
+    print(f"[INFO] Backend: {backend_name}", file=sys.stderr)
+    print(f"[INFO] Model: {model_name}", file=sys.stderr)
+
+    start_time = time.time()
+    failed = 0
+    pool = None
+    with contextlib.redirect_stdout(sys.stderr):
+        if workers > 1:
+            options.pop('decode_workers', None)  # Workers transcribe one file at a time
+            pool = WorkerPool(BACKENDS[backend_name], model_name, workers, options,
+                              share_weights=share_weights)
+            workers = pool.workers
+            results = pool.imap(audio_paths)
+        else:
+            if max_batch_seconds:
+                options['max_batch_seconds'] = float(max_batch_seconds)
+            results = get_backend(backend_name).transcribe_batch(audio_paths, model_name,
+                                                                 batch_size=batch_size, **options)
+        if ordered:
+            results = in_submission_order(results)
+
+        for result in results:
+            result['success'] = 'error' not in result
+            if not result['success']:
+                failed += 1
+            print_json_line(result, output_stream)
+
+    summary = {
+        'backend': backend_name,
+        'model': model_name,
+        'files': len(audio_paths),
+        'failed': failed,
+        'workers': workers,
+        'total_time': round(time.time() - start_time, 2)
+    }
+    if pool is not None:
+        summary['memory'] = pool.memory_report()
+    print_json_line({'success': failed == 0, 'summary': summary}, output_stream)
+
+
+def memory_report(backend_name, model_name, audio_path, workers=2, share_weights=False, **options):
+    """
+    Measure the memory cost of transcribing with several worker processes.
+
+    Runs a pool of `workers` on exactly one copy of `audio_path` each (see
+    `WorkerPool.run_each`), so every worker has used its model, and reports
+    every process's unique and shared resident memory (see
+    `pool.process_memory`). Run it with and without `share_weights` to see
+    what sharing the model weights saves.
+    """
+    from pool import WorkerPool
+
+    with contextlib.redirect_stdout(sys.stderr):
+        pool = WorkerPool(BACKENDS[backend_name], model_name, int(workers), options,
+                          share_weights=bool(share_weights))
+        results = pool.run_each(audio_path)
+
+    errors = [result['error'] for result in results if 'error' in result]
+    report = {
+        'success': not errors,
+        'backend': backend_name,
+        'model': model_name,
+        'workers': pool.workers,
+        **pool.memory_report()
+    }
+    if errors:
+        report['errors'] = errors
+    return report
+
+
+def compare(audio_path, targets, workers=1, task='transcribe', output_stream=None, **options):
+    """
+    Run several 'backend:model' targets on one file, decoding the audio once.
+
+    With workers=1 the models run one after another (each stays resident in
+    the model registry, within its memory budget); with more workers they
+    run concurrently in a thread pool and share the decoded samples. One
+    JSON line is streamed per model as it finishes, followed by a summary
+    line with pairwise WER and agreement matrices between the transcripts.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from audio import load_audio
+    from scoring import pairwise_wer
+
+    if not os.path.exists(audio_path):
+        raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+    output_stream = output_stream or sys.stdout
+    parsed = [parse_target(target) for target in targets]
+    for backend_name, _ in parsed:
+        if backend_name not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend_name}")
+    # Create backend instances up front so worker threads only share them
+    for backend_name, _ in parsed:
+        get_backend(backend_name)
+
+    print(f"[INFO] Comparing {len(parsed)} model(s) on {audio_path}", file=sys.stderr)
+    start_time = time.time()
+
+    with contextlib.redirect_stdout(sys.stderr):
+        decode_start = time.time()
+        audio = load_audio(audio_path)
+        decode_time = time.time() - decode_start
+
+        def run(index):
+            backend_name, model_name = parsed[index]
+            extra = {'task': task} if backend_name == 'voxtral' else {}
+            try:
+                result = get_backend(backend_name).transcribe(audio_path, model_name, audio=audio, **extra, **options)
+            except Exception as e:
+                result = {'text': '', 'error': str(e), 'model': model_name, 'backend': backend_name}
+            result['success'] = 'error' not in result
+            result['index'] = index
+            return result
+
+        results = [None] * len(parsed)
+        if int(workers) > 1:
+            with ThreadPoolExecutor(max_workers=int(workers)) as pool:
+                for future in as_completed([pool.submit(run, index) for index in range(len(parsed))]):
+                    result = future.result()
+                    results[result['index']] = result
+                    print_json_line(result, output_stream)
+        else:
+            for index in range(len(parsed)):
+                results[index] = run(index)
+                print_json_line(results[index], output_stream)
+
+    matrices = pairwise_wer([r['text'] if r['success'] else None for r in results])
+    print_json_line({
+        'success': all(r['success'] for r in results),
+        'summary': {
+            'audio_path': audio_path,
+            'targets': [f"{backend_name}:{model_name}" for backend_name, model_name in parsed],
+            'decode_time': round(decode_time, 3),
+            'processing_times': [r.get('processing_time') for r in results],
+            'wer_matrix': matrices['wer'],
+            'agreement_matrix': matrices['agreement'],
+            'total_time': round(time.time() - start_time, 2)
+        }
+    }, output_stream)
+
+
+def stream(backend_name, model_name, source='-', output_stream=None, **options):
+    """
+    Transcribe live 16 kHz s16le mono PCM from stdin or a socket.
+
+    One JSON line is written per partial or final hypothesis as audio
+    arrives, followed by a summary line with real-time factor and latency
+    statistics. See `streaming.open_pcm_source` for the source syntax.
+    """
+    from streaming import open_pcm_source, pcm_blocks
+
+    output_stream = output_stream or sys.stdout
+    backend = get_backend(backend_name)
+
+    with contextlib.redirect_stdout(sys.stderr):
+        load_start = time.time()
+        streamer = backend.create_streamer(model_name, **options)
+        load_time = time.time() - load_start
+        print(f"[INFO] Streaming with {backend_name}/{model_name}", file=sys.stderr)
+
+        with open_pcm_source(source) as pcm:
+            for block in pcm_blocks(pcm):
+                for event in streamer.feed(block):
+                    print_json_line(event, output_stream)
+        for event in streamer.finish():
+            print_json_line(event, output_stream)
+
+    print_json_line({
+        'success': True,
+        'summary': {
+            'backend': backend_name,
+            'model': model_name,
+            'load_time': round(load_time, 2),
+            **streamer.stats()
+        }
+    }, output_stream)
+
+
+def benchmark(backend_name, audio_path, model_name, reference_text, **options):
+    """Benchmark one model on one audio file against a reference transcript."""
+    if not os.path.exists(audio_path):
+        raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+    backend = get_backend(backend_name)
+    print(f"[INFO] Benchmarking {backend_name}/{model_name} on {audio_path}", file=sys.stderr)
+    return backend.benchmark(audio_path, model_name, reference_text, **options)
+
+
+def benchmark_corpus(manifest_path, targets, compare_quantized=None):
+    """
+    Benchmark several 'backend:model' targets on every sample of a manifest.
+
+    With `compare_quantized` (e.g. 'int8') each target whose backend supports
+    quantization is also run quantized and the report includes its WER delta
+    against fp32.
+    """
+    samples = load_manifest(manifest_path)
+    parsed = [parse_target(target) for target in targets]
+    for backend_name, _ in parsed:
+        if backend_name not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend_name}")
+
+    print(f"[INFO] Benchmarking {len(parsed)} model(s) on {len(samples)} sample(s)", file=sys.stderr)
+    return run_corpus_benchmark(samples, parsed, get_backend, compare_quantized)
+
+
+def download(backend_name, model_name):
+    """Download (pre-load) a model."""
+    backend = get_backend(backend_name)
+
+    print(f"[INFO] Downloading model: {model_name}", file=sys.stderr)
+    backend.download_model(model_name)
+
+    return {
+        'success': True,
+        'backend': backend_name,
+        'model': model_name,
+        'message': 'Model download initiated'
+    }
+
+
+def export_onnx(backend_name, model_name, opset=17):
+    """Export a CTC model to ONNX so transcribe can run it with engine='onnx'."""
+    backend = get_backend(backend_name)
+
+    print(f"[INFO] Exporting {backend_name}/{model_name} to ONNX", file=sys.stderr)
+    return {
+        'success': True,
+        'backend': backend_name,
+        'model': model_name,
+        **backend.export_onnx(model_name, int(opset))
+    }
+
+
+def cache_stats(clear=False):
+    """Result cache size and hit/miss counters (optionally clearing it first)."""
+    if clear:
+        result_cache.clear()
+    return {
+        'success': True,
+        **result_cache.stats()
+    }
+
+
+def ping():
+    """Health check for serve mode."""
+    return {
+        'success': True,
+        'pid': os.getpid(),
+        'resident_backends': sorted(_backend_instances)
+    }
+
+
+def loaded_models():
+    """Models currently resident in the shared model registry."""
+    return {
+        'success': True,
+        **model_registry.stats()
+    }
+
+
+def unload_model(backend_name, model_name):
+    """Drop a model from the shared model registry."""
+    return {
+        'success': True,
+        'unloaded': model_registry.evict(backend_name, model_name),
+        **model_registry.stats()
+    }
+
+
+# Methods available over JSON-RPC in serve mode
+RPC_METHODS = {
+    'list-backends': list_backends,
+    'list-models': list_models,
+    'transcribe': transcribe,
+    'download': download,
+    'export-onnx': export_onnx,
+    'benchmark': benchmark,
+    'benchmark-corpus': benchmark_corpus,
+    'ping': ping,
+    'loaded-models': loaded_models,
+    'unload-model': unload_model,
+    'cache-stats': cache_stats,
+}
+
+# JSON-RPC 2.0 error codes
+RPC_PARSE_ERROR = -32700
+RPC_INVALID_REQUEST = -32600
+RPC_METHOD_NOT_FOUND = -32601
+RPC_INVALID_PARAMS = -32602
+RPC_INTERNAL_ERROR = -32603
+
+
+def _rpc_error(request_id, code, message):
+    return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}}
+
+
+def handle_rpc_request(request):
+    """
+    Dispatch a single JSON-RPC request object.
+
+    Args:
+        request: Decoded request with 'method', optional 'params' (object or
+            array) and optional 'id'
+
+    Returns:
+        Response dictionary
+    """
+    if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+        return _rpc_error(None, RPC_INVALID_REQUEST, 'Invalid request')
+
+    request_id = request.get('id')
+    method = RPC_METHODS.get(request['method'])
+    if method is None:
+        return _rpc_error(request_id, RPC_METHOD_NOT_FOUND, f"Unknown method: {request['method']}")
+
+    params = request.get('params') or {}
+    if isinstance(params, dict):
+        args, kwargs = [], params
+    elif isinstance(params, list):
+        args, kwargs = params, {}
+    else:
+        return _rpc_error(request_id, RPC_INVALID_PARAMS, 'params must be an object or array')
+
+    try:
+        inspect.signature(method).bind(*args, **kwargs)
+    except TypeError as e:
+        return _rpc_error(request_id, RPC_INVALID_PARAMS, str(e))
+
+    try:
+        result = method(*args, **kwargs)
+    except Exception as e:
+        import traceback
+        print(traceback.format_exc(), file=sys.stderr)
+        return _rpc_error(request_id, RPC_INTERNAL_ERROR, f"Error: {str(e)}")
+
+    return {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+
+
+def serve(input_stream=None, output_stream=None):
+    """
+    Serve JSON-RPC requests, one JSON object per line, until EOF or 'shutdown'.
+
+    Backends print diagnostics to stdout, so stdout is redirected to stderr
+    while a request is handled and responses are written to the original
+    stdout only.
+    """
+    input_stream = input_stream or sys.stdin
+    output_stream = output_stream or sys.stdout
+
+    def send(message):
+        output_stream.write(json.dumps(message) + '\n')
+        output_stream.flush()
+
+    print(f"[INFO] Backend server ready (pid {os.getpid()})", file=sys.stderr)
+    send({'jsonrpc': '2.0', 'method': 'ready', 'params': {'pid': os.getpid()}})
+
+    for line in input_stream:
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            send(_rpc_error(None, RPC_PARSE_ERROR, f"Parse error: {e}"))
+            continue
+
+        if isinstance(request, dict) and request.get('method') == 'shutdown':
+            send({'jsonrpc': '2.0', 'id': request.get('id'), 'result': {'success': True}})
+            break
+
+        with contextlib.redirect_stdout(sys.stderr):
+            response = handle_rpc_request(request)
+
+        # Requests without an id are notifications and get no response
+        if isinstance(request, dict) and 'id' in request:
+            send(response)
+
+
 def main():
     if len(sys.argv) < 2:
         print_error("Usage: runner.py <command> [args...]")
@@ -49,26 +616,7 @@ def main():
     try:
         if command == 'list-backends':
             # List all available backends
-            backends_info = {}
-            for name, BackendClass in BACKENDS.items():
-                try:
-                    backend = BackendClass()
-                    backends_info[name] = {
-                        'name': name,
-                        'models': backend.list_models(),
-                        'available': True
-                    }
-                except Exception as e:
-                    backends_info[name] = {
-                        'name': name,
-                        'available': False,
-                        'error': str(e)
-                    }
-
-            print_json({
-                'success': True,
-                'backends': backends_info
-            })
+            print_json(list_backends())
 
         elif command == 'list-models':
             # List models for a specific backend
@@ -82,27 +630,23 @@ def main():
                 print_error(f"Unknown backend: {backend_name}")
                 sys.exit(1)
 
-            backend = BACKENDS[backend_name]()
-            models = backend.list_models()
-
-            print_json({
-                'success': True,
-                'backend': backend_name,
-                'models': models
-            })
+            print_json(list_models(backend_name))
 
         elif command == 'transcribe':
             # Transcribe audio file
-            if len(sys.argv) < 5:
-                print_error("Usage: runner.py transcribe <backend> <audio_path> <model_name>")
+            args, options = parse_options(sys.argv[2:])
+            if len(args) < 3:
+                print_error("Usage: runner.py transcribe <backend> <audio_path> <model_name> [task] "
+                            "[--engine openai-whisper|faster-whisper|pytorch|onnx] [--compute-type int8|int8_float32] "
+                            "[--onnx-threads N] [--quantize int8] [--window-seconds N] [--no-cache]")
                 sys.exit(1)
 
-            backend_name = sys.argv[2]
-            audio_path = sys.argv[3]
-            model_name = sys.argv[4]
+            backend_name = args[0]
+            audio_path = args[1]
+            model_name = args[2]
 
             # Optional arguments
-            task = sys.argv[5] if len(sys.argv) > 5 else 'transcribe'
+            task = args[3] if len(args) > 3 else 'transcribe'
 
             if backend_name not in BACKENDS:
                 print_error(f"Unknown backend: {backend_name}")
@@ -112,19 +656,93 @@ def main():
                 print_error(f"Audio file not found: {audio_path}")
                 sys.exit(1)
 
-            # Create backend and transcribe
-            backend = BACKENDS[backend_name]()
+            print_json(transcribe(backend_name, audio_path, model_name, task, **options))
+
+        elif command == 'transcribe-batch':
+            # Transcribe a list of files with a single model load
+            args, options = parse_options(sys.argv[2:])
+            if len(args) < 3:
+                print_error("Usage: runner.py transcribe-batch <backend> <model_name> <file_list> "
+                            "[--batch-size N] [--max-batch-seconds S] [--ordered] [--workers N] [--share-weights] "
+                            "[--decode-workers N]")
+                sys.exit(1)
+
+            backend_name, model_name, list_path = args[:3]
+
+            if backend_name not in BACKENDS:
+                print_error(f"Unknown backend: {backend_name}")
+                sys.exit(1)
+
+            transcribe_batch(backend_name, model_name, read_file_list(list_path), **options)
+
+        elif command == 'compare':
+            # Run several models on one file with a single decode
+            args, options = parse_options(sys.argv[2:])
+            if len(args) < 2:
+                print_error("Usage: runner.py compare <audio_path> <backend:model> [<backend:model> ...] "
+                            "[--workers N] [--task transcribe]")
+                sys.exit(1)
+
+            compare(args[0], args[1:], **options)
+
+        elif command == 'stream':
+            # Live transcription of raw PCM from stdin or a socket
+            args, options = parse_options(sys.argv[2:])
+            if len(args) < 2:
+                print_error("Usage: runner.py stream <backend> <model_name> [--source -|tcp://host:port|unix:///path] "
+                            "[--step-s S] [--left-context-s 2] [--right-context-s 0.5] [--endpoint-s 0.8] "
+                            "[--trim-s 10] [--max-buffer-s 20] [--language en]")
+                sys.exit(1)
+
+            backend_name, model_name = args[:2]
+
+            if backend_name not in BACKENDS:
+                print_error(f"Unknown backend: {backend_name}")
+                sys.exit(1)
+
+            stream(backend_name, model_name, **options)
+
+        elif command == 'memory-report':
+            # Per-worker unique vs shared memory of a worker pool
+            args, options = parse_options(sys.argv[2:])
+            if len(args) < 3:
+                print_error("Usage: runner.py memory-report <backend> <model_name> <audio_path> "
+                            "[--workers N] [--share-weights] [--quantize int8]")
+                sys.exit(1)
+
+            backend_name, model_name, audio_path = args[:3]
 
-            print(f"[INFO] Transcribing: {audio_path}", file=sys.stderr)
-            print(f"[INFO] Backend: {backend_name}", file=sys.stderr)
-            print(f"[INFO] Model: {model_name}", file=sys.stderr)
+            if backend_name not in BACKENDS:
+                print_error(f"Unknown backend: {backend_name}")
+                sys.exit(1)
 
-            if backend_name == 'voxtral':
-                result = backend.transcribe(audio_path, model_name, task=task)
+            if not os.path.exists(audio_path):
+                print_error(f"Audio file not found: {audio_path}")
+                sys.exit(1)
+
+            print_json(memory_report(backend_name, model_name, audio_path, **options))
+
+        elif command == 'benchmark':
+            # Single sample (Electron): benchmark <backend> <audio_path> <model_name> <reference_text>
+            # Corpus:                   benchmark <manifest.json> <backend:model> [<backend:model> ...]
+            args, options = parse_options(sys.argv[2:])
+            if len(args) >= 4 and args[0] in BACKENDS:
+                backend_name, audio_path, model_name, reference_text = args[:4]
+                with contextlib.redirect_stdout(sys.stderr):
+                    result = benchmark(backend_name, audio_path, model_name, reference_text, **options)
+            elif len(args) >= 2 and args[0] not in BACKENDS:
+                # A bare --compare-quantized flag means the default int8 mode
+                compare_quantized = options.get('compare_quantized')
+                if compare_quantized is True:
+                    compare_quantized = 'int8'
+                with contextlib.redirect_stdout(sys.stderr):
+                    result = benchmark_corpus(args[0], args[1:], compare_quantized)
             else:
-                result = backend.transcribe(audio_path, model_name)
+                print_error("Usage: runner.py benchmark <backend> <audio_path> <model_name> <reference_text> [--quantize int8]\n"
+                            "       runner.py benchmark <manifest.json> <backend:model> [<backend:model> ...] "
+                            "[--compare-quantized [int8]]")
+                sys.exit(1)
 
-            result['success'] = 'error' not in result
             print_json(result)
 
         elif command == 'download':
@@ -140,21 +758,37 @@ def main():
                 print_error(f"Unknown backend: {backend_name}")
                 sys.exit(1)
 
-            backend = BACKENDS[backend_name]()
+            print_json(download(backend_name, model_name))
 
-            print(f"[INFO] Downloading model: {model_name}", file=sys.stderr)
-            backend.download_model(model_name)
+        elif command == 'export-onnx':
+            # Export a CTC model for the onnxruntime engine
+            args, options = parse_options(sys.argv[2:])
+            if len(args) < 2:
+                print_error("Usage: runner.py export-onnx <backend> <model_name> [--opset 17]")
+                sys.exit(1)
 
-            print_json({
-                'success': True,
-                'backend': backend_name,
-                'model': model_name,
-                'message': 'Model download initiated'
-            })
+            backend_name, model_name = args[:2]
+
+            if backend_name not in BACKENDS:
+                print_error(f"Unknown backend: {backend_name}")
+                sys.exit(1)
+
+            with contextlib.redirect_stdout(sys.stderr):
+                result = export_onnx(backend_name, model_name, options.get('opset', 17))
+            print_json(result)
+
+        elif command == 'cache-stats':
+            # Result cache statistics
+            _, options = parse_options(sys.argv[2:])
+            print_json(cache_stats(bool(options.get('clear', False))))
+
+        elif command == 'serve':
+            # Long-lived JSON-RPC server with resident models
+            serve()
 
         else:
             print_error(f"Unknown command: {command}")
-            print_error("Available commands: list-backends, list-models, transcribe, download")
+            print_error("Available commands: list-backends, list-models, transcribe, transcribe-batch, compare, stream, memory-report, benchmark, download, export-onnx, cache-stats, serve")
             sys.exit(1)
 
     except Exception as e:
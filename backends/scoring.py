@@ -0,0 +1,225 @@
+"""
+Word error rate scoring shared by all backends.
+
+Edit distance is computed one DP row at a time with NumPy, so memory is
+linear in transcript length and the inner loop runs in C. Substitution,
+deletion and insertion counts ride along inside the cost (packed into one
+integer), and alignments use Hirschberg's divide and conquer so they stay
+linear in memory too.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+def normalize(text: str) -> List[str]:
+    """Split text into comparison words (lower-cased, whitespace separated)."""
+    return text.lower().split()
+
+
+def _encode(ref_words: List[str], hyp_words: List[str]):
+    """Map words to integer ids shared by both sequences."""
+    vocab = {}
+    ref_ids = np.fromiter((vocab.setdefault(w, len(vocab)) for w in ref_words), dtype=np.int64, count=len(ref_words))
+    hyp_ids = np.fromiter((vocab.setdefault(w, len(vocab)) for w in hyp_words), dtype=np.int64, count=len(hyp_words))
+    return ref_ids, hyp_ids
+
+
+class _Costs:
+    """
+    Packed edit costs: errors * B^2 + deletions * B + insertions.
+
+    Minimising the packed value minimises the edit distance first and
+    carries deletion/insertion counts of the chosen path along for free.
+    B exceeds any possible count, so the fields never overflow into each
+    other.
+    """
+
+    def __init__(self, n: int, m: int):
+        self.base = n + m + 1
+        # Fall back to Python ints if the packed value could overflow int64
+        self.dtype = np.int64 if self.base ** 3 < 2 ** 62 else object
+        self.substitution = self.base * self.base
+        self.deletion = self.base * self.base + self.base
+        self.insertion = self.base * self.base + 1
+
+    def unpack(self, value) -> Tuple[int, int, int]:
+        """Return (errors, deletions, insertions) from a packed cost."""
+        value = int(value)
+        errors, rest = divmod(value, self.base * self.base)
+        deletions, insertions = divmod(rest, self.base)
+        return errors, deletions, insertions
+
+
+def _last_row(ref_ids, hyp_ids, costs: _Costs):
+    """
+    Last row of the packed edit-distance DP table, keeping only two rows.
+
+    Entry j is the cost of aligning all of `ref_ids` with hyp_ids[:j].
+    """
+    steps = np.arange(len(hyp_ids) + 1, dtype=costs.dtype) * costs.insertion
+    row = steps.copy()
+    for ref_id in ref_ids:
+        diagonal = row[:-1] + np.where(hyp_ids == ref_id, 0, costs.substitution).astype(costs.dtype)
+        candidate = row + costs.deletion
+        candidate[1:] = np.minimum(candidate[1:], diagonal)
+        # Insertions chain along the row: row[j] = min_k(candidate[k] + (j - k) * ins)
+        row = np.minimum.accumulate(candidate - steps) + steps
+    return row
+
+
+def error_counts(ref_words: List[str], hyp_words: List[str]) -> Dict[str, int]:
+    """
+    Count word errors between a reference and a hypothesis.
+
+    Args:
+        ref_words: Reference words
+        hyp_words: Hypothesis words
+
+    Returns:
+        Dictionary with substitutions, deletions, insertions, hits,
+        errors (S + D + I) and reference_words (N)
+    """
+    n, m = len(ref_words), len(hyp_words)
+    costs = _Costs(n, m)
+    ref_ids, hyp_ids = _encode(ref_words, hyp_words)
+    errors, deletions, insertions = costs.unpack(_last_row(ref_ids, hyp_ids, costs)[-1])
+    substitutions = errors - deletions - insertions
+    return {
+        'substitutions': substitutions,
+        'deletions': deletions,
+        'insertions': insertions,
+        'hits': n - substitutions - deletions,
+        'errors': errors,
+        'reference_words': n
+    }
+
+
+def _wer_from_counts(errors: int, reference_words: int, hypothesis_words: int) -> float:
+    if reference_words == 0:
+        return 100.0 if hypothesis_words > 0 else 0.0
+    return errors / reference_words * 100
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """
+    Calculate Word Error Rate (WER) between reference and hypothesis.
+    WER = (S + D + I) / N
+
+    Returns:
+        WER as percentage (0-100+); an empty reference scores 100 if the
+        hypothesis is non-empty, else 0
+    """
+    ref_words, hyp_words = normalize(reference), normalize(hypothesis)
+    counts = error_counts(ref_words, hyp_words)
+    return _wer_from_counts(counts['errors'], len(ref_words), len(hyp_words))
+
+
+def _align(ref_ids, hyp_ids, ref_start: int, hyp_start: int, costs: _Costs,
+           out: List[Tuple[str, Optional[int], Optional[int]]]) -> None:
+    """Hirschberg alignment of id slices, appending (op, ref_index, hyp_index)."""
+    n, m = len(ref_ids), len(hyp_ids)
+    if n == 0:
+        out.extend(('insert', None, hyp_start + j) for j in range(m))
+        return
+    if m == 0:
+        out.extend(('delete', ref_start + i, None) for i in range(n))
+        return
+    if n == 1:
+        matches = np.flatnonzero(hyp_ids == ref_ids[0])
+        # Pair the single reference word with a matching word, else the first one
+        pivot = int(matches[0]) if len(matches) else 0
+        out.extend(('insert', None, hyp_start + j) for j in range(pivot))
+        out.append(('equal' if len(matches) else 'substitute', ref_start, hyp_start + pivot))
+        out.extend(('insert', None, hyp_start + j) for j in range(pivot + 1, m))
+        return
+
+    middle = n // 2
+    forward = _last_row(ref_ids[:middle], hyp_ids, costs)
+    backward = _last_row(ref_ids[middle:][::-1], hyp_ids[::-1], costs)[::-1]
+    split = int(np.argmin(forward + backward))
+
+    _align(ref_ids[:middle], hyp_ids[:split], ref_start, hyp_start, costs, out)
+    _align(ref_ids[middle:], hyp_ids[split:], ref_start + middle, hyp_start + split, costs, out)
+
+
+def align(ref_words: List[str], hyp_words: List[str]) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    """
+    Minimum-edit word alignment in linear memory.
+
+    Returns:
+        List of (op, ref_word, hyp_word) with op one of 'equal',
+        'substitute', 'delete' (ref_word only) or 'insert' (hyp_word only)
+    """
+    costs = _Costs(len(ref_words), len(hyp_words))
+    ref_ids, hyp_ids = _encode(ref_words, hyp_words)
+    ops = []
+    _align(ref_ids, hyp_ids, 0, 0, costs, ops)
+    return [
+        (op,
+         ref_words[i] if i is not None else None,
+         hyp_words[j] if j is not None else None)
+        for op, i, j in ops
+    ]
+
+
+def score(reference: str, hypothesis: str, with_alignment: bool = False) -> Dict:
+    """
+    Score one hypothesis: WER plus S/D/I counts, optionally the alignment.
+    """
+    ref_words, hyp_words = normalize(reference), normalize(hypothesis)
+    result = error_counts(ref_words, hyp_words)
+    result['wer'] = _wer_from_counts(result['errors'], len(ref_words), len(hyp_words))
+    if with_alignment:
+        result['alignment'] = align(ref_words, hyp_words)
+    return result
+
+
+def score_corpus(pairs: Iterable[Tuple[str, str]]) -> Dict:
+    """
+    Score many (reference, hypothesis) pairs.
+
+    Returns:
+        Corpus WER (total errors over total reference words), summed S/D/I
+        counts and the number of pairs
+    """
+    totals = {'substitutions': 0, 'deletions': 0, 'insertions': 0, 'hits': 0,
+              'errors': 0, 'reference_words': 0}
+    hypothesis_words = 0
+    count = 0
+    for reference, hypothesis in pairs:
+        ref_words, hyp_words = normalize(reference), normalize(hypothesis)
+        for key, value in error_counts(ref_words, hyp_words).items():
+            totals[key] += value
+        hypothesis_words += len(hyp_words)
+        count += 1
+
+    totals['wer'] = _wer_from_counts(totals['errors'], totals['reference_words'], hypothesis_words)
+    totals['pairs'] = count
+    return totals
+
+
+def pairwise_wer(texts: List[Optional[str]]) -> Dict[str, List[List[Optional[float]]]]:
+    """
+    Compare several transcripts of the same audio with each other.
+
+    Returns:
+        'wer': matrix[i][j] = WER of text j against text i as reference
+        'agreement': symmetric matrix, 100 * (1 - edit distance / longer length)
+        Entries involving a missing (None) text are None.
+    """
+    words = [normalize(text) if text is not None else None for text in texts]
+    size = len(words)
+    wer = [[None] * size for _ in range(size)]
+    agreement = [[None] * size for _ in range(size)]
+    for i in range(size):
+        for j in range(i, size):
+            if words[i] is None or words[j] is None:
+                continue
+            errors = error_counts(words[i], words[j])['errors'] if i != j else 0
+            wer[i][j] = round(_wer_from_counts(errors, len(words[i]), len(words[j])), 2)
+            wer[j][i] = round(_wer_from_counts(errors, len(words[j]), len(words[i])), 2)
+            longest = max(len(words[i]), len(words[j]))
+            agreement[i][j] = agreement[j][i] = round(100 * (1 - errors / longest), 2) if longest else 100.0
+    return {'wer': wer, 'agreement': agreement}
@@ -0,0 +1,476 @@
+"""
+Live transcription of raw PCM arriving over stdin or a socket.
+CTC models are decoded incrementally (each update re-encodes only the audio
+that is not yet final plus some left context); Whisper re-runs on a sliding
+window and commits what consecutive hypotheses agree on. Both emit partial
+and finalized hypotheses together with their latency.
+"""
+
+import os
+import socket
+import stat
+import sys
+import time
+from collections import deque
+from contextlib import contextmanager, suppress
+from typing import Callable, Dict, Iterator, List, Optional
+
+from audio import SAMPLE_RATE
+from ctc import keep_span_ids
+from long_audio import comparable_word
+
+DEFAULT_STEP_S = 0.5
+DEFAULT_LEFT_CONTEXT_S = 2.0
+DEFAULT_RIGHT_CONTEXT_S = 0.5
+# Trailing silence (blank frames) that ends a segment
+DEFAULT_ENDPOINT_S = 0.8
+# Bytes read per block from the PCM source (20 ms of s16le mono at 16 kHz)
+READ_BYTES = 640
+
+# Local agreement (Whisper): re-run every second, trim the window at a
+# committed segment end past TRIM_S, and never let it grow past MAX_BUFFER_S
+DEFAULT_AGREEMENT_STEP_S = 1.0
+DEFAULT_TRIM_S = 10.0
+DEFAULT_MAX_BUFFER_S = 20.0
+# Committed text passed to Whisper as the prompt of the next run
+PROMPT_CHARS = 200
+# Committed words compared against the start of a new hypothesis for repeats
+MAX_REPEAT_WORDS = 5
+
+# Backend options that configure a streamer rather than the model
+STREAMER_OPTIONS = ('step_s', 'left_context_s', 'right_context_s', 'endpoint_s')
+AGREEMENT_OPTIONS = ('step_s', 'trim_s', 'max_buffer_s')
+
+
+def streamer_options(options: Dict, names=STREAMER_OPTIONS) -> Dict:
+    """The streamer keyword arguments (`names`) among a backend's options."""
+    return {name: float(options[name]) for name in names if options.get(name) is not None}
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(q / 100 * len(ordered)), len(ordered) - 1)]
+
+
+def latency_summary(latencies_ms: List[float]) -> Dict:
+    """Mean/p50/p95/max of a list of latencies in milliseconds."""
+    if not latencies_ms:
+        return {'count': 0}
+    return {
+        'count': len(latencies_ms),
+        'mean': round(sum(latencies_ms) / len(latencies_ms), 1),
+        'p50': round(_percentile(latencies_ms, 50), 1),
+        'p95': round(_percentile(latencies_ms, 95), 1),
+        'max': round(max(latencies_ms), 1)
+    }
+
+
+class _LiveStreamer:
+    """
+    Sample buffer, arrival times and latency bookkeeping shared by the
+    streamers. Subclasses implement `_update` (run when `step_s` of new
+    audio has arrived) and `finish`.
+    """
+
+    def __init__(self, sr: int, step_s: float):
+        import numpy as np
+
+        self.sr = sr
+        self.step = int(step_s * sr)
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._buffer_start = 0      # stream offset of _buffer[0]
+        self._decoded_to = 0        # stream offset covered by the last update
+        self._last_partial = None
+        self._arrivals = deque()    # (stream end offset, arrival time) per fed block
+
+        self.updates = 0
+        self.segments = 0
+        self.compute_seconds = 0.0
+        self.partial_latencies = []
+        self.final_latencies = []
+
+    @property
+    def received(self) -> int:
+        """Samples received so far."""
+        return self._buffer_start + len(self._buffer)
+
+    def feed(self, samples) -> List[Dict]:
+        """Append samples; returns the events of any update this triggered."""
+        import numpy as np
+
+        if len(samples):
+            self._buffer = np.concatenate([self._buffer, samples])
+            self._arrivals.append((self.received, time.perf_counter()))
+        if self.received - self._decoded_to < self.step:
+            return []
+        return self._update(final=False)
+
+    def _update(self, final: bool) -> List[Dict]:
+        raise NotImplementedError
+
+    def finish(self) -> List[Dict]:
+        raise NotImplementedError
+
+    def _arrival_time(self, offset: int) -> float:
+        """When the sample at stream `offset` arrived."""
+        for end, arrived in self._arrivals:
+            if end >= offset:
+                return arrived
+        return time.perf_counter()
+
+    def _latency_ms(self, offset: int) -> float:
+        """Milliseconds since the sample at stream `offset` arrived."""
+        return (time.perf_counter() - self._arrival_time(offset)) * 1000
+
+    def _drop_before(self, offset: int) -> None:
+        """Forget buffered samples (and arrival times) before stream `offset`."""
+        drop = offset - self._buffer_start
+        if drop > 0:
+            self._buffer = self._buffer[drop:]
+            self._buffer_start += drop
+        while len(self._arrivals) > 1 and self._arrivals[0][0] < self._buffer_start:
+            self._arrivals.popleft()
+
+    def _partial(self, text: str, stable_text: str, start: float, end: int) -> List[Dict]:
+        """A 'partial' event for the live hypothesis, if it changed."""
+        if not text or text == self._last_partial:
+            return []
+        self._last_partial = text
+        latency = self._latency_ms(end)
+        self.partial_latencies.append(latency)
+        return [{
+            'type': 'partial',
+            'text': text,
+            'stable_text': stable_text,
+            'start': round(start, 3),
+            'audio_seconds': round(end / self.sr, 3),
+            'latency_ms': round(latency, 1)
+        }]
+
+    def _final(self, text: str, start: float, end: float, latency: float) -> Dict:
+        """A 'final' event for a finished segment."""
+        self.final_latencies.append(latency)
+        self.segments += 1
+        self._last_partial = None
+        return {
+            'type': 'final',
+            'text': text,
+            'start': round(start, 3),
+            'end': round(end, 3),
+            'latency_ms': round(latency, 1)
+        }
+
+    def stats(self) -> Dict:
+        """Audio processed, compute time, real-time factor and latency summaries."""
+        audio_seconds = self.received / self.sr
+        return {
+            'audio_seconds': round(audio_seconds, 2),
+            'updates': self.updates,
+            'segments': self.segments,
+            'compute_seconds': round(self.compute_seconds, 3),
+            'real_time_factor': round(self.compute_seconds / audio_seconds, 3) if audio_seconds else None,
+            'partial_latency_ms': latency_summary(self.partial_latencies),
+            'final_latency_ms': latency_summary(self.final_latencies)
+        }
+
+
+class CTCStreamer(_LiveStreamer):
+    """
+    Incremental greedy CTC decoding of a live stream.
+
+    Every `step_s` of new audio, the not-yet-final audio is encoded together
+    with `left_context_s` of already final audio. Frames older than
+    `right_context_s` from the live edge become final; the newest ones stay
+    tentative and are encoded again on the next update, once they have right
+    context. A segment is finalized when it ends in `endpoint_s` of blank
+    frames, or when the stream ends.
+    """
+
+    def __init__(self, logits_fn: Callable, decode_fn: Callable[[List[int]], str],
+                 blank_id: Optional[int] = None, sr: int = SAMPLE_RATE,
+                 step_s: float = DEFAULT_STEP_S, left_context_s: float = DEFAULT_LEFT_CONTEXT_S,
+                 right_context_s: float = DEFAULT_RIGHT_CONTEXT_S, endpoint_s: float = DEFAULT_ENDPOINT_S):
+        """
+        Args:
+            logits_fn: Maps 1-D samples to [frames, vocab] logits
+            decode_fn: Maps frame-level ids to text (collapsing blanks/repeats)
+            blank_id: CTC blank id; endpointing is off when None
+            sr: Sample rate of the fed audio
+        """
+        super().__init__(sr, step_s)
+        self.logits_fn = logits_fn
+        self.decode_fn = decode_fn
+        self.blank_id = blank_id
+        self.left_context = int(left_context_s * sr)
+        self.right_context = int(right_context_s * sr)
+        self.endpoint = int(endpoint_s * sr)
+
+        self._final_to = 0          # stream offset up to which ids are final
+        self._segment_start = 0     # stream offset where the current segment began
+        self._segment_ids = []      # final ids of the current segment
+
+    def finish(self) -> List[Dict]:
+        """Decode the rest of the stream and finalize the last segment."""
+        events = self._update(final=True) if self.received > self._final_to else []
+        if self._decode(self._segment_ids):
+            events.append(self._finalize(self.received))
+        return events
+
+    def _decode(self, ids: List[int]) -> str:
+        return self.decode_fn(ids).strip() if ids else ''
+
+    def _update(self, final: bool) -> List[Dict]:
+        start = max(self._final_to - self.left_context, 0)
+        end = self.received
+        final_end = end if final else max(end - self.right_context, self._final_to)
+
+        began = time.perf_counter()
+        logits = self.logits_fn(self._buffer[start - self._buffer_start:end - self._buffer_start])
+        new_ids = keep_span_ids(logits, start, end, self._final_to, final_end)
+        tentative = keep_span_ids(logits, start, end, final_end, end)
+        self.compute_seconds += time.perf_counter() - began
+        self.updates += 1
+
+        self._segment_ids.extend(new_ids)
+        self._final_to = final_end
+        if self.blank_id is not None and all(token == self.blank_id for token in self._segment_ids):
+            # Nothing but silence so far: start the segment at the live edge instead
+            self._segment_ids = []
+            self._segment_start = final_end
+        self._decoded_to = end
+        samples_per_frame = (end - start) / max(logits.shape[0], 1)
+
+        events = []
+        if self._segment_ids and self._ends_in_silence(samples_per_frame):
+            events.append(self._finalize(self._final_to))
+
+        if not final:
+            events.extend(self._partial(self._decode(self._segment_ids + tentative),
+                                        self._decode(self._segment_ids),
+                                        self._segment_start / self.sr, end))
+
+        # Keep only the left context the next update needs
+        self._drop_before(max(self._final_to - self.left_context, 0))
+        return events
+
+    def _ends_in_silence(self, samples_per_frame: float) -> bool:
+        """Whether the current segment has speech and ends in an endpoint's worth of blanks."""
+        if self.blank_id is None:
+            return False
+        trailing = 0
+        for token in reversed(self._segment_ids):
+            if token != self.blank_id:
+                break
+            trailing += 1
+        return trailing < len(self._segment_ids) and trailing * samples_per_frame >= self.endpoint
+
+    def _finalize(self, end: int) -> Dict:
+        """Emit the current segment as final and start a new one at `end`."""
+        event = self._final(self._decode(self._segment_ids), self._segment_start / self.sr,
+                            end / self.sr, self._latency_ms(end))
+        self._segment_ids = []
+        self._segment_start = end
+        return event
+
+
+class LocalAgreementStreamer(_LiveStreamer):
+    """
+    Streaming for models that re-decode a whole window (Whisper).
+
+    Every `step_s` of new audio the model re-transcribes the current window,
+    prompted with recently committed text. Words that two consecutive
+    hypotheses agree on (LocalAgreement-2) are committed; the rest stays
+    tentative. Once the window is longer than `trim_s` it is cut at the end
+    of the last segment that is fully committed, which also finalizes that
+    text; it is never allowed past `max_buffer_s`, bounding per-update compute.
+    """
+
+    def __init__(self, transcribe_fn: Callable, sr: int = SAMPLE_RATE,
+                 step_s: float = DEFAULT_AGREEMENT_STEP_S, trim_s: float = DEFAULT_TRIM_S,
+                 max_buffer_s: float = DEFAULT_MAX_BUFFER_S):
+        """
+        Args:
+            transcribe_fn: Maps (samples, prompt) to (words, segment_ends), where
+                words are (start, end, text) with times in seconds relative to
+                the samples, and segment_ends are segment end times
+            sr: Sample rate of the fed audio
+        """
+        super().__init__(sr, step_s)
+        self.transcribe_fn = transcribe_fn
+        self.trim = trim_s
+        self.max_buffer = max(max_buffer_s, trim_s)
+
+        self._committed = []        # committed, not yet finalized (start, end, word), stream seconds
+        self._committed_end = 0.0   # end of the last committed word
+        self._tentative = []        # words of the last hypothesis not yet agreed on
+        self._prompt = ''           # recently committed text
+        self.commit_latencies = []
+
+    def finish(self) -> List[Dict]:
+        """Commit the last hypothesis as is and finalize all remaining text."""
+        events = self._update(final=True) if self.received > self._buffer_start else []
+        if self._committed:
+            events.extend(self._finalize_through(self.received / self.sr))
+        return events
+
+    @staticmethod
+    def _text(words) -> str:
+        return ''.join(word for _, _, word in words).strip()
+
+    def _update(self, final: bool) -> List[Dict]:
+        end = self.received
+        offset = self._buffer_start / self.sr
+
+        began = time.perf_counter()
+        words, segment_ends = self.transcribe_fn(self._buffer, self._prompt[-PROMPT_CHARS:])
+        self.compute_seconds += time.perf_counter() - began
+        self.updates += 1
+        self._decoded_to = end
+
+        # Words already committed from this window are transcribed again; skip them
+        words = [(s + offset, e + offset, w) for s, e, w in words if s + offset > self._committed_end - 0.1]
+        recent = [comparable_word(w) for _, _, w in self._committed[-MAX_REPEAT_WORDS:]]
+        for n in range(min(len(recent), len(words)), 0, -1):
+            if recent[-n:] == [comparable_word(w) for _, _, w in words[:n]]:
+                words = words[n:]
+                break
+
+        agreed = len(words) if final else 0
+        while (not final and agreed < min(len(words), len(self._tentative))
+               and comparable_word(words[agreed][2]) == comparable_word(self._tentative[agreed][2])):
+            agreed += 1
+        commits, self._tentative = words[:agreed], words[agreed:]
+
+        self._commit(commits)
+
+        events = []
+        window = (end - self._buffer_start) / self.sr
+        if not final and window > self.trim:
+            # Cut at the last segment end that no tentative word reaches past
+            boundaries = [t + offset for t in segment_ends if t + offset <= self._committed_end]
+            cut = max(boundaries) if boundaries else None
+            if window > self.max_buffer:
+                # Hard limit, also when nothing was agreed on (silence, or
+                # hypotheses that keep changing): keep only the last
+                # max_buffer_s and commit the tentative words that start
+                # in the audio being dropped
+                cut = max(cut or 0.0, self._committed_end, end / self.sr - self.max_buffer)
+                forced = 0
+                while forced < len(self._tentative) and self._tentative[forced][0] < cut:
+                    forced += 1
+                if forced:
+                    self._commit(self._tentative[:forced])
+                    self._tentative = self._tentative[forced:]
+                    cut = max(cut, self._committed_end)
+            if cut is not None and cut > offset:
+                events.extend(self._finalize_through(cut))
+                self._drop_before(int(cut * self.sr))
+
+        live = self._committed + self._tentative
+        if not final and live:
+            events.extend(self._partial(self._text(live), self._text(self._committed), live[0][0], end))
+        return events
+
+    def _commit(self, words) -> None:
+        """Commit agreed (start, end, word) words, in stream seconds."""
+        for _, word_end, _ in words:
+            self.commit_latencies.append(self._latency_ms(int(word_end * self.sr)))
+        if words:
+            self._committed.extend(words)
+            self._committed_end = words[-1][1]
+            self._prompt = (self._prompt + ''.join(w for _, _, w in words))[-PROMPT_CHARS:]
+
+    def _finalize_through(self, cut: float) -> List[Dict]:
+        """Emit committed words ending by `cut` (stream seconds) as a final segment, if any."""
+        done = [word for word in self._committed if word[1] <= cut + 1e-3]
+        self._committed = self._committed[len(done):]
+        if not done:
+            return []
+        return [self._final(self._text(done), done[0][0], cut, self._latency_ms(int(cut * self.sr)))]
+
+    def stats(self) -> Dict:
+        """As for every streamer, plus how long words took to be committed."""
+        return {
+            **super().stats(),
+            'commit_latency_ms': latency_summary(self.commit_latencies)
+        }
+
+
+def pcm_blocks(stream, read_bytes: int = READ_BYTES) -> Iterator:
+    """
+    Yield float32 sample blocks from a binary stream of s16le mono PCM.
+
+    Returns whatever has arrived (up to `read_bytes`) instead of waiting for
+    full blocks, so a live source is never held back.
+    """
+    import numpy as np
+
+    read = getattr(stream, 'read1', stream.read)
+    pending = b''
+    while True:
+        data = read(read_bytes)
+        if not data:
+            return
+        data = pending + data
+        usable = len(data) - len(data) % 2
+        pending = data[usable:]
+        if usable:
+            yield np.frombuffer(data[:usable], dtype=np.int16).astype(np.float32) / 32768.0
+
+
+@contextmanager
+def open_pcm_source(source: str = '-'):
+    """
+    Binary stream for a PCM source.
+
+    '-' reads stdin; 'tcp://host:port' listens on that address and accepts
+    a single client; 'unix:///path' does the same on a Unix socket.
+    """
+    if source in ('-', 'stdin'):
+        yield sys.stdin.buffer
+        return
+
+    if source.startswith('tcp://'):
+        host, _, port = source[len('tcp://'):].rpartition(':')
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        address = (host or '127.0.0.1', int(port))
+    elif source.startswith('unix://'):
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        address = source[len('unix://'):]
+        _remove_stale_socket(address)
+    else:
+        raise ValueError(f"Unknown PCM source: {source} (use -, tcp://host:port or unix:///path)")
+
+    bound = False
+    try:
+        with server:
+            server.bind(address)
+            bound = True
+            server.listen(1)
+            print(f"[INFO] Waiting for PCM on {source}", file=sys.stderr)
+            connection, _ = server.accept()
+            with connection, connection.makefile('rb') as stream:
+                yield stream
+    finally:
+        if bound and server.family == socket.AF_UNIX:
+            with suppress(FileNotFoundError):
+                os.unlink(address)
+
+
+def _remove_stale_socket(path: str) -> None:
+    """Unlink a Unix socket left at `path` by an earlier run, unless a server still listens on it."""
+    try:
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            return
+    except FileNotFoundError:
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except ConnectionRefusedError:
+        os.unlink(path)
+    finally:
+        probe.close()
@@ -0,0 +1,10 @@
+"""
+Tests for the pure-Python/NumPy backend modules (no torch or model downloads).
+Run with `python -m pytest backends/tests`.
+"""
+
+import os
+import sys
+
+# Backend modules import each other by bare name, as runner.py arranges
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,46 @@
+import random
+
+from batching import bucketed_batches, in_submission_order, length_sorted_batches
+
+
+def test_length_sorted_batches():
+    lengths = {0: 5.0, 1: 1.0, 2: 3.0, 3: 2.0, 4: 4.0}
+    assert length_sorted_batches(lengths, 2) == [[1, 3], [2, 4], [0]]
+    assert length_sorted_batches(lengths, 0) == [[1], [3], [2], [4], [0]]
+
+
+def test_bucketed_batches_respect_budget_and_buckets():
+    rng = random.Random(0)
+    lengths = {i: rng.uniform(1, 40) for i in range(200)}
+    batches = bucketed_batches(lengths, max_batch_length=120, max_batch_size=8)
+
+    assert sorted(i for batch in batches for i in batch) == list(range(200))
+    for batch in batches:
+        longest = max(lengths[i] for i in batch)
+        assert len(batch) <= 8
+        assert len(batch) == 1 or len(batch) * longest <= 120
+        assert longest <= min(lengths[i] for i in batch) * 1.25 + 1e-9
+
+
+def test_item_over_budget_gets_its_own_batch():
+    assert bucketed_batches({0: 10.0, 1: 10.5, 2: 100.0}, max_batch_length=30) == [[0, 1], [2]]
+
+
+def test_in_submission_order():
+    results = [{'index': i} for i in (2, 0, 1, 4, 3)]
+    assert [r['index'] for r in in_submission_order(results)] == [0, 1, 2, 3, 4]
+
+
+def test_in_submission_order_streams_and_flushes_gaps():
+    seen = []
+
+    def results():
+        for i in (0, 1, 3, 5):
+            seen.append(i)
+            yield {'index': i}
+
+    ordered = in_submission_order(results())
+    assert next(ordered)['index'] == 0 and seen == [0]
+    assert next(ordered)['index'] == 1 and seen == [0, 1]
+    # Index 2 never arrives: the rest is flushed in order at the end
+    assert [r['index'] for r in ordered] == [3, 5]
@@ -0,0 +1,139 @@
+import time
+
+import numpy as np
+import pytest
+
+import audio
+from base import StageTimer, STTBackend, model_registry
+from benchmarking import PeakMemory, benchmark_model, percentile, run_corpus_benchmark
+
+MB = 1024 ** 2
+
+
+class ScriptedBackend(STTBackend):
+    """Returns a fixed hypothesis per audio path; 'big' models allocate memory."""
+
+    def __init__(self, hypotheses):
+        super().__init__()
+        self.hypotheses = hypotheses
+
+    def transcribe(self, audio_path, model_name, **kwargs):
+        if model_name == 'big':
+            scratch = np.ones(150 * MB // 8)
+            time.sleep(0.1)
+            del scratch
+        return {'text': self.hypotheses[audio_path], 'processing_time': 0.5, 'timings': {}}
+
+    def list_models(self):
+        return []
+
+    def is_model_installed(self, model_name):
+        return True
+
+
+@pytest.fixture(autouse=True)
+def fake_audio(monkeypatch):
+    monkeypatch.setattr(audio, 'load_audio', lambda path, timer=None: np.zeros(16000, dtype=np.float32))
+    monkeypatch.setattr(audio, 'get_duration', lambda path: 2.0)
+    monkeypatch.setattr('os.path.exists', lambda path: True)
+
+
+def test_duplicate_sample_ids_are_scored_separately():
+    samples = [
+        {'id': 'dup', 'audio_path': 'a.wav', 'reference_text': 'one two three four'},
+        {'id': 'dup', 'audio_path': 'b.wav', 'reference_text': 'five six seven eight'},
+    ]
+    backend = ScriptedBackend({'a.wav': 'one two three four', 'b.wav': 'five six seven eight'})
+    summary = benchmark_model(backend, 'fake', 'small', samples)
+
+    assert summary['wer'] == 0.0
+    assert [r['index'] for r in summary['results']] == [0, 1]
+    assert summary['errors']['reference_words'] == 8
+
+
+def test_peak_memory_is_per_model():
+    samples = [{'id': '0', 'audio_path': 'a.wav', 'reference_text': 'hello'}]
+    backend = ScriptedBackend({'a.wav': 'hello'})
+    report = run_corpus_benchmark(samples, [('fake', 'big'), ('fake', 'small')], lambda name: backend)
+    big, small = report['models']
+
+    assert big['peak_rss_delta_mb'] >= 100
+    assert small['peak_rss_delta_mb'] < 50
+    assert small['peak_rss_mb'] < big['peak_rss_mb'] - 100
+
+
+def test_peak_memory_sampler():
+    with PeakMemory(interval=0.005) as memory:
+        block = np.ones(80 * MB // 8)
+        time.sleep(0.05)
+        del block
+    report = memory.report()
+    assert report['peak_rss_delta_mb'] >= 70
+
+
+def test_stage_timer_peak_is_per_call():
+    earlier = StageTimer()
+    with earlier.stage('inference'):
+        block = np.ones(150 * MB // 8)
+        time.sleep(0.05)
+        del block
+
+    timer = StageTimer()
+    with timer.stage('load_model'):
+        pass
+    with timer.stage('inference'):
+        block = np.ones(40 * MB // 8)
+        time.sleep(0.05)
+        del block
+    report = timer.report()
+
+    assert set(report['timings']) == {'load_model', 'inference'}
+    assert 30 <= report['peak_rss_delta_mb'] < 100
+    assert report['peak_rss_mb'] < earlier.report()['peak_rss_mb'] - 50
+
+
+class QuantizableBackend(ScriptedBackend):
+    """Keeps its model in the registry, keyed like the real backends."""
+
+    SUPPORTS_QUANTIZE = True
+
+    def __init__(self, hypotheses):
+        super().__init__(hypotheses)
+        self.resident_during_int8 = None
+
+    def transcribe(self, audio_path, model_name, **kwargs):
+        quantize = kwargs.get('quantize')
+        key = f'{model_name}@{quantize}' if quantize else model_name
+        model_registry.get('quantizable', key, lambda: object())
+        if quantize:
+            self.resident_during_int8 = [m['model'] for m in model_registry.stats()['models']]
+        return super().transcribe(audio_path, model_name, **kwargs)
+
+
+def test_quantized_comparison_runs_without_the_fp32_model():
+    samples = [{'id': '0', 'audio_path': 'a.wav', 'reference_text': 'hello'}]
+    backend = QuantizableBackend({'a.wav': 'hello'})
+    try:
+        report = run_corpus_benchmark(samples, [('quantizable', 'small')], lambda name: backend,
+                                      compare_quantized='int8')
+    finally:
+        model_registry.clear()
+
+    assert [m['options'] for m in report['models']] == [{}, {'quantize': 'int8'}]
+    assert len(report['quantization']) == 1
+    assert backend.resident_during_int8 == ['small@int8']
+
+
+def test_quantized_comparison_skips_backends_without_quantization():
+    samples = [{'id': '0', 'audio_path': 'a.wav', 'reference_text': 'hello'}]
+    backend = ScriptedBackend({'a.wav': 'hello'})
+    report = run_corpus_benchmark(samples, [('fake', 'small')], lambda name: backend, compare_quantized='int8')
+
+    assert [m['options'] for m in report['models']] == [{}]
+    assert report['quantization'] == []
+
+
+def test_percentile_interpolates():
+    assert percentile([], 50) is None
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+    assert percentile([5.0], 99) == 5.0
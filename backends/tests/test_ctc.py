@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from ctc import chunked_ctc_ids, ctc_windows, streamed_ctc_ids
+
+HOP = 320  # samples per frame
+VOCAB = 4096
+
+
+def position_logits(window):
+    """Fake CTC model: each frame predicts its absolute frame index (from the samples)."""
+    frames = len(window) // HOP
+    logits = np.zeros((frames, VOCAB), dtype=np.float32)
+    logits[np.arange(frames), (window[::HOP][:frames] // HOP).astype(int) % VOCAB] = 1
+    return logits
+
+
+@pytest.mark.parametrize('num_samples', [0, 1, 999, 30000, 160000, 1234567])
+def test_keep_spans_partition_the_audio(num_samples):
+    windows = ctc_windows(num_samples, chunk_samples=32000, stride_samples=4000)
+    position = 0
+    for start, end, keep_start, keep_end in windows:
+        assert keep_start == position
+        assert start <= keep_start < keep_end <= end
+        assert end - start <= 32000
+        assert keep_start - start <= 4000 and end - keep_end <= 4000
+        position = keep_end
+    assert position == num_samples
+
+
+def test_chunk_must_exceed_twice_the_stride():
+    with pytest.raises(ValueError):
+        ctc_windows(1000, 200, 100)
+    with pytest.raises(ValueError):
+        streamed_ctc_ids([], position_logits, 200, 100)
+
+
+def test_chunked_ids_stitch_to_the_full_sequence():
+    audio = np.arange(HOP * 1234, dtype=np.float64)
+    progress = []
+    ids = chunked_ctc_ids(audio, position_logits, HOP * 100, HOP * 10,
+                          progress_fn=lambda done, total: progress.append((done, total)))
+
+    assert ids == [i % VOCAB for i in range(1234)]
+    assert progress[-1][0] == progress[-1][1] == len(progress)
+
+
+@pytest.mark.parametrize('block', [777, HOP * 100, 100000])
+def test_streamed_ids_match_chunked(block):
+    audio = np.arange(HOP * 1234, dtype=np.float64)
+    blocks = (audio[i:i + block] for i in range(0, len(audio), block))
+    progress = []
+    ids = streamed_ctc_ids(blocks, position_logits, HOP * 100, HOP * 10,
+                           progress_fn=lambda done, total: progress.append((done, total)),
+                           total_samples=len(audio))
+
+    assert ids == chunked_ctc_ids(audio, position_logits, HOP * 100, HOP * 10)
+    assert progress[-1] == (len(ctc_windows(len(audio), HOP * 100, HOP * 10)),) * 2
+
+
+def test_streamed_ids_buffer_only_one_window():
+    audio = np.arange(HOP * 1000, dtype=np.float64)
+    sizes = []
+
+    def logits_fn(window):
+        sizes.append(len(window))
+        return position_logits(window)
+
+    streamed_ctc_ids((audio[i:i + 4000] for i in range(0, len(audio), 4000)), logits_fn, HOP * 100, HOP * 10)
+    assert max(sizes) <= HOP * 100
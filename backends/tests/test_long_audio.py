@@ -0,0 +1,70 @@
+import pytest
+
+import long_audio
+from long_audio import (merge_overlap, plan_windows, stitch_texts, token_budget, window_batch_size,
+                        window_overlaps)
+
+
+@pytest.mark.parametrize('num_samples', [0, 500, 1000, 1001, 1850, 1900, 1901, 5000, 12345])
+def test_plan_windows_cover_the_audio_with_overlap(num_samples):
+    windows = plan_windows(num_samples, window_samples=1000, overlap_samples=100)
+
+    assert windows[0][0] == 0 and windows[-1][1] == num_samples
+    assert all(end - start == min(1000, num_samples) for start, end in windows)
+    overlaps = window_overlaps(windows)
+    assert all(overlap == 100 for overlap in overlaps[:-1])
+    assert all(100 <= overlap < 1000 for overlap in overlaps)
+
+
+def test_last_window_is_shifted_back_to_a_full_window():
+    assert plan_windows(1900, 1000, 100) == [(0, 1000), (900, 1900)]
+    assert plan_windows(1950, 1000, 100) == [(0, 1000), (900, 1900), (950, 1950)]
+    assert plan_windows(2500, 1000, 100) == [(0, 1000), (900, 1900), (1500, 2500)]
+
+
+def test_plan_windows_rejects_overlap_longer_than_window():
+    with pytest.raises(ValueError):
+        plan_windows(5000, 100, 100)
+
+
+def test_token_budget():
+    assert token_budget(0) == long_audio.MIN_NEW_TOKENS
+    assert token_budget(30) == 180
+
+
+def test_merge_overlap_keeps_the_shared_run_once():
+    left = 'we went to the market and bought some'
+    right = 'market, and bought some fresh bread'
+    assert merge_overlap(left, right, 8) == 'we went to the market and bought some fresh bread'
+
+
+def test_merge_overlap_drops_words_cut_at_the_edge():
+    left = 'one two three four fi'
+    right = 'ive three four five six'
+    assert merge_overlap(left, right, 8) == 'one two three four five six'
+
+
+def test_merge_overlap_concatenates_without_a_match():
+    assert merge_overlap('alpha beta', 'gamma delta', 8) == 'alpha beta gamma delta'
+    assert merge_overlap('alpha beta gamma', 'gamma delta', 8) == 'alpha beta gamma gamma delta'
+    assert merge_overlap('', 'gamma delta', 8) == 'gamma delta'
+
+
+def test_stitch_texts():
+    texts = ['the quick brown fox jumps', 'fox jumps over the lazy', ' the lazy dog sleeps ']
+    assert stitch_texts(texts, [1.0, 1.0]) == 'the quick brown fox jumps over the lazy dog sleeps'
+
+
+def test_window_batch_size(monkeypatch):
+    monkeypatch.setattr(long_audio, 'available_memory_bytes', lambda device: 10 * 2 ** 30)
+    assert window_batch_size(2 ** 30, 'cpu') == 5
+    assert window_batch_size(2 ** 20, 'cpu', max_batch=8) == 8
+    assert window_batch_size(None, 'cpu') == 1
+    monkeypatch.setattr(long_audio, 'available_memory_bytes', lambda device: None)
+    assert window_batch_size(2 ** 20, 'cpu') == 1
+
+
+def test_stitch_texts_with_a_long_final_overlap():
+    texts = ['one two three four five six seven eight', 'three four five six seven eight nine']
+    assert stitch_texts(texts, [2.0]) == 'one two three four five six seven eight nine'
+    assert stitch_texts([], []) == ''
@@ -0,0 +1,142 @@
+import itertools
+import threading
+import time
+
+import pytest
+
+from base import ModelInfo, ModelRegistry
+
+MB = 1024 ** 2
+_pointers = itertools.count(1)
+
+
+class FakeTensor:
+    def __init__(self, nbytes):
+        self.nbytes = nbytes
+        self.ptr = next(_pointers)
+
+    def data_ptr(self):
+        return self.ptr
+
+    def numel(self):
+        return self.nbytes
+
+    def element_size(self):
+        return 1
+
+
+class FakeModel:
+    def __init__(self, nbytes):
+        self.weights = [FakeTensor(nbytes)]
+
+    def parameters(self):
+        return self.weights
+
+    def buffers(self):
+        return []
+
+
+def resident(registry):
+    return [m['model'] for m in registry.stats()['models']]
+
+
+def test_room_is_made_before_loading():
+    registry = ModelRegistry(budget_bytes=100 * MB)
+    registry.get('b', 'small', lambda: FakeModel(60 * MB))
+
+    seen_during_load = []
+
+    def load_large():
+        seen_during_load.append(resident(registry))
+        return FakeModel(60 * MB)
+
+    registry.get('b', 'large', load_large, size_hint=60 * MB)
+    assert seen_during_load == [[]]
+    assert resident(registry) == ['large']
+
+
+def test_last_measured_size_is_used_without_a_hint():
+    registry = ModelRegistry(budget_bytes=100 * MB)
+    registry.get('b', 'one', lambda: FakeModel(70 * MB))
+    registry.get('b', 'two', lambda: FakeModel(70 * MB), size_hint=70 * MB)
+    assert resident(registry) == ['two']
+
+    seen_during_load = []
+
+    def reload_one():
+        seen_during_load.append(resident(registry))
+        return FakeModel(70 * MB)
+
+    registry.get('b', 'one', reload_one)
+    assert seen_during_load == [[]]
+
+
+def test_underestimated_model_still_fits_the_budget_after_loading():
+    registry = ModelRegistry(budget_bytes=100 * MB)
+    registry.get('b', 'one', lambda: FakeModel(60 * MB))
+    registry.get('b', 'two', lambda: FakeModel(60 * MB), size_hint=10 * MB)
+    assert resident(registry) == ['two']
+    assert registry.stats()['evictions'] == 1
+
+
+def test_resident_models_stay_available_during_a_load():
+    registry = ModelRegistry(budget_bytes=1000 * MB)
+    small = registry.get('b', 'small', lambda: FakeModel(MB))
+    started, release = threading.Event(), threading.Event()
+
+    def slow_load():
+        started.set()
+        release.wait(5)
+        return FakeModel(MB)
+
+    loader_thread = threading.Thread(target=registry.get, args=('b', 'slow', slow_load))
+    loader_thread.start()
+    assert started.wait(5)
+    began = time.perf_counter()
+    assert registry.get('b', 'small', lambda: pytest.fail('reloaded')) is small
+    assert time.perf_counter() - began < 1
+    release.set()
+    loader_thread.join(5)
+
+
+def test_concurrent_requests_share_one_load():
+    registry = ModelRegistry(budget_bytes=1000 * MB)
+    calls = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.2)
+        return FakeModel(MB)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get('b', 'm', load))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert len(results) == 4 and all(model is results[0] for model in results)
+    assert registry.stats()['misses'] == 1 and registry.stats()['hits'] == 3
+
+
+def test_failed_load_is_not_cached():
+    registry = ModelRegistry(budget_bytes=1000 * MB)
+
+    def broken():
+        raise RuntimeError('download failed')
+
+    with pytest.raises(RuntimeError):
+        registry.get('b', 'm', broken)
+    model = registry.get('b', 'm', lambda: FakeModel(MB))
+    assert resident(registry) == ['m'] and model is not None
+
+
+@pytest.mark.parametrize('size, expected', [
+    ('74MB', 74 * MB),
+    ('~1.5GB', int(1.5 * 1024 * MB)),
+    ('~400MB', 400 * MB),
+    ('unknown', None),
+])
+def test_model_info_size_bytes(size, expected):
+    assert ModelInfo('m', size, '', '').size_bytes == expected
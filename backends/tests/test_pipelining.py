@@ -0,0 +1,90 @@
+import random
+import threading
+import time
+
+import pytest
+
+from pipelining import run_pipelined
+
+
+def test_results_keep_item_order_and_infer_runs_in_caller_thread():
+    rng = random.Random(0)
+    caller = threading.get_ident()
+    infer_threads = set()
+
+    def decode(item):
+        time.sleep(rng.uniform(0, 0.01))
+        return item * 10
+
+    def infer(item, decoded):
+        infer_threads.add(threading.get_ident())
+        return decoded + 1
+
+    results = list(run_pipelined(range(20), decode, infer, lambda item, output, error: (item, output),
+                                 decode_workers=3))
+    assert results == [(i, i * 10 + 1) for i in range(20)]
+    assert infer_threads == {caller}
+
+
+def test_stage_errors_reach_postprocess():
+    def decode(item):
+        if item == 1:
+            raise ValueError('bad audio')
+        return item
+
+    def infer(item, decoded):
+        if item == 3:
+            raise RuntimeError('model failed')
+        return decoded
+
+    def postprocess(item, output, error):
+        return item, output, type(error).__name__ if error else None
+
+    results = list(run_pipelined(range(5), decode, infer, postprocess))
+    assert results == [(0, 0, None), (1, None, 'ValueError'), (2, 2, None),
+                       (3, None, 'RuntimeError'), (4, 4, None)]
+
+
+def test_postprocess_error_is_raised_to_the_consumer():
+    def postprocess(item, output, error):
+        if item == 2:
+            raise KeyError(item)
+        return item
+
+    with pytest.raises(KeyError):
+        list(run_pipelined(range(5), lambda item: item, lambda item, decoded: decoded, postprocess))
+
+
+def test_decoding_stays_within_prefetch():
+    decoded = []
+
+    def decode(item):
+        decoded.append(item)
+        return item
+
+    def infer(item, value):
+        time.sleep(0.02)
+        return value
+
+    results = run_pipelined(range(100), decode, infer, lambda item, output, error: output, prefetch=2)
+    next(results)
+    time.sleep(0.05)
+    # The generator is paused: only a few items beyond `prefetch` were decoded
+    assert len(decoded) < 10
+    results.close()
+
+
+def test_early_close_stops_the_feeder():
+    decoded = []
+
+    def items():
+        for i in range(1000):
+            decoded.append(i)
+            yield i
+
+    results = run_pipelined(items(), lambda item: item, lambda item, value: value,
+                            lambda item, output, error: output)
+    assert next(results) == 0
+    results.close()
+    time.sleep(0.05)
+    assert len(decoded) < 20
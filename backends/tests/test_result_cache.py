@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+import audio
+from result_cache import ResultCache, pcm_hash, streamed_pcm_hash
+
+
+@pytest.fixture
+def recording(tmp_path, monkeypatch):
+    """A 'long' recording with ffmpeg available and an empty decoded-audio cache."""
+    path = tmp_path / 'long.m4a'
+    path.write_bytes(b'not really audio')
+    monkeypatch.setattr(audio, 'AUDIO_CACHE_DIR', str(tmp_path / 'decoded'))
+    monkeypatch.setattr(audio.shutil, 'which', lambda name: '/usr/bin/' + name)
+    monkeypatch.setattr(audio, 'get_duration', lambda p: 600.0)
+    return str(path)
+
+
+def test_long_uncached_file_is_hashed_from_the_stream(recording, tmp_path, monkeypatch):
+    blocks = [np.full(16000, 0.25, dtype=np.float32), np.zeros(8000, dtype=np.float32)]
+    streamed = []
+
+    def fake_stream(path, **kwargs):
+        streamed.append(path)
+        yield from blocks
+
+    def no_full_decode(*args, **kwargs):
+        raise AssertionError('long file decoded into memory')
+
+    monkeypatch.setattr(audio, 'stream_audio', fake_stream)
+    monkeypatch.setattr(audio, 'load_audio', no_full_decode)
+
+    assert audio.should_stream(recording)
+    cache = ResultCache(str(tmp_path / 'results'))
+    content_hash = cache.audio_hash(recording)
+
+    assert streamed == [recording]
+    assert content_hash == streamed_pcm_hash(blocks)
+    # The lookup leaves the backend's streaming decode in place
+    assert not (tmp_path / 'decoded').exists()
+    assert audio.should_stream(recording)
+
+    # Memoised per path+mtime+size: no second decode
+    assert cache.audio_hash(recording) == content_hash
+    assert streamed == [recording]
+
+
+def test_short_file_is_hashed_from_the_full_decode(recording, tmp_path, monkeypatch):
+    samples = np.linspace(-1, 1, 1600, dtype=np.float32)
+    monkeypatch.setattr(audio, 'get_duration', lambda p: 10.0)
+    monkeypatch.setattr(audio, 'load_audio', lambda path: samples)
+
+    assert ResultCache(str(tmp_path / 'results')).audio_hash(recording) == pcm_hash(samples)
+    assert pcm_hash(samples) != streamed_pcm_hash([samples])
+
+
+def test_key_ignores_unkeyed_options(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    key = cache.key('abc', 'whisper', 'base', 'transcribe', {'language': 'en'})
+    assert key == cache.key('abc', 'whisper', 'base', 'transcribe', {'language': 'en', 'no_cache': False})
+    assert key != cache.key('abc', 'whisper', 'base', 'transcribe', {'language': 'de'})
+
+
+def test_put_get_and_eviction(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=300)
+    cache.put('failed', {'text': '', 'error': 'boom'})
+    assert cache.get('failed') is None
+
+    for i in range(5):
+        cache.put(f'k{i}', {'text': 'x' * 100})
+    stats = cache.stats()
+    assert stats['size_mb'] * 1024 ** 2 <= 300
+    assert cache.get('k4') == {'text': 'x' * 100}
+    assert stats['evictions'] >= 2
@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+from scoring import align, error_counts, pairwise_wer, score, score_corpus, word_error_rate
+
+
+def naive_distance(ref, hyp):
+    """Full-table Levenshtein distance over words."""
+    table = [[0] * (len(hyp) + 1) for _ in range(len(ref) + 1)]
+    for i in range(len(ref) + 1):
+        table[i][0] = i
+    for j in range(len(hyp) + 1):
+        table[0][j] = j
+    for i in range(1, len(ref) + 1):
+        for j in range(1, len(hyp) + 1):
+            table[i][j] = min(table[i - 1][j] + 1, table[i][j - 1] + 1,
+                              table[i - 1][j - 1] + (ref[i - 1] != hyp[j - 1]))
+    return table[-1][-1]
+
+
+def random_words(rng, size):
+    return [rng.choice('abcde') for _ in range(size)]
+
+
+@pytest.mark.parametrize('reference, hypothesis, expected', [
+    ('the cat sat', 'the cat sat', 0.0),
+    ('the cat sat', 'The  CAT sat', 0.0),
+    ('the cat sat', 'the dog sat', 100 / 3),
+    ('the cat sat', 'the sat', 100 / 3),
+    ('the cat', 'the big fat cat', 100.0),
+    ('', '', 0.0),
+    ('', 'noise', 100.0),
+    ('words here', '', 100.0),
+])
+def test_word_error_rate(reference, hypothesis, expected):
+    assert word_error_rate(reference, hypothesis) == pytest.approx(expected)
+
+
+def test_error_counts_match_naive_dp():
+    rng = random.Random(0)
+    for _ in range(300):
+        ref, hyp = random_words(rng, rng.randint(0, 12)), random_words(rng, rng.randint(0, 12))
+        counts = error_counts(ref, hyp)
+
+        assert counts['errors'] == naive_distance(ref, hyp)
+        assert counts['errors'] == counts['substitutions'] + counts['deletions'] + counts['insertions']
+        assert counts['hits'] + counts['substitutions'] + counts['deletions'] == len(ref)
+        assert counts['hits'] + counts['substitutions'] + counts['insertions'] == len(hyp)
+
+
+def test_alignment_is_minimal_and_reproduces_both_sides():
+    rng = random.Random(1)
+    for _ in range(300):
+        ref, hyp = random_words(rng, rng.randint(0, 15)), random_words(rng, rng.randint(0, 15))
+        ops = align(ref, hyp)
+
+        assert [r for op, r, h in ops if op != 'insert'] == ref
+        assert [h for op, r, h in ops if op != 'delete'] == hyp
+        for op, r, h in ops:
+            assert (op == 'equal') == (r is not None and r == h)
+        assert sum(op != 'equal' for op, r, h in ops) == naive_distance(ref, hyp)
+
+
+def test_score_with_alignment():
+    result = score('a b c d', 'a x c d e', with_alignment=True)
+    assert (result['substitutions'], result['deletions'], result['insertions']) == (1, 0, 1)
+    assert result['wer'] == pytest.approx(50.0)
+    assert result['alignment'] == [('equal', 'a', 'a'), ('substitute', 'b', 'x'), ('equal', 'c', 'c'),
+                                   ('equal', 'd', 'd'), ('insert', None, 'e')]
+
+
+def test_score_corpus_weights_by_reference_length():
+    result = score_corpus([('a b c d', 'a b c d'), ('a b', 'a')])
+    assert result['pairs'] == 2
+    assert result['errors'] == 1 and result['reference_words'] == 6
+    assert result['wer'] == pytest.approx(100 / 6)
+
+
+def test_pairwise_wer():
+    matrix = pairwise_wer(['a b c d', 'a b', None])
+    assert matrix['wer'][0][1] == 50.0
+    assert matrix['wer'][1][0] == 100.0
+    assert matrix['agreement'][0][1] == matrix['agreement'][1][0] == 50.0
+    assert matrix['wer'][0][0] == 0.0
+    assert matrix['wer'][2][0] is None and matrix['agreement'][1][2] is None
@@ -0,0 +1,169 @@
+import os
+import socket
+import threading
+
+import numpy as np
+import pytest
+
+from streaming import CTCStreamer, LocalAgreementStreamer, latency_summary, open_pcm_source, pcm_blocks
+
+SR = 16000
+
+
+def feed_seconds(streamer, seconds, block_s=0.5, fill=0.0):
+    events = []
+    block = np.full(int(block_s * SR), fill, dtype=np.float32)
+    for _ in range(int(seconds / block_s)):
+        events.extend(streamer.feed(block))
+    return events
+
+
+class WindowRecorder:
+    """transcribe_fn that records window lengths and returns scripted words."""
+
+    def __init__(self, hypothesis=None):
+        self.windows = []
+        self.hypothesis = hypothesis or (lambda samples, call: ([], []))
+
+    def __call__(self, samples, prompt):
+        self.windows.append(len(samples) / SR)
+        return self.hypothesis(samples, len(self.windows))
+
+
+def test_local_agreement_window_bounded_on_silence():
+    recorder = WindowRecorder()
+    streamer = LocalAgreementStreamer(recorder, step_s=1.0, trim_s=10, max_buffer_s=20)
+    events = feed_seconds(streamer, 60)
+    events += streamer.finish()
+
+    assert len(recorder.windows) >= 55
+    assert max(recorder.windows) <= 20 + 1.0 + 1e-6
+    assert not [e for e in events if e['type'] == 'final']
+
+
+def test_local_agreement_window_bounded_when_hypotheses_disagree():
+    def hypothesis(samples, call):
+        # A different word every run, spread over the window: never agreed on
+        duration = len(samples) / SR
+        words = [(t, t + 0.5, f' w{call}_{i}') for i, t in enumerate(np.arange(0, duration - 0.5, 1.0))]
+        return words, []
+
+    recorder = WindowRecorder(hypothesis)
+    streamer = LocalAgreementStreamer(recorder, step_s=1.0, trim_s=10, max_buffer_s=20)
+    events = feed_seconds(streamer, 60)
+
+    assert max(recorder.windows) <= 20 + 1.0 + 1e-6
+    finals = [e for e in events if e['type'] == 'final']
+    # Words pushed out of the window are committed rather than lost
+    assert finals and all(e['text'] for e in finals)
+    assert all(a['end'] <= b['start'] + 1e-6 for a, b in zip(finals, finals[1:]))
+
+
+def test_local_agreement_commits_each_word_once():
+    script = [(float(i), float(i) + 0.8, f' word{i}') for i in range(40)]
+
+    def hypothesis(samples, call):
+        # Words fully inside the audio heard so far, relative to the window
+        start = streamer._buffer_start / SR
+        end = start + len(samples) / SR
+        words = [(s - start, e - start, w) for s, e, w in script if s >= start - 0.05 and e <= end]
+        segment_ends = [e for _, e, _ in words[4::5]]
+        return words, segment_ends
+
+    streamer = LocalAgreementStreamer(WindowRecorder(hypothesis), step_s=1.0, trim_s=10, max_buffer_s=20)
+    events = feed_seconds(streamer, 41)
+    events += streamer.finish()
+
+    text = ' '.join(e['text'] for e in events if e['type'] == 'final').split()
+    assert text == [w.strip() for _, _, w in script]
+
+
+def test_ctc_streamer_finalizes_at_endpoint():
+    blank, vocab = 0, 3
+    frame = 320  # 20 ms frames
+
+    def logits_fn(samples):
+        # Token 1 while the signal is loud, blank otherwise
+        frames = max(len(samples) // frame, 1)
+        loud = np.abs(samples[:frames * frame]).reshape(frames, frame).mean(axis=1) > 0.1
+        logits = np.zeros((frames, vocab), dtype=np.float32)
+        logits[np.arange(frames), np.where(loud, 1, blank)] = 1.0
+        return logits
+
+    def decode_fn(ids):
+        collapsed = [t for i, t in enumerate(ids) if t != blank and (i == 0 or t != ids[i - 1])]
+        return ' '.join('a' for _ in collapsed)
+
+    streamer = CTCStreamer(logits_fn, decode_fn, blank_id=blank, step_s=0.5, endpoint_s=0.8)
+    events = feed_seconds(streamer, 1.0, fill=0.5)
+    events += feed_seconds(streamer, 3.0)
+    events += feed_seconds(streamer, 1.0, fill=0.5)
+    events += streamer.finish()
+
+    finals = [e for e in events if e['type'] == 'final']
+    assert [e['text'] for e in finals] == ['a', 'a']
+    assert finals[0]['start'] == 0.0
+    assert finals[1]['end'] == 5.0
+    assert streamer.stats()['segments'] == 2
+
+
+def test_pcm_blocks_handles_odd_reads():
+    import io
+
+    class Chunked(io.RawIOBase):
+        def __init__(self, data):
+            self.data = data
+
+        def read1(self, n):
+            chunk, self.data = self.data[:3], self.data[3:]
+            return chunk
+
+    samples = (np.arange(-50, 50, dtype=np.int16) * 300)
+    blocks = list(pcm_blocks(Chunked(samples.tobytes())))
+    assert np.allclose(np.concatenate(blocks), samples / 32768.0)
+
+
+def test_latency_summary():
+    assert latency_summary([]) == {'count': 0}
+    summary = latency_summary([10.0, 20.0, 30.0, 40.0])
+    assert summary['count'] == 4 and summary['mean'] == 25.0 and summary['max'] == 40.0
+
+
+def send_when_listening(path, payload):
+    def client():
+        while True:
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                    sock.connect(path)
+                    sock.sendall(payload)
+                    return
+            except (FileNotFoundError, ConnectionRefusedError):
+                threading.Event().wait(0.01)
+
+    thread = threading.Thread(target=client, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_unix_socket_source_can_be_reopened(tmp_path):
+    path = str(tmp_path / 'pcm.sock')
+    # A socket file left behind by a killed run
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()
+
+    for _ in range(2):
+        thread = send_when_listening(path, b'\x00\x40' * 4)
+        with open_pcm_source(f'unix://{path}') as stream:
+            assert stream.read() == b'\x00\x40' * 4
+        thread.join()
+        assert not os.path.exists(path)
+
+
+def test_unix_socket_source_keeps_regular_files(tmp_path):
+    path = tmp_path / 'pcm.sock'
+    path.write_text('not a socket')
+    with pytest.raises(OSError):
+        with open_pcm_source(f'unix://{path}'):
+            pass
+    assert path.read_text() == 'not a socket'
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from vad import GAP_MS, SpeechTimeline, speech_regions
+
+SR = 16000
+
+
+def tone(seconds, amplitude=0.3):
+    t = np.arange(int(seconds * SR)) / SR
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def silence(seconds):
+    return np.zeros(int(seconds * SR), dtype=np.float32)
+
+
+def test_speech_regions_skip_long_silence():
+    audio = np.concatenate([silence(2), tone(1), silence(3), tone(1.5), silence(1)])
+    regions = speech_regions(audio, SR)
+
+    assert len(regions) == 2
+    (s1, e1), (s2, e2) = regions
+    assert abs(s1 / SR - 1.8) < 0.05 and abs(e1 / SR - 3.2) < 0.05
+    assert abs(s2 / SR - 5.8) < 0.05 and abs(e2 / SR - 7.7) < 0.05
+
+
+def test_short_pauses_are_merged_and_blips_dropped():
+    audio = np.concatenate([tone(1), silence(0.2), tone(1), silence(2), tone(0.05), silence(2)])
+    regions = speech_regions(audio, SR)
+    assert len(regions) == 1
+
+
+def test_speech_regions_empty_and_silent():
+    assert speech_regions(np.zeros(0, dtype=np.float32), SR) == []
+    assert speech_regions(silence(3), SR) == []
+
+
+def test_compact_keeps_a_pause_between_regions():
+    audio = np.arange(10 * SR, dtype=np.float32)
+    timeline = SpeechTimeline([(SR, 2 * SR), (5 * SR, 7 * SR)], len(audio))
+    compact = timeline.compact(audio)
+
+    gap = int(SR * GAP_MS / 1000)
+    assert len(compact) == 3 * SR + gap
+    assert np.array_equal(compact[:SR], audio[SR:2 * SR])
+    assert not compact[SR:SR + gap].any()
+    assert np.array_equal(compact[SR + gap:], audio[5 * SR:7 * SR])
+    assert timeline.stats()['speech_seconds'] == 3.0
+
+
+@pytest.mark.parametrize('compact_seconds, is_end, expected', [
+    (0.0, False, 1.0),
+    (0.5, False, 1.5),
+    (1.0, True, 2.0),      # End of the first region
+    (1.05, True, 2.0),     # End inside the pause: clamps to the region before
+    (1.05, False, 5.0),    # Start inside the pause: the region after
+    (1.15, False, 5.0),
+    (1.65, True, 5.5),
+    (9.0, True, 7.0),      # Past the end
+])
+def test_to_original(compact_seconds, is_end, expected):
+    timeline = SpeechTimeline([(SR, 2 * SR), (5 * SR, 7 * SR)], 10 * SR, gap_ms=150)
+    assert timeline.to_original(compact_seconds, is_end=is_end) == pytest.approx(expected)
+
+
+def test_remap_segments_handles_words_and_pipeline_chunks():
+    timeline = SpeechTimeline([(SR, 2 * SR), (5 * SR, 7 * SR)], 10 * SR, gap_ms=150)
+    segments = [
+        {'start': 0.2, 'end': 1.6, 'words': [{'start': 0.2, 'end': 0.9}, {'start': 1.2, 'end': 1.6}]},
+        {'timestamp': (1.15, 1.65)},
+    ]
+    timeline.remap_segments(segments)
+
+    assert segments[0]['start'] == pytest.approx(1.2) and segments[0]['end'] == pytest.approx(5.45)
+    assert segments[0]['words'][1]['start'] == pytest.approx(5.05)
+    assert segments[1]['timestamp'] == (pytest.approx(5.0), pytest.approx(5.5))
@@ -0,0 +1,169 @@
+"""
+Energy-based voice activity detection.
+Finds speech regions in decoded audio so backends can skip long silences,
+and maps timestamps from the speech-only audio back to the original file.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Tuple
+
+from audio import SAMPLE_RATE
+
+FRAME_MS = 30
+# Frames this far above the noise floor count as speech...
+MARGIN_DB = 12.0
+# ...unless that is within this range of the loudest frame (speech-only audio)
+DYNAMIC_RANGE_DB = 35.0
+# Never treat frames quieter than this as speech
+ABSOLUTE_FLOOR_DB = -60.0
+# Silence kept between regions in the speech-only audio, so words on either
+# side of a removed gap are not run together
+GAP_MS = 150
+
+
+def _frame_levels_db(audio, frame_samples: int):
+    """RMS level in dBFS of each full or partial frame."""
+    import numpy as np
+
+    frames = -(-len(audio) // frame_samples)
+    padded = np.zeros(frames * frame_samples, dtype=np.float32)
+    padded[:len(audio)] = audio
+    rms = np.sqrt(np.mean(padded.reshape(frames, frame_samples) ** 2, axis=1))
+    return 20 * np.log10(rms + 1e-10)
+
+
+def speech_regions(audio, sr: int = SAMPLE_RATE, min_speech_ms: int = 250,
+                   min_silence_ms: int = 500, pad_ms: int = 200) -> List[Tuple[int, int]]:
+    """
+    Detect speech regions by frame energy against an adaptive threshold.
+
+    Args:
+        audio: 1-D float32 samples
+        sr: Sample rate
+        min_speech_ms: Drop regions shorter than this
+        min_silence_ms: Merge regions separated by less silence than this
+        pad_ms: Context kept on each side of a region
+
+    Returns:
+        Sorted, non-overlapping (start, end) sample offsets
+    """
+    import numpy as np
+
+    frame_samples = int(sr * FRAME_MS / 1000)
+    if len(audio) == 0:
+        return []
+
+    levels = _frame_levels_db(audio, frame_samples)
+    noise_floor = float(np.percentile(levels, 10))
+    threshold = max(min(noise_floor + MARGIN_DB, float(levels.max()) - DYNAMIC_RANGE_DB), ABSOLUTE_FLOOR_DB)
+    active = levels > threshold
+
+    # Runs of active frames as [start, end) frame indices
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], active.astype(np.int8), [0]))))
+    runs = list(zip(edges[::2], edges[1::2]))
+
+    merged = []
+    max_gap = min_silence_ms / FRAME_MS
+    for start, end in runs:
+        if merged and start - merged[-1][1] < max_gap:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    min_frames = min_speech_ms / FRAME_MS
+    pad = int(sr * pad_ms / 1000)
+    regions = []
+    for start, end in merged:
+        if end - start < min_frames:
+            continue
+        start = max(int(start) * frame_samples - pad, 0)
+        end = min(int(end) * frame_samples + pad, len(audio))
+        if regions and start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+    return regions
+
+
+class SpeechTimeline:
+    """
+    Speech-only audio built from detected regions (separated by `gap_ms`
+    of silence), and the mapping of its timestamps back to the original
+    recording.
+    """
+
+    def __init__(self, regions: List[Tuple[int, int]], total_samples: int, sr: int = SAMPLE_RATE,
+                 gap_ms: int = GAP_MS):
+        self.regions = regions
+        self.total_samples = total_samples
+        self.sr = sr
+        self.gap_samples = int(sr * gap_ms / 1000)
+        # Start of each region on the compacted (speech-only) timeline, in seconds
+        self._compact_starts = []
+        offset = 0
+        for start, end in regions:
+            self._compact_starts.append(offset / sr)
+            offset += end - start + self.gap_samples
+        self.speech_samples = sum(end - start for start, end in regions)
+
+    def compact(self, audio):
+        """Concatenate the speech regions of `audio`, with silence between them."""
+        import numpy as np
+
+        gap = np.zeros(self.gap_samples, dtype=audio.dtype)
+        pieces = []
+        for start, end in self.regions:
+            if pieces:
+                pieces.append(gap)
+            pieces.append(audio[start:end])
+        return np.concatenate(pieces)
+
+    def to_original(self, seconds, is_end: bool = False):
+        """
+        Map a time on the speech-only timeline to the original timeline.
+
+        Times inside an inserted gap map to the end of the region before it
+        (end times) or the start of the region after it (start times).
+        """
+        if seconds is None or not self.regions:
+            return seconds
+        # An end time exactly on a boundary belongs to the region before it
+        find = bisect_left if is_end else bisect_right
+        index = max(find(self._compact_starts, seconds) - 1, 0)
+        start, end = self.regions[index]
+        into = seconds - self._compact_starts[index]
+        length = (end - start) / self.sr
+        if into > length and not is_end and index + 1 < len(self.regions):
+            return round(self.regions[index + 1][0] / self.sr, 3)
+        return round(start / self.sr + min(into, length), 3)
+
+    def remap_segments(self, segments: List[Dict]) -> List[Dict]:
+        """
+        Remap segment timestamps in place and return the segments.
+
+        Handles Whisper-style 'start'/'end' (including nested 'words') and
+        pipeline-style 'timestamp' (start, end) tuples.
+        """
+        for segment in segments:
+            if not isinstance(segment, dict):
+                continue
+            if 'start' in segment:
+                segment['start'] = self.to_original(segment['start'])
+            if 'end' in segment:
+                segment['end'] = self.to_original(segment['end'], is_end=True)
+            if isinstance(segment.get('timestamp'), (list, tuple)) and len(segment['timestamp']) == 2:
+                start, end = segment['timestamp']
+                segment['timestamp'] = (self.to_original(start), self.to_original(end, is_end=True))
+            if isinstance(segment.get('words'), list):
+                self.remap_segments(segment['words'])
+        return segments
+
+    def stats(self) -> Dict:
+        """Speech/total duration and the fraction of audio skipped."""
+        skipped = 1 - self.speech_samples / self.total_samples if self.total_samples else 0.0
+        return {
+            'regions': len(self.regions),
+            'speech_seconds': round(self.speech_samples / self.sr, 2),
+            'total_seconds': round(self.total_samples / self.sr, 2),
+            'skipped_fraction': round(skipped, 3)
+        }
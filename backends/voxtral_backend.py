@@ -3,16 +3,108 @@ Voxtral backend for Speech-to-Text.
 Uses Mistral's Voxtral model via transformers.
 """
 
+import copy
+import math
 import time
 import os
-from typing import Dict, List
-from base import STTBackend, ModelInfo
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from base import STTBackend, ModelInfo, StageTimer, model_registry
 from progress import report_progress
+from audio import audio_to_wav_base64, SAMPLE_RATE
+from quantization import check_quantize_mode, load_quantized
+from long_audio import (DEFAULT_OVERLAP_SECONDS, DEFAULT_WINDOW_SECONDS, plan_windows,
+                        stitch_texts, token_budget, window_batch_size, window_overlaps)
+from result_cache import pcm_hash
+
+# Audio embeddings the Voxtral encoder/projector emits per second of audio
+AUDIO_TOKENS_PER_SECOND = 12.5
+# Whisper-style encoder frames per 30 s input chunk
+ENCODER_FRAMES_PER_CHUNK = 1500
+# Max new tokens for open-ended tasks (summaries, answers)
+DEFAULT_MAX_NEW_TOKENS = 500
+DEFAULT_SESSION_CACHE_MB = 1024
+
+
+def _session_cache_budget() -> int:
+    """Size bound from VAI_VOXTRAL_SESSION_MB, else DEFAULT_SESSION_CACHE_MB."""
+    try:
+        megabytes = float(os.environ.get('VAI_VOXTRAL_SESSION_MB', DEFAULT_SESSION_CACHE_MB))
+    except ValueError:
+        megabytes = DEFAULT_SESSION_CACHE_MB
+    return int(megabytes * 1024 ** 2)
+
+
+class AudioSession:
+    """
+    One encoded recording: the prompt prefix up to the end of the audio and
+    the decoder KV cache over it (which already holds the audio encoder's
+    output).
+    """
+
+    def __init__(self, model, prefix_ids, past_key_values, size_bytes: int, text_offset: Optional[int]):
+        self.model_ref = weakref.ref(model)
+        self.prefix_ids = prefix_ids
+        self.past_key_values = past_key_values
+        self.size_bytes = size_bytes
+        # Where the prompt text starts in a text-only chat template, if the
+        # template is known to be prefix + text; lets follow-ups skip the audio entirely
+        self.text_offset = text_offset
+
+
+class AudioSessionCache:
+    """
+    Resident cache of encoded audio, so follow-up tasks on the same recording
+    (transcribe, then summarize, then Q&A) only pay for text generation.
+
+    Keyed by model and audio content hash; least recently used sessions are
+    dropped beyond the memory budget, and sessions of a model that has since
+    been unloaded are never reused.
+    """
+
+    def __init__(self, budget_bytes: Optional[int] = None):
+        self.budget_bytes = budget_bytes if budget_bytes is not None else _session_cache_budget()
+        self._entries = OrderedDict()  # (model key, audio hash) -> AudioSession
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, model_key: str, audio_hash: str, model) -> Optional[AudioSession]:
+        key = (model_key, audio_hash)
+        with self._lock:
+            session = self._entries.get(key)
+            if session is not None and session.model_ref() is not model:
+                del self._entries[key]
+                session = None
+            if session is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return session
+
+    def put(self, model_key: str, audio_hash: str, session: AudioSession) -> None:
+        if session.size_bytes > self.budget_bytes:
+            return
+        with self._lock:
+            self._entries[(model_key, audio_hash)] = session
+            self._entries.move_to_end((model_key, audio_hash))
+            while sum(s.size_bytes for s in self._entries.values()) > self.budget_bytes:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
 
 
 class VoxtralBackend(STTBackend):
     """Mistral Voxtral speech recognition backend."""
 
+    SUPPORTS_QUANTIZE = True
+
     MODELS = {
         'Voxtral-Mini-3B-2507': ModelInfo(
             'Voxtral-Mini-3B-2507',
@@ -36,9 +128,7 @@ class VoxtralBackend(STTBackend):
         super().__init__()
         self._transformers = None
         self._torch = None
-        self._current_model = None
-        self._current_processor = None
-        self._current_model_name = None
+        self._sessions = AudioSessionCache()
 
     def _load_modules(self):
         """Lazy load required modules."""
@@ -49,59 +139,71 @@ class VoxtralBackend(STTBackend):
             self._torch = torch
         return self._transformers, self._torch
 
-    def _get_model_and_processor(self, model_name: str):
+    def _get_model_and_processor(self, model_name: str, quantize: Optional[str] = None):
         """Load or return cached model and processor."""
-        if self._current_model_name != model_name:
-            is_downloading = not self.is_model_installed(model_name)
+        key = f'{model_name}@{quantize}' if quantize else model_name
+        return model_registry.get('voxtral', key, lambda: self._load_model(model_name, quantize),
+                                  self._size_hint(model_name))
 
-            if is_downloading:
-                report_progress(10, f'Downloading {model_name}...', 'downloading')
-            else:
-                report_progress(10, f'Loading {model_name} model...', 'loading_model')
+    def _load_model(self, model_name: str, quantize: Optional[str] = None):
+        """Load a Voxtral model (optionally int8-quantized, on CPU) and its processor."""
+        is_downloading = not self.is_model_installed(model_name)
+
+        if is_downloading:
+            report_progress(10, f'Downloading {model_name}...', 'downloading')
+        else:
+            report_progress(10, f'Loading {model_name} model...', 'loading_model')
 
-            (VoxtralForConditionalGeneration, AutoProcessor), torch = self._load_modules()
+        (VoxtralForConditionalGeneration, AutoProcessor), torch = self._load_modules()
 
-            print(f"Loading Voxtral model: {model_name}...")
-            device = "cuda" if torch.cuda.is_available() else "cpu"
-            print(f"Using device: {device}")
+        print(f"Loading Voxtral model: {model_name}...")
+        # Dynamic int8 quantization only has CPU kernels
+        device = "cuda" if torch.cuda.is_available() and not quantize else "cpu"
+        print(f"Using device: {device}")
 
-            repo_id = f"mistralai/{model_name}"
+        repo_id = f"mistralai/{model_name}"
 
-            try:
-                if is_downloading:
-                    report_progress(15, 'Downloading model files from HuggingFace...', 'downloading')
+        try:
+            if is_downloading:
+                report_progress(15, 'Downloading model files from HuggingFace...', 'downloading')
 
-                # Get HuggingFace token for authentication
-                token = self._get_hf_token()
+            # Get HuggingFace token for authentication
+            token = self._get_hf_token()
 
-                self._current_processor = AutoProcessor.from_pretrained(repo_id, token=token)
-                self._current_model = VoxtralForConditionalGeneration.from_pretrained(
+            processor = AutoProcessor.from_pretrained(repo_id, token=token)
+
+            def load_pretrained():
+                return VoxtralForConditionalGeneration.from_pretrained(
                     repo_id,
                     torch_dtype=torch.bfloat16 if device == "cuda" else torch.float32,
                     device_map=device,
                     token=token
                 )
-                self._current_model_name = model_name
-
-                if is_downloading:
-                    report_progress(30, 'Download complete! Model loaded.', 'loaded')
-                else:
-                    report_progress(30, 'Model loaded successfully', 'loaded')
-
-                print(f"Voxtral model {model_name} loaded successfully!")
-            except Exception as e:
-                error_msg = str(e).lower()
-                # Check for authentication errors
-                if '401' in error_msg or '403' in error_msg or 'authentication' in error_msg or 'unauthorized' in error_msg:
-                    print(f"Error loading Voxtral model {model_name}: Authentication failed")
-                    raise Exception(
-                        "HuggingFace authentication required. Please add your HuggingFace token in Settings > Advanced Settings > HuggingFace Authentication. "
-                        "Get a free token at https://huggingface.co/settings/tokens"
-                    )
-                print(f"Error loading Voxtral model: {e}")
-                raise
-
-        return self._current_model, self._current_processor
+
+            if quantize:
+                model = load_quantized(f'voxtral/{model_name}', repo_id, load_pretrained, token)
+            else:
+                model = load_pretrained()
+
+            if is_downloading:
+                report_progress(30, 'Download complete! Model loaded.', 'loaded')
+            else:
+                report_progress(30, 'Model loaded successfully', 'loaded')
+
+            print(f"Voxtral model {model_name} loaded successfully!")
+        except Exception as e:
+            error_msg = str(e).lower()
+            # Check for authentication errors
+            if '401' in error_msg or '403' in error_msg or 'authentication' in error_msg or 'unauthorized' in error_msg:
+                print(f"Error loading Voxtral model {model_name}: Authentication failed")
+                raise Exception(
+                    "HuggingFace authentication required. Please add your HuggingFace token in Settings > Advanced Settings > HuggingFace Authentication. "
+                    "Get a free token at https://huggingface.co/settings/tokens"
+                )
+            print(f"Error loading Voxtral model: {e}")
+            raise
+
+        return model, processor
 
     def transcribe(self, audio_path: str, model_name: str = 'Voxtral-Mini-3B-2507',
                    task: str = 'transcribe', prompt: str = None, **kwargs) -> Dict:
@@ -114,14 +216,26 @@ class VoxtralBackend(STTBackend):
             task: Type of task ('transcribe', 'summarize', 'qa')
             prompt: Custom prompt for the model
             **kwargs: Additional options
+                - quantize: 'int8' for dynamic int8 quantization of Linear layers (runs on CPU)
+                - vad: Skip silence with an energy VAD; timestamps stay on the original timeline
+                - chunked: Transcribe audio longer than one window window-by-window
+                  (default True; only applies to task='transcribe')
+                - window_seconds: Window length for chunked mode (default 30)
+                - batch_size: Windows generated together (default: as many as free memory allows)
+                - session_cache: Reuse the encoded audio across tasks on the same recording (default True)
 
         Returns:
             Dictionary with transcription results
         """
+        if kwargs.get('vad'):
+            return self._transcribe_speech_only(audio_path, model_name, task=task, prompt=prompt, **kwargs)
+
         start_time = time.time()
+        timer = StageTimer()
 
         try:
             report_progress(0, 'Starting transcription...', 'initializing')
+            quantize = check_quantize_mode(kwargs.get('quantize'))
 
             # Check if model needs to be downloaded
             if not self.is_model_installed(model_name):
@@ -130,7 +244,8 @@ class VoxtralBackend(STTBackend):
                 print(f"[DOWNLOAD] Model {model_name} not found in cache. Downloading...")
 
             # Load model and processor (will download if needed)
-            model, processor = self._get_model_and_processor(model_name)
+            with timer.stage('load_model'):
+                model, processor = self._get_model_and_processor(model_name, quantize)
             _, torch = self._load_modules()
 
             # Build conversation based on task
@@ -142,53 +257,36 @@ class VoxtralBackend(STTBackend):
                 else:  # transcribe
                     prompt = "Transcribe this audio."
 
-            # Load and convert audio to WAV if needed (M4A not supported by processor)
-            import librosa
-            import soundfile as sf
-            import tempfile
-
             report_progress(35, 'Loading audio file...', 'loading_audio')
             print(f"Loading audio file: {audio_path}")
-            # Load audio with librosa (supports M4A via audioread/ffmpeg)
-            audio_data, sample_rate = librosa.load(audio_path, sr=16000, mono=True)
-
-            # Save to temporary WAV file for processor
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp_file:
-                temp_wav_path = tmp_file.name
-                sf.write(temp_wav_path, audio_data, sample_rate)
-
-            try:
-                conversation = [{
-                    "role": "user",
-                    "content": [
-                        {"type": "audio", "path": temp_wav_path},
-                        {"type": "text", "text": prompt}
-                    ]
-                }]
-
-                report_progress(50, 'Transcribing audio...', 'transcribing')
-                print(f"Processing with Voxtral {model_name}...")
-                print(f"Task: {task}")
-
-                # Process
-                inputs = processor.apply_chat_template(conversation)
-            finally:
-                # Clean up temporary file
-                import os
-                if os.path.exists(temp_wav_path):
-                    os.unlink(temp_wav_path)
-            device = "cuda" if torch.cuda.is_available() else "cpu"
-            dtype = torch.bfloat16 if device == "cuda" else torch.float32
-            inputs = inputs.to(device, dtype=dtype)
-
-            # Generate
-            outputs = model.generate(**inputs, max_new_tokens=500)
+            # Decode once (M4A not supported by processor); the processor gets
+            # the 16 kHz samples as in-memory WAV, with no temp file on disk
+            audio_data = self._load_audio(audio_path, timer, kwargs.pop('audio', None))
 
-            # Decode
-            result_text = processor.batch_decode(
-                outputs[:, inputs.input_ids.shape[1]:],
-                skip_special_tokens=True
-            )[0]
+            device = model.device.type
+            dtype = torch.bfloat16 if device == "cuda" else torch.float32
+            duration = len(audio_data) / SAMPLE_RATE
+            window_seconds = float(kwargs.get('window_seconds') or DEFAULT_WINDOW_SECONDS)
+            chunked = task == 'transcribe' and kwargs.get('chunked', True) and duration > window_seconds
+
+            report_progress(50, 'Transcribing audio...', 'transcribing')
+            print(f"Processing with Voxtral {model_name}...")
+            print(f"Task: {task}")
+
+            if chunked:
+                result_text, windows = self._generate_windows(
+                    model, processor, audio_data, prompt, timer, device, dtype,
+                    window_seconds, kwargs.get('batch_size')
+                )
+            else:
+                windows = 1
+                # A transcript's length follows the audio's; other tasks get a fixed budget
+                max_new_tokens = token_budget(duration) if task == 'transcribe' else DEFAULT_MAX_NEW_TOKENS
+                model_key = f'{model_name}@{quantize}' if quantize else model_name
+                result_text, audio_session = self._generate_single(
+                    model, processor, model_key, audio_data, prompt, timer, device, dtype,
+                    max_new_tokens, kwargs.get('session_cache', True)
+                )
 
             processing_time = time.time() - start_time
 
@@ -200,7 +298,11 @@ class VoxtralBackend(STTBackend):
                 'task': task,
                 'model': model_name,
                 'backend': 'voxtral',
-                'device': device
+                'device': device,
+                'quantize': quantize,
+                'windows': windows,
+                'audio_session': None if chunked else audio_session,
+                **timer.report()
             }
 
         except Exception as e:
@@ -213,6 +315,196 @@ class VoxtralBackend(STTBackend):
                 'backend': 'voxtral'
             }
 
+    @staticmethod
+    def _conversation(audio, prompt: str) -> List[Dict]:
+        """Chat turn carrying one clip (as in-memory WAV, unless None) and the prompt."""
+        content = [{"type": "text", "text": prompt}]
+        if audio is not None:
+            content.insert(0, {"type": "audio", "base64": audio_to_wav_base64(audio)})
+        return [{"role": "user", "content": content}]
+
+    def _generate_single(self, model, processor, model_key: str, audio, prompt: str, timer: StageTimer,
+                         device: str, dtype, max_new_tokens: int, use_session: bool = True):
+        """
+        Generate for the whole clip in one pass, reusing an encoded audio session.
+
+        Returns the text and the session outcome ('hit', 'miss', or None when
+        the session cache is off or not applicable).
+        """
+        torch = self._torch
+        session = audio_hash = None
+        if use_session:
+            with timer.stage('audio_hash'):
+                audio_hash = pcm_hash(audio)
+            session = self._sessions.get(model_key, audio_hash, model)
+
+        with timer.stage('features'):
+            if session is not None and session.text_offset is not None:
+                # Only the prompt text is new: tokenize it without the audio
+                text_ids = processor.apply_chat_template(self._conversation(None, prompt)).input_ids
+                input_ids = torch.cat([session.prefix_ids, text_ids[:, session.text_offset:].to(device)], dim=1)
+                inputs = {'input_ids': input_ids, 'attention_mask': torch.ones_like(input_ids)}
+            else:
+                inputs = processor.apply_chat_template(self._conversation(audio, prompt))
+                inputs = inputs.to(device, dtype=dtype)
+                prefix = None if session is None else session.prefix_ids
+                if prefix is not None and not torch.equal(inputs.input_ids[:, :prefix.shape[1]], prefix):
+                    session = None
+
+        status = None
+        if use_session and session is None:
+            with timer.stage('encode_audio'):
+                session = self._encode_session(model, processor, inputs, prompt)
+            if session is not None:
+                self._sessions.put(model_key, audio_hash, session)
+                status = 'miss'
+        elif session is not None:
+            status = 'hit'
+
+        with timer.stage('inference'):
+            if session is None:
+                outputs = model.generate(**inputs, max_new_tokens=max_new_tokens)
+            else:
+                # generate() extends the cache in place; keep the session's copy pristine
+                outputs = model.generate(
+                    input_ids=inputs['input_ids'],
+                    attention_mask=inputs['attention_mask'],
+                    past_key_values=copy.deepcopy(session.past_key_values),
+                    max_new_tokens=max_new_tokens
+                )
+
+        with timer.stage('decode_tokens'):
+            text = processor.batch_decode(
+                outputs[:, inputs['input_ids'].shape[1]:],
+                skip_special_tokens=True
+            )[0]
+        return text, status
+
+    def _encode_session(self, model, processor, inputs, prompt: str) -> Optional[AudioSession]:
+        """
+        Run the audio encoder and the decoder over the prompt prefix up to
+        the last audio token, keeping the KV cache. None if the prompt has
+        no audio tokens.
+        """
+        torch = self._torch
+        audio_token_id = getattr(model.config, 'audio_token_id', None)
+        input_ids = inputs.input_ids
+        positions = (input_ids[0] == audio_token_id).nonzero()
+        if audio_token_id is None or len(positions) == 0:
+            return None
+        prefix_len = int(positions[-1]) + 1
+        prefix_ids = input_ids[:, :prefix_len]
+
+        encode = getattr(model, 'get_audio_features', None) or model.get_audio_embeds
+        with torch.no_grad():
+            audio_embeds = encode(inputs.input_features)
+            embeds = model.get_input_embeddings()(prefix_ids)
+            audio_mask = (prefix_ids == audio_token_id).unsqueeze(-1).expand_as(embeds)
+            embeds = embeds.masked_scatter(audio_mask, audio_embeds.to(embeds.dtype))
+            # Only the cache is needed, so skip logits for all but the last position
+            outputs = model(
+                inputs_embeds=embeds,
+                attention_mask=inputs.attention_mask[:, :prefix_len],
+                use_cache=True,
+                logits_to_keep=1
+            )
+
+        # The prompt text follows the audio directly if a text-only template
+        # is this prefix with the audio block removed
+        full_ids = input_ids[0].tolist()
+        text_ids = processor.apply_chat_template(self._conversation(None, prompt)).input_ids[0].tolist()
+        text_offset = 0
+        while text_offset < min(prefix_len, len(text_ids)) and full_ids[text_offset] == text_ids[text_offset]:
+            text_offset += 1
+        if full_ids[prefix_len:] != text_ids[text_offset:]:
+            text_offset = None
+
+        size = (self._kv_bytes_per_token(model, embeds.element_size()) or 0) * prefix_len
+        return AudioSession(model, prefix_ids, outputs.past_key_values, size, text_offset)
+
+    @staticmethod
+    def _kv_bytes_per_token(model, element_size: int) -> Optional[int]:
+        """Decoder KV cache size per token, or None if the config lacks the needed sizes."""
+        config = getattr(model.config, 'text_config', None)
+        try:
+            head_dim = getattr(config, 'head_dim', None) or config.hidden_size // config.num_attention_heads
+            kv_heads = getattr(config, 'num_key_value_heads', None) or config.num_attention_heads
+            layers = config.num_hidden_layers
+        except AttributeError:
+            return None
+        return 2 * layers * kv_heads * head_dim * element_size
+
+    def _window_memory_bytes(self, model, window_seconds: float, max_new_tokens: int,
+                             element_size: int) -> Optional[int]:
+        """
+        Rough working memory of generating one window: the decoder's KV cache
+        over audio, prompt and new tokens, plus one encoder attention map.
+        None if the model config lacks the needed sizes.
+        """
+        per_token = self._kv_bytes_per_token(model, element_size)
+        if per_token is None:
+            return None
+        sequence = window_seconds * AUDIO_TOKENS_PER_SECOND + 64 + max_new_tokens
+        kv_cache = per_token * sequence
+
+        audio_config = getattr(model.config, 'audio_config', None)
+        encoder_heads = getattr(audio_config, 'encoder_attention_heads', 20)
+        encoder_chunks = math.ceil(window_seconds / 30)
+        encoder_attention = encoder_chunks * encoder_heads * ENCODER_FRAMES_PER_CHUNK ** 2 * element_size
+        # Logits, activations and allocator slack
+        return int(2 * (kv_cache + encoder_attention))
+
+    def _generate_windows(self, model, processor, audio, prompt: str, timer: StageTimer,
+                          device: str, dtype, window_seconds: float,
+                          batch_size: Optional[int] = None):
+        """
+        Transcribe long audio as overlapping windows and stitch the texts.
+
+        Each window gets a token budget sized to its duration, and windows
+        are generated in batches as large as free memory allows (or
+        `batch_size`). Returns the stitched text and the number of windows.
+        """
+        overlap_seconds = min(DEFAULT_OVERLAP_SECONDS, window_seconds / 4)
+        windows = plan_windows(len(audio), int(window_seconds * SAMPLE_RATE), int(overlap_seconds * SAMPLE_RATE))
+        longest = max(end - start for start, end in windows) / SAMPLE_RATE
+
+        if not batch_size:
+            element_size = 2 if dtype == self._torch.bfloat16 else 4
+            per_window = self._window_memory_bytes(model, longest, token_budget(longest), element_size)
+            batch_size = window_batch_size(per_window, device)
+        batch_size = max(1, int(batch_size))
+        print(f"[INFO] Chunked mode: {len(windows)} windows of up to {longest:.0f}s, "
+              f"{batch_size} per batch", file=sys.stderr)
+
+        # Pad on the left so generate() continues every prompt from its last token
+        processor.tokenizer.padding_side = 'left'
+        texts = []
+        for batch_start in range(0, len(windows), batch_size):
+            batch = windows[batch_start:batch_start + batch_size]
+            max_new_tokens = token_budget(max(end - start for start, end in batch) / SAMPLE_RATE)
+
+            with timer.stage('features'):
+                conversations = [self._conversation(audio[start:end], prompt) for start, end in batch]
+                inputs = processor.apply_chat_template(conversations)
+                inputs = inputs.to(device, dtype=dtype)
+
+            with timer.stage('inference'):
+                outputs = model.generate(**inputs, max_new_tokens=max_new_tokens)
+
+            with timer.stage('decode_tokens'):
+                texts.extend(processor.batch_decode(
+                    outputs[:, inputs.input_ids.shape[1]:],
+                    skip_special_tokens=True
+                ))
+
+            done = len(texts)
+            report_progress(50 + int(40 * done / len(windows)),
+                            f'Transcribed window {done}/{len(windows)}', 'transcribing')
+
+        with timer.stage('stitch'):
+            overlaps = [overlap / SAMPLE_RATE for overlap in window_overlaps(windows)]
+            return stitch_texts(texts, overlaps), len(windows)
+
     def list_models(self) -> List[Dict]:
         """List all available Voxtral models."""
         models = []
@@ -254,7 +546,7 @@ class VoxtralBackend(STTBackend):
             print(f"Error downloading model: {e}")
             raise
 
-    def benchmark(self, audio_path: str, model_name: str, reference_text: str) -> Dict:
+    def benchmark(self, audio_path: str, model_name: str, reference_text: str, **kwargs) -> Dict:
         """
         Benchmark a model by comparing transcription to reference text.
         Calculates Word Error Rate (WER).
@@ -263,12 +555,13 @@ class VoxtralBackend(STTBackend):
             audio_path: Path to audio file
             model_name: Model to benchmark
             reference_text: Ground truth text
+            **kwargs: Transcription options (e.g. quantize='int8')
 
         Returns:
             Dictionary with benchmark results including WER
         """
         # Run transcription
-        result = self.transcribe(audio_path, model_name, task='transcribe')
+        result = self.transcribe(audio_path, model_name, task='transcribe', **kwargs)
 
         if 'error' in result:
             return {
@@ -290,58 +583,11 @@ class VoxtralBackend(STTBackend):
             'hypothesis_text': hypothesis,
             'wer': round(wer, 2),
             'processing_time': result['processing_time'],
+            'timings': result.get('timings', {}),
+            'benchmark': self._benchmark_metrics(audio_path, result),
             'task': result.get('task', 'transcribe')
         }
 
-    def _calculate_wer(self, reference: str, hypothesis: str) -> float:
-        """
-        Calculate Word Error Rate (WER) between reference and hypothesis.
-        WER = (S + D + I) / N
-        where S = substitutions, D = deletions, I = insertions, N = words in reference
-
-        Args:
-            reference: Ground truth text
-            hypothesis: Transcribed text
-
-        Returns:
-            WER as percentage (0-100)
-        """
-        # Normalize texts
-        ref_words = reference.lower().split()
-        hyp_words = hypothesis.lower().split()
-
-        # Calculate edit distance using dynamic programming
-        r_len = len(ref_words)
-        h_len = len(hyp_words)
-
-        # Create DP table
-        dp = [[0 for _ in range(h_len + 1)] for _ in range(r_len + 1)]
-
-        # Initialize first row and column
-        for i in range(r_len + 1):
-            dp[i][0] = i
-        for j in range(h_len + 1):
-            dp[0][j] = j
-
-        # Fill DP table
-        for i in range(1, r_len + 1):
-            for j in range(1, h_len + 1):
-                if ref_words[i-1] == hyp_words[j-1]:
-                    dp[i][j] = dp[i-1][j-1]
-                else:
-                    substitution = dp[i-1][j-1] + 1
-                    insertion = dp[i][j-1] + 1
-                    deletion = dp[i-1][j] + 1
-                    dp[i][j] = min(substitution, insertion, deletion)
-
-        # Calculate WER
-        edit_distance = dp[r_len][h_len]
-        if r_len == 0:
-            return 100.0 if h_len > 0 else 0.0
-
-        wer = (edit_distance / r_len) * 100
-        return wer
-
 
 if __name__ == '__main__':
     # Test the backend
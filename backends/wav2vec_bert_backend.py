@@ -6,14 +6,21 @@ Optimized for low-resource languages and code-switching scenarios.
 
 import time
 import os
-from typing import Dict, List
-from base import STTBackend, ModelInfo
+from typing import Dict, Iterator, List, Optional
+from base import STTBackend, ModelInfo, StageTimer, model_registry
 from progress import report_progress
+from audio import pipeline_input, SAMPLE_RATE, get_duration, should_stream, stream_audio
+from quantization import check_quantize_mode, load_quantized
+from onnx_engine import DEFAULT_OPSET, OnnxCTCModel, export_ctc_model, onnx_model_path, resolve_ctc_engine
+from ctc import chunked_ctc_ids, streamed_ctc_ids, DEFAULT_CHUNK_LENGTH_S, DEFAULT_STRIDE_LENGTH_S
+from streaming import CTCStreamer, streamer_options
 
 
 class Wav2VecBERTBackend(STTBackend):
     """Facebook Wav2Vec2-BERT speech recognition backend - low-resource language optimization."""
 
+    SUPPORTS_QUANTIZE = True
+
     MODELS = {
         'wav2vec2-base-960h': ModelInfo(
             'wav2vec2-base-960h',
@@ -41,12 +48,6 @@ class Wav2VecBERTBackend(STTBackend):
         ),
     }
 
-    def __init__(self):
-        super().__init__()
-        self._pipeline = None
-        self._current_model = None
-        self._current_model_name = None
-
     def _load_transformers(self):
         """Lazy load transformers module."""
         try:
@@ -58,59 +59,88 @@ class Wav2VecBERTBackend(STTBackend):
                 "pip install transformers --break-system-packages"
             )
 
-    def _get_pipeline(self, model_name: str):
+    def _get_pipeline(self, model_name: str, quantize: Optional[str] = None):
         """Load or return cached model pipeline."""
-        if self._current_model_name != model_name:
-            is_downloading = not self.is_model_installed(model_name)
+        key = f'{model_name}@{quantize}' if quantize else model_name
+        return model_registry.get('wav2vec_bert', key, lambda: self._load_model(model_name, quantize),
+                                  self._size_hint(model_name))
 
-            if is_downloading:
-                report_progress(10, f'Downloading {model_name}...', 'downloading')
-            else:
-                report_progress(10, f'Loading {model_name} model...', 'loading_model')
+    def _model_id(self, model_name: str) -> str:
+        """HuggingFace repository of a model."""
+        if model_name == 'wav2vec2-large-xlsr-53-english':
+            return f"jonatasgrosman/{model_name}"
+        return f"facebook/{model_name}"
+
+    def _get_onnx_model(self, model_name: str, onnx_threads: Optional[int] = None):
+        """Load or return a cached onnxruntime session and processor for an exported model."""
+        key = f'{model_name}@onnx:{onnx_threads or "default"}'
+        return model_registry.get('wav2vec_bert', key, lambda: self._load_onnx_model(model_name, onnx_threads),
+                                  self._size_hint(model_name))
+
+    def _load_onnx_model(self, model_name: str, onnx_threads: Optional[int] = None):
+        """Load an exported Wav2Vec2 model into onnxruntime, plus its processor."""
+        from transformers import AutoProcessor
+        processor = AutoProcessor.from_pretrained(self._model_id(model_name), token=self._get_hf_token())
+        return OnnxCTCModel(onnx_model_path('wav2vec_bert', model_name), onnx_threads), processor
+
+    def _load_model(self, model_name: str, quantize: Optional[str] = None):
+        """Load a Wav2Vec2 model pipeline (optionally with an int8-quantized model)."""
+        is_downloading = not self.is_model_installed(model_name)
+
+        if is_downloading:
+            report_progress(10, f'Downloading {model_name}...', 'downloading')
+        else:
+            report_progress(10, f'Loading {model_name} model...', 'loading_model')
 
-            print(f"Loading Wav2Vec2 model: {model_name}...")
-            pipeline_fn = self._load_transformers()
+        print(f"Loading Wav2Vec2 model: {model_name}...")
+        pipeline_fn = self._load_transformers()
 
-            # Determine the correct model repository
-            if model_name == 'wav2vec2-large-xlsr-53-english':
-                model_id = f"jonatasgrosman/{model_name}"
-            else:
-                model_id = f"facebook/{model_name}"
+        # Determine the correct model repository
+        model_id = self._model_id(model_name)
 
-            try:
-                if is_downloading:
-                    report_progress(15, 'Downloading model files from HuggingFace...', 'downloading')
+        try:
+            if is_downloading:
+                report_progress(15, 'Downloading model files from HuggingFace...', 'downloading')
 
-                # Get HuggingFace token for authentication
-                token = self._get_hf_token()
+            # Get HuggingFace token for authentication
+            token = self._get_hf_token()
 
-                self._current_model = pipeline_fn(
+            def load_pipeline(model, **components):
+                return pipeline_fn(
                     "automatic-speech-recognition",
-                    model=model_id,
+                    model=model,
                     device=-1,  # CPU by default, use 0 for CUDA
-                    token=token
+                    token=token,
+                    **components
                 )
-                self._current_model_name = model_name
 
-                if is_downloading:
-                    report_progress(30, 'Download complete! Model loaded.', 'loaded')
-                else:
-                    report_progress(30, 'Model loaded successfully', 'loaded')
-
-                print(f"Wav2Vec2 model {model_name} loaded successfully!")
-            except Exception as e:
-                error_msg = str(e).lower()
-                # Check for authentication errors
-                if '401' in error_msg or '403' in error_msg or 'authentication' in error_msg or 'unauthorized' in error_msg:
-                    print(f"Error loading Wav2Vec2 model {model_name}: Authentication failed")
-                    raise Exception(
-                        "HuggingFace authentication required. Please add your HuggingFace token in Settings > Advanced Settings > HuggingFace Authentication. "
-                        "Get a free token at https://huggingface.co/settings/tokens"
-                    )
-                print(f"Error loading Wav2Vec2 model {model_name}: {e}")
-                raise
-
-        return self._current_model
+            if quantize:
+                # Swap the pipeline's model for its dynamic int8 version
+                model = load_pipeline(load_quantized(
+                    f'wav2vec_bert/{model_name}', model_id, lambda: load_pipeline(model_id).model, token
+                ), tokenizer=model_id, feature_extractor=model_id)
+            else:
+                model = load_pipeline(model_id)
+
+            if is_downloading:
+                report_progress(30, 'Download complete! Model loaded.', 'loaded')
+            else:
+                report_progress(30, 'Model loaded successfully', 'loaded')
+
+            print(f"Wav2Vec2 model {model_name} loaded successfully!")
+        except Exception as e:
+            error_msg = str(e).lower()
+            # Check for authentication errors
+            if '401' in error_msg or '403' in error_msg or 'authentication' in error_msg or 'unauthorized' in error_msg:
+                print(f"Error loading Wav2Vec2 model {model_name}: Authentication failed")
+                raise Exception(
+                    "HuggingFace authentication required. Please add your HuggingFace token in Settings > Advanced Settings > HuggingFace Authentication. "
+                    "Get a free token at https://huggingface.co/settings/tokens"
+                )
+            print(f"Error loading Wav2Vec2 model {model_name}: {e}")
+            raise
+
+        return model
 
     def transcribe(self, audio_path: str, model_name: str = 'wav2vec2-base-960h', **kwargs) -> Dict:
         """
@@ -119,15 +149,33 @@ class Wav2VecBERTBackend(STTBackend):
         Args:
             audio_path: Path to audio file
             model_name: Wav2Vec2 model to use
-            **kwargs: Additional options (currently unused)
+            **kwargs: Additional options
+                - chunk_length_s: Window length for long audio (default 30s, 0 disables chunking)
+                - stride_length_s: Context on each side of a window (default 5s)
+                - quantize: 'int8' for dynamic int8 quantization of Linear layers (CPU, PyTorch engine only)
+                - engine: 'pytorch' (default) or 'onnx' (onnxruntime on CPU; needs export-onnx,
+                  falls back to PyTorch without an export)
+                - onnx_threads: onnxruntime intra-op thread count
+                - stream: Decode incrementally with ffmpeg while inferring (needs chunking;
+                  no word timestamps); default streams long recordings that are not in
+                  the decoded-audio cache
+                - vad: Skip silence with an energy VAD; timestamps stay on the original timeline
 
         Returns:
             Dictionary with transcription results
         """
+        if kwargs.get('vad'):
+            return self._transcribe_speech_only(audio_path, model_name, **kwargs)
+
         start_time = time.time()
+        timer = StageTimer()
+        chunk_length_s = kwargs.get('chunk_length_s', DEFAULT_CHUNK_LENGTH_S)
+        stride_length_s = kwargs.get('stride_length_s', DEFAULT_STRIDE_LENGTH_S)
 
         try:
             report_progress(0, 'Starting transcription...', 'initializing')
+            quantize = check_quantize_mode(kwargs.get('quantize'))
+            engine = resolve_ctc_engine('wav2vec_bert', model_name, kwargs.get('engine'), quantize)
 
             # Check if model needs to be downloaded
             if not self.is_model_installed(model_name):
@@ -136,49 +184,70 @@ class Wav2VecBERTBackend(STTBackend):
                 print(f"[DOWNLOAD] Model {model_name} not found in cache. Downloading...")
 
             # Load model pipeline (will download if needed)
-            pipe = self._get_pipeline(model_name)
-
-            # Load and convert audio to WAV if needed (M4A not always supported)
-            import librosa
-            import soundfile as sf
-            import tempfile
+            with timer.stage('load_model'):
+                if engine == 'onnx':
+                    onnx_model, processor = self._get_onnx_model(model_name, kwargs.get('onnx_threads'))
+                else:
+                    pipe = self._get_pipeline(model_name, quantize)
 
             report_progress(35, 'Loading audio file...', 'loading_audio')
             print(f"Loading audio file: {audio_path}")
-            # Load audio with librosa (supports M4A via audioread/ffmpeg)
-            audio_data, sample_rate = librosa.load(audio_path, sr=16000, mono=True)
-
-            # Save to temporary WAV file
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp_file:
-                temp_wav_path = tmp_file.name
-                sf.write(temp_wav_path, audio_data, sample_rate)
-
-            try:
-                # Transcribe with timestamps enabled for long audio support
-                report_progress(50, 'Transcribing audio...', 'transcribing')
-                print(f"Transcribing with Wav2Vec2 {model_name}...")
-                result = pipe(temp_wav_path, return_timestamps=True)
-
-                processing_time = time.time() - start_time
-
-                report_progress(90, 'Processing results...', 'finalizing')
-
-                # Extract text and segments from result
-                text = result['text'] if isinstance(result, dict) else result
-                segments = result.get('chunks', []) if isinstance(result, dict) else []
-
-                return {
-                    'text': text.strip(),
-                    'processing_time': round(processing_time, 2),
-                    'segments': segments,
-                    'language': 'auto',  # Wav2Vec2 auto-detects language
-                    'model': model_name,
-                    'backend': 'wav2vec_bert'
-                }
-            finally:
-                # Clean up temporary file
-                if os.path.exists(temp_wav_path):
-                    os.unlink(temp_wav_path)
+            # Decoded 16 kHz float32 array is handed straight to the pipeline
+            audio_data = kwargs.pop('audio', None)
+            # Streaming needs chunked inference and a file still to decode
+            stream = kwargs.get('stream')
+            if not chunk_length_s or audio_data is not None:
+                stream = False
+            elif stream is None:
+                stream = should_stream(audio_path)
+            if not stream:
+                audio_data = self._load_audio(audio_path, timer, audio_data)
+
+            # Transcribe with timestamps enabled for long audio support
+            report_progress(50, 'Transcribing audio...', 'transcribing')
+            print(f"Transcribing with Wav2Vec2 {model_name}...")
+            if engine == 'onnx':
+                result = self._transcribe_ctc(processor, onnx_model.logits, processor.batch_decode, "np",
+                                              audio_path, audio_data, timer, chunk_length_s, stride_length_s)
+            elif stream:
+                import torch
+
+                def pytorch_logits(inputs):
+                    with torch.no_grad():
+                        return pipe.model(**inputs).logits
+
+                result = self._transcribe_ctc(pipe.feature_extractor, pytorch_logits,
+                                              pipe.tokenizer.batch_decode, "pt",
+                                              audio_path, audio_data, timer, chunk_length_s, stride_length_s)
+            else:
+                # The CTC pipeline windows the audio and stitches logits at the
+                # strided boundaries, so peak memory is bounded by the chunk size
+                chunking = {}
+                if chunk_length_s:
+                    chunking = {'chunk_length_s': chunk_length_s, 'stride_length_s': stride_length_s}
+                with timer.stage('inference'):
+                    result = pipe(pipeline_input(audio_data), return_timestamps=True, **chunking)
+
+            processing_time = time.time() - start_time
+
+            report_progress(90, 'Processing results...', 'finalizing')
+
+            # Extract text and segments from result
+            text = result['text'] if isinstance(result, dict) else result
+            segments = result.get('chunks', []) if isinstance(result, dict) else []
+
+            return {
+                'text': text.strip(),
+                'processing_time': round(processing_time, 2),
+                'segments': segments,
+                'language': 'auto',  # Wav2Vec2 auto-detects language
+                'model': model_name,
+                'backend': 'wav2vec_bert',
+                'engine': engine,
+                'quantize': quantize,
+                'streamed': stream,
+                **timer.report()
+            }
 
         except Exception as e:
             processing_time = time.time() - start_time
@@ -190,6 +259,132 @@ class Wav2VecBERTBackend(STTBackend):
                 'backend': 'wav2vec_bert'
             }
 
+    def _transcribe_ctc(self, feature_extractor, logits_fn, batch_decode, return_tensors: str,
+                        audio_path: str, audio_data, timer: StageTimer,
+                        chunk_length_s: float, stride_length_s: float) -> Dict:
+        """
+        Greedy windowed CTC outside the pipeline (no timestamps).
+
+        Used by the ONNX engine and for streaming decode; when `audio_data`
+        is None the file is decoded incrementally with ffmpeg.
+        """
+        def window_logits(window):
+            with timer.stage('features'):
+                inputs = feature_extractor(window, sampling_rate=SAMPLE_RATE, return_tensors=return_tensors)
+            with timer.stage('inference'):
+                return logits_fn(inputs)[0]
+
+        chunk_samples = int(chunk_length_s * SAMPLE_RATE) if chunk_length_s else 0
+        stride_samples = int(stride_length_s * SAMPLE_RATE)
+        if audio_data is None:
+            print(f"Streaming decode of {audio_path}")
+            predicted_ids = streamed_ctc_ids(stream_audio(audio_path, timer=timer), window_logits,
+                                             chunk_samples, stride_samples,
+                                             total_samples=int(get_duration(audio_path) * SAMPLE_RATE))
+        elif chunk_samples and len(audio_data) > chunk_samples:
+            predicted_ids = chunked_ctc_ids(audio_data, window_logits, chunk_samples, stride_samples)
+        else:
+            predicted_ids = window_logits(audio_data).argmax(-1).tolist()
+
+        with timer.stage('decode_tokens'):
+            return {'text': batch_decode([predicted_ids])[0]}
+
+    def transcribe_batch(self, audio_paths: List[str], model_name: str = 'wav2vec2-base-960h',
+                         batch_size: int = 8, max_batch_seconds: Optional[float] = None,
+                         **kwargs) -> Iterator[Dict]:
+        """
+        Transcribe many files with one model load, in padded batches.
+
+        Files are grouped by duration so each batch pads to a similar length;
+        the pipeline pads, batches and (for long files) chunks them.
+
+        Args:
+            audio_paths: Paths of audio files
+            model_name: Wav2Vec2 model to use
+            batch_size: Maximum number of files per forward pass
+            max_batch_seconds: If set, schedule length buckets under this
+                padded-audio budget per batch (batch_size still caps items)
+            **kwargs: Same options as `transcribe`
+
+        Yields:
+            One result per file as its batch completes
+        """
+        if kwargs.get('engine') == 'onnx' or kwargs.get('vad'):
+            # ONNX sessions and VAD-trimmed files run one file at a time
+            yield from super().transcribe_batch(audio_paths, model_name, **kwargs)
+            return
+
+        chunk_length_s = kwargs.get('chunk_length_s', DEFAULT_CHUNK_LENGTH_S)
+        stride_length_s = kwargs.get('stride_length_s', DEFAULT_STRIDE_LENGTH_S)
+        chunking = {}
+        if chunk_length_s:
+            chunking = {'chunk_length_s': chunk_length_s, 'stride_length_s': stride_length_s}
+
+        quantize = check_quantize_mode(kwargs.get('quantize'))
+
+        def infer_batch(audios):
+            pipe = self._get_pipeline(model_name, quantize)
+            results = pipe(
+                [pipeline_input(audio) for audio in audios],
+                batch_size=len(audios),
+                return_timestamps=True,
+                **chunking
+            )
+            return [{
+                'text': result['text'].strip(),
+                'segments': result.get('chunks', []),
+                'language': 'auto',
+                'model': model_name,
+                'backend': 'wav2vec_bert',
+                'quantize': quantize
+            } for result in results]
+
+        yield from self._transcribe_in_batches(
+            audio_paths, model_name, 'wav2vec_bert', infer_batch, batch_size,
+            max_batch_seconds=max_batch_seconds, **kwargs
+        )
+
+    def export_onnx(self, model_name: str, opset: int = DEFAULT_OPSET) -> Dict:
+        """Export a Wav2Vec2 model (encoder + CTC head) to ONNX for the 'onnx' engine."""
+        pipe = self._get_pipeline(model_name)
+        print(f"Exporting Wav2Vec2 model {model_name} to ONNX...")
+        return export_ctc_model(pipe.model, pipe.feature_extractor,
+                                onnx_model_path('wav2vec_bert', model_name), SAMPLE_RATE, opset)
+
+    def create_streamer(self, model_name: str = 'wav2vec2-base-960h', **kwargs) -> CTCStreamer:
+        """
+        Incremental CTC recognizer for live audio.
+
+        Takes the quantize/engine/onnx_threads options of `transcribe` plus
+        the streamer's step_s, left_context_s, right_context_s and endpoint_s.
+        """
+        quantize = check_quantize_mode(kwargs.get('quantize'))
+        engine = resolve_ctc_engine('wav2vec_bert', model_name, kwargs.get('engine'), quantize)
+        if engine == 'onnx':
+            onnx_model, processor = self._get_onnx_model(model_name, kwargs.get('onnx_threads'))
+            feature_extractor, tokenizer = processor, processor.tokenizer
+
+            def window_logits(window):
+                inputs = feature_extractor(window, sampling_rate=SAMPLE_RATE, return_tensors="np")
+                return onnx_model.logits(inputs)[0]
+        else:
+            import torch
+
+            pipe = self._get_pipeline(model_name, quantize)
+            feature_extractor, tokenizer = pipe.feature_extractor, pipe.tokenizer
+
+            def window_logits(window):
+                inputs = feature_extractor(window, sampling_rate=SAMPLE_RATE, return_tensors="pt")
+                with torch.no_grad():
+                    return pipe.model(**inputs).logits[0]
+
+        return CTCStreamer(
+            window_logits,
+            lambda ids: tokenizer.batch_decode([ids])[0],
+            blank_id=getattr(tokenizer, 'pad_token_id', None),
+            **streamer_options(kwargs)
+        )
+
     def list_models(self) -> List[Dict]:
         """List all available Wav2Vec2 models."""
         models = []
@@ -235,7 +430,7 @@ class Wav2VecBERTBackend(STTBackend):
             print(f"Error downloading model: {e}")
             raise
 
-    def benchmark(self, audio_path: str, model_name: str, reference_text: str) -> Dict:
+    def benchmark(self, audio_path: str, model_name: str, reference_text: str, **kwargs) -> Dict:
         """
         Benchmark a model by comparing transcription to reference text.
         Calculates Word Error Rate (WER).
@@ -244,12 +439,13 @@ class Wav2VecBERTBackend(STTBackend):
             audio_path: Path to audio file
             model_name: Model to benchmark
             reference_text: Ground truth text
+            **kwargs: Transcription options (e.g. quantize='int8')
 
         Returns:
             Dictionary with benchmark results including WER
         """
         # Run transcription
-        result = self.transcribe(audio_path, model_name)
+        result = self.transcribe(audio_path, model_name, **kwargs)
 
         if 'error' in result:
             return {
@@ -271,58 +467,11 @@ class Wav2VecBERTBackend(STTBackend):
             'hypothesis_text': hypothesis,
             'wer': round(wer, 2),
             'processing_time': result['processing_time'],
+            'timings': result.get('timings', {}),
+            'benchmark': self._benchmark_metrics(audio_path, result),
             'language': result.get('language', 'auto')
         }
 
-    def _calculate_wer(self, reference: str, hypothesis: str) -> float:
-        """
-        Calculate Word Error Rate (WER) between reference and hypothesis.
-        WER = (S + D + I) / N
-        where S = substitutions, D = deletions, I = insertions, N = words in reference
-
-        Args:
-            reference: Ground truth text
-            hypothesis: Transcribed text
-
-        Returns:
-            WER as percentage (0-100)
-        """
-        # Normalize texts
-        ref_words = reference.lower().split()
-        hyp_words = hypothesis.lower().split()
-
-        # Calculate edit distance using dynamic programming
-        r_len = len(ref_words)
-        h_len = len(hyp_words)
-
-        # Create DP table
-        dp = [[0 for _ in range(h_len + 1)] for _ in range(r_len + 1)]
-
-        # Initialize first row and column
-        for i in range(r_len + 1):
-            dp[i][0] = i
-        for j in range(h_len + 1):
-            dp[0][j] = j
-
-        # Fill DP table
-        for i in range(1, r_len + 1):
-            for j in range(1, h_len + 1):
-                if ref_words[i-1] == hyp_words[j-1]:
-                    dp[i][j] = dp[i-1][j-1]
-                else:
-                    substitution = dp[i-1][j-1] + 1
-                    insertion = dp[i][j-1] + 1
-                    deletion = dp[i-1][j] + 1
-                    dp[i][j] = min(substitution, insertion, deletion)
-
-        # Calculate WER
-        edit_distance = dp[r_len][h_len]
-        if r_len == 0:
-            return 100.0 if h_len > 0 else 0.0
-
-        wer = (edit_distance / r_len) * 100
-        return wer
-
 
 if __name__ == '__main__':
     # Test the backend
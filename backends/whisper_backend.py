@@ -7,8 +7,47 @@ import time
 import os
 import sys
 from typing import Dict, List
-from base import STTBackend, ModelInfo
+from base import STTBackend, ModelInfo, StageTimer, model_registry
 from progress import report_progress
+from audio import pipeline_input
+from streaming import AGREEMENT_OPTIONS, LocalAgreementStreamer, streamer_options
+
+
+# Inference engines for the Whisper models
+ENGINES = ('openai-whisper', 'faster-whisper')
+DEFAULT_ENGINE = 'openai-whisper'
+
+# CTranslate2 compute types usable on CPU
+CPU_COMPUTE_TYPES = ('int8', 'int8_float32', 'float32')
+DEFAULT_COMPUTE_TYPE = 'int8'
+
+# Decoding options forwarded to each engine's transcribe; every other option
+# configures the backend or runner (vad, batching, caching, ...) and would be
+# rejected by the engine
+WHISPER_DECODE_OPTIONS = (
+    'language', 'task', 'temperature', 'compression_ratio_threshold', 'logprob_threshold',
+    'no_speech_threshold', 'condition_on_previous_text', 'initial_prompt', 'word_timestamps',
+    'prepend_punctuations', 'append_punctuations', 'clip_timestamps', 'hallucination_silence_threshold',
+    'sample_len', 'best_of', 'beam_size', 'patience', 'length_penalty', 'prefix', 'suppress_tokens',
+    'suppress_blank', 'without_timestamps', 'max_initial_timestamp', 'fp16', 'verbose'
+)
+FASTER_WHISPER_DECODE_OPTIONS = (
+    'language', 'task', 'temperature', 'compression_ratio_threshold', 'log_prob_threshold',
+    'no_speech_threshold', 'condition_on_previous_text', 'prompt_reset_on_temperature',
+    'initial_prompt', 'word_timestamps', 'prepend_punctuations', 'append_punctuations',
+    'clip_timestamps', 'hallucination_silence_threshold', 'best_of', 'beam_size', 'patience',
+    'length_penalty', 'repetition_penalty', 'no_repeat_ngram_size', 'prefix', 'suppress_tokens',
+    'suppress_blank', 'without_timestamps', 'max_initial_timestamp', 'max_new_tokens',
+    'chunk_length', 'hotwords', 'multilingual', 'vad_filter', 'vad_parameters'
+)
+
+
+def decode_options(options: Dict, allowed) -> Dict:
+    """The options among `options` named in `allowed`; language 'auto' means detect."""
+    selected = {name: value for name, value in options.items() if name in allowed}
+    if selected.get('language') == 'auto':
+        del selected['language']
+    return selected
 
 
 class WhisperBackend(STTBackend):
@@ -34,8 +73,6 @@ class WhisperBackend(STTBackend):
     def __init__(self):
         super().__init__()
         self._whisper = None
-        self._current_model = None
-        self._current_model_name = None
         self._url_patched = False
 
     def _load_whisper(self):
@@ -82,53 +119,103 @@ class WhisperBackend(STTBackend):
                 self._whisper._MODELS[model_name] = fallback_url
             print("[INFO] Whisper URLs patched to use blob storage fallback", file=sys.stderr)
 
-    def _get_model(self, model_name: str):
-        """Load or return cached model."""
-        if self._current_model_name != model_name:
-            # Check if this is the RedHat quantized model
-            if model_name == 'large-v3-quantized-w4a16':
-                print(f"[INFO] Loading RedHat quantized Whisper model: {model_name}...", file=sys.stderr)
+    def _get_model(self, model_name: str, engine: str = DEFAULT_ENGINE,
+                   compute_type: str = DEFAULT_COMPUTE_TYPE):
+        """Load or return cached model for the given engine."""
+        if engine == 'faster-whisper':
+            return model_registry.get(
+                'whisper', f'{model_name}@faster-whisper:{compute_type}',
+                lambda: self._load_faster_whisper(model_name, compute_type),
+                self._size_hint(model_name)
+            )
+        return model_registry.get('whisper', model_name, lambda: self._load_model(model_name),
+                                  self._size_hint(model_name))
+
+    def _load_faster_whisper(self, model_name: str, compute_type: str):
+        """Load a CTranslate2 conversion of a Whisper model via faster-whisper."""
+        if model_name == 'large-v3-quantized-w4a16':
+            raise ValueError(
+                f"Model {model_name} is not available for the faster-whisper engine; "
+                "use large-v3 with an int8 compute type instead"
+            )
+        if compute_type not in CPU_COMPUTE_TYPES:
+            raise ValueError(
+                f"Unsupported compute type: {compute_type} "
+                f"(choose from {', '.join(CPU_COMPUTE_TYPES)})"
+            )
 
-                # Check if model needs to be downloaded
-                is_downloading = not self.is_model_installed(model_name)
-                if is_downloading:
-                    report_progress(15, f'Downloading quantized model {model_name}...', 'downloading')
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise ImportError(
+                "faster-whisper library not found. Install with: "
+                "pip install faster-whisper --break-system-packages"
+            )
+
+        print(f"[INFO] Loading faster-whisper model: {model_name} ({compute_type})...", file=sys.stderr)
+        return WhisperModel(model_name, device='cpu', compute_type=compute_type)
+
+    def _transcribe_faster_whisper(self, model, audio_data, timer: StageTimer, **kwargs) -> Dict:
+        """Run a faster-whisper model; segments are generated lazily, so drain them here."""
+        with timer.stage('inference'):
+            segments, info = model.transcribe(audio_data, **decode_options(kwargs, FASTER_WHISPER_DECODE_OPTIONS))
+            segments = [
+                {'id': i, 'start': segment.start, 'end': segment.end, 'text': segment.text}
+                for i, segment in enumerate(segments)
+            ]
 
-                try:
-                    from transformers import pipeline
+        return {
+            'text': ''.join(segment['text'] for segment in segments).strip(),
+            'segments': segments,
+            'language': info.language
+        }
 
-                    # Get HuggingFace token for authentication
-                    token = self._get_hf_token()
+    def _load_model(self, model_name: str):
+        """Load a Whisper model (native, or the RedHat quantized pipeline)."""
+        # Check if this is the RedHat quantized model
+        if model_name == 'large-v3-quantized-w4a16':
+            print(f"[INFO] Loading RedHat quantized Whisper model: {model_name}...", file=sys.stderr)
 
-                    self._current_model = pipeline(
-                        "automatic-speech-recognition",
-                        model="RedHatAI/whisper-large-v3-quantized.w4a16",
-                        device=-1,  # CPU by default
-                        token=token
+            # Check if model needs to be downloaded
+            is_downloading = not self.is_model_installed(model_name)
+            if is_downloading:
+                report_progress(15, f'Downloading quantized model {model_name}...', 'downloading')
+
+            try:
+                from transformers import pipeline
+
+                # Get HuggingFace token for authentication
+                token = self._get_hf_token()
+
+                model = pipeline(
+                    "automatic-speech-recognition",
+                    model="RedHatAI/whisper-large-v3-quantized.w4a16",
+                    device=-1,  # CPU by default
+                    token=token
+                )
+
+                if is_downloading:
+                    report_progress(30, 'Download complete! Model loaded.', 'loaded')
+
+            except ImportError as e:
+                # Re-raise with original error message to help with debugging
+                raise ImportError(f"Failed to load quantized model: {str(e)}")
+            except Exception as e:
+                error_msg = str(e).lower()
+                # Check for authentication errors
+                if '401' in error_msg or '403' in error_msg or 'authentication' in error_msg or 'unauthorized' in error_msg:
+                    print(f"Error loading quantized Whisper model {model_name}: Authentication failed")
+                    raise Exception(
+                        "HuggingFace authentication required. Please add your HuggingFace token in Settings > Advanced Settings > HuggingFace Authentication. "
+                        "Get a free token at https://huggingface.co/settings/tokens"
                     )
+                raise
+        else:
+            whisper = self._load_whisper()
+            print(f"[INFO] Loading Whisper model: {model_name}...", file=sys.stderr)
+            model = whisper.load_model(model_name)
 
-                    if is_downloading:
-                        report_progress(30, 'Download complete! Model loaded.', 'loaded')
-
-                except ImportError as e:
-                    # Re-raise with original error message to help with debugging
-                    raise ImportError(f"Failed to load quantized model: {str(e)}")
-                except Exception as e:
-                    error_msg = str(e).lower()
-                    # Check for authentication errors
-                    if '401' in error_msg or '403' in error_msg or 'authentication' in error_msg or 'unauthorized' in error_msg:
-                        print(f"Error loading quantized Whisper model {model_name}: Authentication failed")
-                        raise Exception(
-                            "HuggingFace authentication required. Please add your HuggingFace token in Settings > Advanced Settings > HuggingFace Authentication. "
-                            "Get a free token at https://huggingface.co/settings/tokens"
-                        )
-                    raise
-            else:
-                whisper = self._load_whisper()
-                print(f"[INFO] Loading Whisper model: {model_name}...", file=sys.stderr)
-                self._current_model = whisper.load_model(model_name)
-            self._current_model_name = model_name
-        return self._current_model
+        return model
 
     def transcribe(self, audio_path: str, model_name: str = 'base', **kwargs) -> Dict:
         """
@@ -137,93 +224,115 @@ class WhisperBackend(STTBackend):
         Args:
             audio_path: Path to audio file
             model_name: Whisper model to use (tiny, base, small, medium, large, large-v3, turbo)
-            **kwargs: Additional Whisper options (language, task, etc.)
+            **kwargs: Whisper decoding options (language, task, beam_size, ...;
+                see WHISPER_DECODE_OPTIONS), other options are ignored
+                - engine: 'openai-whisper' (PyTorch, default) or 'faster-whisper' (CTranslate2)
+                - compute_type: faster-whisper compute type (int8, int8_float32, float32)
+                - vad: Skip silence with an energy VAD; timestamps stay on the original timeline
 
         Returns:
             Dictionary with transcription results
         """
+        if kwargs.get('vad'):
+            return self._transcribe_speech_only(audio_path, model_name, **kwargs)
+
         start_time = time.time()
+        timer = StageTimer()
+        engine = kwargs.pop('engine', DEFAULT_ENGINE)
+        compute_type = kwargs.pop('compute_type', DEFAULT_COMPUTE_TYPE)
+        kwargs.pop('vad', None)
 
         try:
             # Report initial progress
             report_progress(0, 'Starting transcription...', 'initializing')
 
+            if engine not in ENGINES:
+                raise ValueError(f"Unknown Whisper engine: {engine} (choose from {', '.join(ENGINES)})")
+            if kwargs.pop('quantize', None):
+                raise ValueError("Whisper has no dynamic int8 mode; use engine='faster-whisper' with compute_type='int8'")
+
             # Check if model needs to be downloaded (works for ALL models)
-            if not self.is_model_installed(model_name):
+            if not self.is_model_installed(model_name, engine):
                 model_info = self.MODELS.get(model_name)
                 model_size = model_info.size if model_info else '~1GB'
                 report_progress(5, f'Model not installed. Downloading {model_name} ({model_size})...', 'downloading')
                 print(f"[DOWNLOAD] Model {model_name} not found in cache. Downloading...", file=sys.stderr)
 
             # Load model
-            is_downloading = not self.is_model_installed(model_name)
+            is_downloading = not self.is_model_installed(model_name, engine)
             if is_downloading:
                 report_progress(10, f'Downloading {model_name}...', 'downloading')
             else:
                 report_progress(10, f'Loading {model_name} model...', 'loading_model')
 
-            model = self._get_model(model_name)
+            with timer.stage('load_model'):
+                model = self._get_model(model_name, engine, compute_type)
 
             if is_downloading:
                 report_progress(28, 'Download complete! Model loaded.', 'loaded')
 
-            # Load and convert audio to WAV if needed (M4A not always supported)
-            import librosa
-            import soundfile as sf
-            import tempfile
-
             report_progress(30, 'Loading audio file...', 'loading_audio')
             print(f"[INFO] Loading audio file: {audio_path}", file=sys.stderr)
-            # Load audio with librosa (supports M4A via audioread/ffmpeg)
-            audio_data, sample_rate = librosa.load(audio_path, sr=16000, mono=True)
-
-            # Save to temporary WAV file for Whisper
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp_file:
-                temp_wav_path = tmp_file.name
-                sf.write(temp_wav_path, audio_data, sample_rate)
-
-            try:
-                # Transcribe
-                report_progress(50, 'Transcribing audio...', 'transcribing')
-                print(f"[INFO] Transcribing with Whisper {model_name}...", file=sys.stderr)
-
-                # Handle quantized model (transformers pipeline) vs native Whisper
-                if model_name == 'large-v3-quantized-w4a16':
-                    # Transformers pipeline call - enable timestamps for long audio files
-                    result = model(temp_wav_path, return_timestamps=True)
-                    report_progress(90, 'Processing results...', 'finalizing')
-                    processing_time = time.time() - start_time
-
-                    # Extract text and segments from result
-                    text = result['text'].strip() if isinstance(result, dict) else str(result).strip()
-                    segments = result.get('chunks', []) if isinstance(result, dict) else []
-
-                    return {
-                        'text': text,
-                        'processing_time': round(processing_time, 2),
-                        'segments': segments,
-                        'language': 'auto',
-                        'model': model_name,
-                        'backend': 'whisper'
-                    }
-                else:
-                    # Native Whisper model call
-                    result = model.transcribe(temp_wav_path, **kwargs)
-                    report_progress(90, 'Processing results...', 'finalizing')
-                    processing_time = time.time() - start_time
-
-                    return {
-                        'text': result['text'].strip(),
-                        'processing_time': round(processing_time, 2),
-                        'segments': result.get('segments', []),
-                        'language': result.get('language', 'unknown'),
-                        'model': model_name,
-                        'backend': 'whisper'
-                    }
-            finally:
-                # Clean up temporary file
-                if os.path.exists(temp_wav_path):
-                    os.unlink(temp_wav_path)
+            # Decoded 16 kHz float32 array is handed straight to the model
+            audio_data = self._load_audio(audio_path, timer, kwargs.pop('audio', None))
+
+            # Transcribe
+            report_progress(50, 'Transcribing audio...', 'transcribing')
+            print(f"[INFO] Transcribing with Whisper {model_name} ({engine})...", file=sys.stderr)
+
+            # CTranslate2 engine vs quantized model (transformers pipeline) vs native Whisper
+            if engine == 'faster-whisper':
+                result = self._transcribe_faster_whisper(model, audio_data, timer, **kwargs)
+                report_progress(90, 'Processing results...', 'finalizing')
+                processing_time = time.time() - start_time
+
+                return {
+                    **result,
+                    'processing_time': round(processing_time, 2),
+                    'model': model_name,
+                    'backend': 'whisper',
+                    'engine': engine,
+                    'compute_type': compute_type,
+                    **timer.report()
+                }
+            elif model_name == 'large-v3-quantized-w4a16':
+                # Transformers pipeline call - enable timestamps for long audio files
+                with timer.stage('inference'):
+                    result = model(pipeline_input(audio_data), return_timestamps=True)
+                report_progress(90, 'Processing results...', 'finalizing')
+                processing_time = time.time() - start_time
+
+                # Extract text and segments from result
+                text = result['text'].strip() if isinstance(result, dict) else str(result).strip()
+                segments = result.get('chunks', []) if isinstance(result, dict) else []
+
+                return {
+                    'text': text,
+                    'processing_time': round(processing_time, 2),
+                    'segments': segments,
+                    'language': 'auto',
+                    'model': model_name,
+                    'backend': 'whisper',
+                    'engine': engine,
+                    **timer.report()
+                }
+            else:
+                # Native Whisper model call (accepts a 16 kHz float32 array)
+                with timer.stage('inference'):
+                    result = model.transcribe(audio_data, **decode_options(kwargs, WHISPER_DECODE_OPTIONS))
+                report_progress(90, 'Processing results...', 'finalizing')
+                processing_time = time.time() - start_time
+
+                return {
+                    'text': result['text'].strip(),
+                    'processing_time': round(processing_time, 2),
+                    'segments': result.get('segments', []),
+                    'language': result.get('language', 'unknown'),
+                    'model': model_name,
+                    'backend': 'whisper',
+                    'engine': engine,
+                    **timer.report()
+                }
 
         except Exception as e:
             processing_time = time.time() - start_time
@@ -235,6 +344,55 @@ class WhisperBackend(STTBackend):
                 'backend': 'whisper'
             }
 
+    def create_streamer(self, model_name: str = 'base', **kwargs) -> LocalAgreementStreamer:
+        """
+        Local-agreement streamer for live audio; `tiny`/`base` keep caption
+        latency under ~2 s on CPU.
+
+        Each update is one greedy (temperature 0, no fallback) decode of the
+        current window with word timestamps. The language is detected on the
+        first update and then fixed, unless given.
+
+        Args:
+            model_name: Whisper model to use
+            **kwargs: engine, compute_type and language as for `transcribe`,
+                plus the streamer's step_s, trim_s and max_buffer_s
+        """
+        engine = kwargs.get('engine', DEFAULT_ENGINE)
+        compute_type = kwargs.get('compute_type', DEFAULT_COMPUTE_TYPE)
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown Whisper engine: {engine} (choose from {', '.join(ENGINES)})")
+        if model_name == 'large-v3-quantized-w4a16':
+            raise ValueError(f"Model {model_name} does not support streaming (no word timestamps)")
+
+        model = self._get_model(model_name, engine, compute_type)
+        language = decode_options(kwargs, ('language',)).get('language')
+
+        def transcribe_window(audio, prompt):
+            nonlocal language
+            options = {
+                'language': language,
+                'initial_prompt': prompt or None,
+                'word_timestamps': True,
+                'condition_on_previous_text': False
+            }
+            if engine == 'faster-whisper':
+                segments, info = model.transcribe(audio, beam_size=1, temperature=0.0, **options)
+                segments = list(segments)
+                words = [(w.start, w.end, w.word) for segment in segments for w in (segment.words or [])]
+                segment_ends = [segment.end for segment in segments]
+                detected = info.language
+            else:
+                result = model.transcribe(audio, temperature=0.0, fp16=False, **options)
+                segments = result.get('segments', [])
+                words = [(w['start'], w['end'], w['word']) for segment in segments for w in segment.get('words', [])]
+                segment_ends = [segment['end'] for segment in segments]
+                detected = result.get('language')
+            language = language or detected
+            return words, segment_ends
+
+        return LocalAgreementStreamer(transcribe_window, **streamer_options(kwargs, AGREEMENT_OPTIONS))
+
     def list_models(self) -> List[Dict]:
         """List all available Whisper models."""
         models = []
@@ -244,12 +402,23 @@ class WhisperBackend(STTBackend):
             models.append(model_dict)
         return models
 
-    def is_model_installed(self, model_name: str) -> bool:
+    def is_model_installed(self, model_name: str, engine: str = DEFAULT_ENGINE) -> bool:
         """
         Check if a Whisper model is installed.
         Whisper models are stored in ~/.cache/whisper/
-        HuggingFace models (quantized) are stored in ~/.cache/huggingface/hub/
+        HuggingFace models (quantized, faster-whisper) are stored in ~/.cache/huggingface/hub/
         """
+        # faster-whisper fetches CTranslate2 conversions from the Systran HuggingFace repos
+        if engine == 'faster-whisper':
+            hf_cache_dir = os.path.expanduser('~/.cache/huggingface/hub')
+            if not os.path.exists(hf_cache_dir):
+                return False
+            repo_model = 'large-v3-turbo' if model_name == 'turbo' else model_name
+            return any(
+                entry.startswith('models--') and entry.endswith(f'faster-whisper-{repo_model}')
+                for entry in os.listdir(hf_cache_dir)
+            )
+
         # Check for RedHat quantized model in HuggingFace cache
         if model_name == 'large-v3-quantized-w4a16':
             hf_cache_dir = os.path.expanduser('~/.cache/huggingface/hub')
@@ -303,7 +472,7 @@ class WhisperBackend(STTBackend):
             print(f"[ERROR] Error downloading model: {e}", file=sys.stderr)
             raise
 
-    def benchmark(self, audio_path: str, model_name: str, reference_text: str) -> Dict:
+    def benchmark(self, audio_path: str, model_name: str, reference_text: str, **kwargs) -> Dict:
         """
         Benchmark a model by comparing transcription to reference text.
         Calculates Word Error Rate (WER).
@@ -312,12 +481,13 @@ class WhisperBackend(STTBackend):
             audio_path: Path to audio file
             model_name: Model to benchmark
             reference_text: Ground truth text
+            **kwargs: Transcription options (e.g. engine='faster-whisper')
 
         Returns:
             Dictionary with benchmark results including WER
         """
         # Run transcription
-        result = self.transcribe(audio_path, model_name)
+        result = self.transcribe(audio_path, model_name, **kwargs)
 
         if 'error' in result:
             return {
@@ -339,58 +509,11 @@ class WhisperBackend(STTBackend):
             'hypothesis_text': hypothesis,
             'wer': round(wer, 2),
             'processing_time': result['processing_time'],
+            'timings': result.get('timings', {}),
+            'benchmark': self._benchmark_metrics(audio_path, result),
             'language': result.get('language', 'unknown')
         }
 
-    def _calculate_wer(self, reference: str, hypothesis: str) -> float:
-        """
-        Calculate Word Error Rate (WER) between reference and hypothesis.
-        WER = (S + D + I) / N
-        where S = substitutions, D = deletions, I = insertions, N = words in reference
-
-        Args:
-            reference: Ground truth text
-            hypothesis: Transcribed text
-
-        Returns:
-            WER as percentage (0-100)
-        """
-        # Normalize texts
-        ref_words = reference.lower().split()
-        hyp_words = hypothesis.lower().split()
-
-        # Calculate edit distance using dynamic programming
-        r_len = len(ref_words)
-        h_len = len(hyp_words)
-
-        # Create DP table
-        dp = [[0 for _ in range(h_len + 1)] for _ in range(r_len + 1)]
-
-        # Initialize first row and column
-        for i in range(r_len + 1):
-            dp[i][0] = i
-        for j in range(h_len + 1):
-            dp[0][j] = j
-
-        # Fill DP table
-        for i in range(1, r_len + 1):
-            for j in range(1, h_len + 1):
-                if ref_words[i-1] == hyp_words[j-1]:
-                    dp[i][j] = dp[i-1][j-1]
-                else:
-                    substitution = dp[i-1][j-1] + 1
-                    insertion = dp[i][j-1] + 1
-                    deletion = dp[i-1][j] + 1
-                    dp[i][j] = min(substitution, insertion, deletion)
-
-        # Calculate WER
-        edit_distance = dp[r_len][h_len]
-        if r_len == 0:
-            return 100.0 if h_len > 0 else 0.0
-
-        wer = (edit_distance / r_len) * 100
-        return wer
-
 
 if __name__ == '__main__':
     # Test the backend
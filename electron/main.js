@@ -121,44 +121,74 @@ app.on('window-all-closed', function () {
   if (process.platform !== 'darwin') app.quit();
 });
 
-// Helper to run Python backend commands
-function runPythonCommand(args) {
-  return new Promise((resolve, reject) => {
-    const os = require('os');
+// Resolve the Python interpreter, runner script and environment for backend processes
+function getPythonEnvironment() {
+  const os = require('os');
+
+  // Determine Python path based on environment
+  let pythonPath;
+  let scriptPath;
+
+  if (process.env.DOCKER_ENV === 'true') {
+    // Docker environment
+    pythonPath = '/app/venv/bin/python';
+    scriptPath = '/app/backends/runner.py';
+  } else if (app.isPackaged) {
+    // Production (packaged app) - use bundled Python from extraResources
+    const platform = process.platform;
+    const pythonExecutable = platform === 'win32' ? 'python.exe' : 'python3';
+    pythonPath = path.join(process.resourcesPath, 'backends', 'venv', 'bin', pythonExecutable);
+    scriptPath = path.join(process.resourcesPath, 'backends', 'runner.py');
+    console.log('[Python] Using bundled Python:', pythonPath);
+    console.log('[Python] Using bundled scripts:', scriptPath);
+  } else {
+    // Development - use local venv
+    pythonPath = path.join(__dirname, '../backends/venv/bin/python3');
+    scriptPath = path.join(__dirname, '../backends/runner.py');
+    console.log('[Python] Using development Python:', pythonPath);
+  }
 
-    // Determine Python path based on environment
-    let pythonPath;
-    let scriptPath;
-
-    if (process.env.DOCKER_ENV === 'true') {
-      // Docker environment
-      pythonPath = '/app/venv/bin/python';
-      scriptPath = '/app/backends/runner.py';
-    } else if (app.isPackaged) {
-      // Production (packaged app) - use bundled Python from extraResources
-      const platform = process.platform;
-      const pythonExecutable = platform === 'win32' ? 'python.exe' : 'python3';
-      pythonPath = path.join(process.resourcesPath, 'backends', 'venv', 'bin', pythonExecutable);
-      scriptPath = path.join(process.resourcesPath, 'backends', 'runner.py');
-      console.log('[Python] Using bundled Python:', pythonPath);
-      console.log('[Python] Using bundled scripts:', scriptPath);
-    } else {
-      // Development - use local venv
-      pythonPath = path.join(__dirname, '../backends/venv/bin/python3');
-      scriptPath = path.join(__dirname, '../backends/runner.py');
-      console.log('[Python] Using development Python:', pythonPath);
+  // Add ffmpeg to PATH for audio processing
+  const homeDir = os.homedir();
+  const ffmpegPath = path.join(homeDir, '.local', 'bin');
+  const envPath = process.env.PATH ? `${ffmpegPath}:${process.env.PATH}` : ffmpegPath;
+
+  return { pythonPath, scriptPath, env: { ...process.env, PATH: envPath } };
+}
+
+// Forward PROGRESS: lines from backend stderr to the renderer (TIMING: lines are logged)
+function forwardProgress(output) {
+  const lines = output.split('\n');
+  for (const line of lines) {
+    if (line.startsWith('PROGRESS:')) {
+      try {
+        const progressData = JSON.parse(line.substring(9));
+        console.log('[Progress]:', progressData);
+        // Send progress to renderer
+        if (mainWindow && !mainWindow.isDestroyed()) {
+          mainWindow.webContents.send('transcription-progress', progressData);
+        }
+      } catch (e) {
+        console.error('[Progress] Failed to parse:', e.message);
+      }
+    } else if (line.startsWith('TIMING:')) {
+      try {
+        console.log('[Timing]:', JSON.parse(line.substring(7)));
+      } catch (e) {
+        console.error('[Timing] Failed to parse:', e.message);
+      }
     }
+  }
+}
 
-    // Add ffmpeg to PATH for audio processing
-    const homeDir = os.homedir();
-    const ffmpegPath = path.join(homeDir, '.local', 'bin');
-    const envPath = process.env.PATH ? `${ffmpegPath}:${process.env.PATH}` : ffmpegPath;
+// Helper to run Python backend commands
+function runPythonCommand(args) {
+  return new Promise((resolve, reject) => {
+    const { pythonPath, scriptPath, env } = getPythonEnvironment();
 
     console.log('[Python] Running:', pythonPath, scriptPath, ...args);
 
-    const pythonProcess = spawn(pythonPath, [scriptPath, ...args], {
-      env: { ...process.env, PATH: envPath }
-    });
+    const pythonProcess = spawn(pythonPath, [scriptPath, ...args], { env });
 
     let stdout = '';
     let stderr = '';
@@ -173,21 +203,7 @@ function runPythonCommand(args) {
       console.log('[Python stderr]:', output);
 
       // Parse progress messages
-      const lines = output.split('\n');
-      for (const line of lines) {
-        if (line.startsWith('PROGRESS:')) {
-          try {
-            const progressData = JSON.parse(line.substring(9));
-            console.log('[Progress]:', progressData);
-            // Send progress to renderer
-            if (mainWindow && !mainWindow.isDestroyed()) {
-              mainWindow.webContents.send('transcription-progress', progressData);
-            }
-          } catch (e) {
-            console.error('[Progress] Failed to parse:', e.message);
-          }
-        }
-      }
+      forwardProgress(output);
     });
 
     pythonProcess.on('close', (code) => {
@@ -219,6 +235,133 @@ function runPythonCommand(args) {
   });
 }
 
+// Long-lived `runner.py serve` process that keeps models resident between requests
+let backendDaemon = null;
+
+// A request fails if the server has been silent (no progress output, no
+// response) this long; transcriptions report progress, so only a hung
+// server gets here
+const DAEMON_IDLE_TIMEOUT_MS = 30 * 60 * 1000;
+
+// The server could not be started or died: the request never completed, so
+// it is safe to run it again in a one-shot process
+class BackendUnavailableError extends Error {}
+
+function stopBackendDaemon(daemon, reason, ErrorType = BackendUnavailableError) {
+  for (const request of daemon.pending.values()) {
+    clearTimeout(request.timer);
+    request.reject(new ErrorType(reason));
+  }
+  daemon.pending.clear();
+  if (backendDaemon === daemon) {
+    backendDaemon = null;
+  }
+}
+
+// (Re)start a request's idle timeout; on expiry the server is reset
+function armRequestTimeout(daemon, request) {
+  clearTimeout(request.timer);
+  request.timer = setTimeout(() => {
+    const minutes = DAEMON_IDLE_TIMEOUT_MS / 60000;
+    console.error(`[Python server] No response for ${minutes} minutes, restarting`);
+    stopBackendDaemon(daemon, `Backend server did not respond for ${minutes} minutes`, Error);
+    daemon.process.kill();
+  }, DAEMON_IDLE_TIMEOUT_MS);
+}
+
+function getBackendDaemon() {
+  if (backendDaemon) {
+    return backendDaemon;
+  }
+
+  const { pythonPath, scriptPath, env } = getPythonEnvironment();
+  console.log('[Python] Starting backend server:', pythonPath, scriptPath, 'serve');
+
+  const daemon = {
+    process: spawn(pythonPath, [scriptPath, 'serve'], { env }),
+    pending: new Map(),
+    nextId: 1,
+    buffer: ''
+  };
+
+  // Responses are newline-delimited JSON-RPC messages
+  daemon.process.stdout.on('data', (data) => {
+    daemon.buffer += data.toString();
+    let newline;
+    while ((newline = daemon.buffer.indexOf('\n')) !== -1) {
+      const line = daemon.buffer.slice(0, newline).trim();
+      daemon.buffer = daemon.buffer.slice(newline + 1);
+      if (!line) continue;
+
+      let message;
+      try {
+        message = JSON.parse(line);
+      } catch (e) {
+        console.error('[Python server] Failed to parse:', line);
+        continue;
+      }
+
+      const request = daemon.pending.get(message.id);
+      if (!request) continue;
+      daemon.pending.delete(message.id);
+      clearTimeout(request.timer);
+
+      if (message.error) {
+        request.reject(new Error(message.error.message));
+      } else {
+        request.resolve(message.result);
+      }
+    }
+  });
+
+  daemon.process.stderr.on('data', (data) => {
+    const output = data.toString();
+    console.log('[Python server stderr]:', output);
+    forwardProgress(output);
+    // The server is alive and working
+    for (const request of daemon.pending.values()) {
+      armRequestTimeout(daemon, request);
+    }
+  });
+
+  // Writes to a server that failed to start or has died fail with EPIPE
+  daemon.process.stdin.on('error', (err) => {
+    console.error('[Python server] Input closed:', err.message);
+    stopBackendDaemon(daemon, `Backend server is not accepting requests: ${err.message}`);
+    daemon.process.kill();
+  });
+
+  daemon.process.on('close', (code) => {
+    console.log('[Python server] Exited with code', code);
+    stopBackendDaemon(daemon, `Backend server exited with code ${code}`);
+  });
+
+  daemon.process.on('error', (err) => {
+    stopBackendDaemon(daemon, `Failed to start backend server: ${err.message}`);
+  });
+
+  backendDaemon = daemon;
+  return daemon;
+}
+
+// Send a JSON-RPC request to the backend server
+function callBackendDaemon(method, params) {
+  return new Promise((resolve, reject) => {
+    const daemon = getBackendDaemon();
+    const id = daemon.nextId++;
+    const request = { resolve, reject, timer: null };
+    daemon.pending.set(id, request);
+    armRequestTimeout(daemon, request);
+    daemon.process.stdin.write(JSON.stringify({ jsonrpc: '2.0', id, method, params }) + '\n');
+  });
+}
+
+app.on('will-quit', () => {
+  if (backendDaemon) {
+    backendDaemon.process.kill();
+  }
+});
+
 // IPC Handlers
 
 // List all available backends
@@ -246,11 +389,32 @@ ipcMain.handle('list-models', async (event, { backend }) => {
 // Transcribe audio file
 ipcMain.handle('transcribe', async (event, { audioPath, backend, modelName, task }) => {
   try {
+    const params = {
+      backend_name: backend,
+      audio_path: audioPath,
+      model_name: modelName
+    };
+    if (task) {
+      params.task = task;
+    }
+
+    try {
+      // Resident server: models stay loaded across transcriptions
+      return await callBackendDaemon('transcribe', params);
+    } catch (daemonError) {
+      // A request the server ran and failed (or timed out on) would fail the
+      // same way, only slower, in a one-shot process
+      if (!(daemonError instanceof BackendUnavailableError)) {
+        throw daemonError;
+      }
+      console.error('Backend server unavailable, falling back to one-shot process:', daemonError.message);
+    }
+
     const args = ['transcribe', backend, audioPath, modelName];
     if (task) {
       args.push(task);
     }
-    
+
     const result = await runPythonCommand(args);
     return result;
   } catch (error) {